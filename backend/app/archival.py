@@ -0,0 +1,20 @@
+import asyncio
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.crud import archive_orders_async
+
+
+# ✅ Background task started from the app lifespan when archiving is on:
+# every ORDER_ARCHIVE_INTERVAL_SECONDS, move finished orders older than
+# ORDER_RETENTION_DAYS to the archive tables in batches
+async def archive_old_orders() -> None:
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                archived = await archive_orders_async(db, settings.ORDER_RETENTION_DAYS, settings.ORDER_ARCHIVE_BATCH)
+            if archived:
+                print(f"🗄️ Archived {archived} orders")
+        except Exception as exc:
+            # Batches already committed stay archived; the rest go next tick
+            print(f"⚠️ Order archiving failed: {exc}")
+        await asyncio.sleep(settings.ORDER_ARCHIVE_INTERVAL_SECONDS)
@@ -8,7 +8,9 @@ from app.auth.jwt import (
 from app.auth.dependencies import (
     oauth2_scheme,
     get_current_user,
+    get_current_user_async,
     get_current_user_optional,
+    get_current_admin,
 )
 
 __all__ = [
@@ -20,5 +22,7 @@ __all__ = [
     # Dependencies
     "oauth2_scheme",
     "get_current_user",
+    "get_current_user_async",
     "get_current_user_optional",
+    "get_current_admin",
 ]
\ No newline at end of file
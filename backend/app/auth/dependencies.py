@@ -2,7 +2,8 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from typing import Optional
 from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, get_async_db
 from app.models import User
 from app.auth.jwt import verify_token, TokenData
 
@@ -34,6 +35,28 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     return user
 
 
+# ✅ Async variant for `async def` routes; shares the request's AsyncSession
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+    token_data = verify_token(token)
+    if token_data is None:
+        raise credentials_exception
+
+    user = await db.get(User, token_data.user_id)
+    if user is None:
+        raise credentials_exception
+
+    return user
+
+
 # ✅ Optional: Get current user or None (for public routes)
 def get_current_user_optional(
     token: str = Depends(oauth2_scheme),
@@ -43,3 +66,13 @@ def get_current_user_optional(
         return get_current_user(token, db)
     except HTTPException:
         return None
+
+
+# ✅ Current user, who must be an admin (403 otherwise)
+def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
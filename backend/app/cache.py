@@ -0,0 +1,203 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable, Optional, Union
+from app.config import settings
+from app.workers import server_worker_count
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe, size-bounded LRU cache with per-entry TTL.
+
+    Entries can carry tags so a write can drop exactly the entries it
+    affects (e.g. every list page that filters on one category). A cache
+    built with enabled=False stores nothing: every get is a miss.
+    """
+
+    def __init__(self, name: str, max_entries: int, ttl_seconds: float, enabled: bool = True):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._entries: OrderedDict = OrderedDict()   # key -> (expires_at, value, tags)
+        self._tags: dict[str, set] = {}              # tag -> keys
+        self._lock = threading.Lock()
+        # Bumped on every invalidation; a load that raced a write is not stored
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _drop(self, key) -> None:
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    # ✅ Cached value or `default`; refreshes LRU position on hit
+    def get(self, key: Hashable, default: Any = _MISSING) -> Any:
+        with self._lock:
+            entry = self._entries.get(key) if self.enabled else None
+            if entry is None:
+                self.misses += 1
+                return default
+            if entry[0] <= time.monotonic():
+                self._drop(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[str] = (), generation: Optional[int] = None) -> None:
+        with self._lock:
+            if not self.enabled or (generation is not None and generation != self._generation):
+                return
+            if key in self._entries:
+                self._drop(key)
+            tags = frozenset(tags)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    # ✅ Read-through: load on miss and store unless a write raced the load
+    # `tags` may be a function of the loaded value when they depend on it.
+    def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        tags: Union[Iterable[str], Callable[[Any], Iterable[str]]] = (),
+    ) -> Any:
+        value = self.get(key)
+        if value is not _MISSING:
+            return value
+        generation = self._generation
+        value = loader()
+        self.set(key, value, tags(value) if callable(tags) else tags, generation=generation)
+        return value
+
+    def invalidate(self, *keys: Hashable) -> None:
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                if key in self._entries:
+                    self._drop(key)
+                    self.invalidations += 1
+
+    def invalidate_tags(self, *tags: str) -> None:
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._drop(key)
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._tags.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+# Catalog and cart caches are per process and only this process's writes
+# invalidate them: with several server workers a write handled by one would
+# stay invisible on the others for up to CACHE_TTL_SECONDS, so they are
+# only used with a single worker.
+SINGLE_PROCESS = server_worker_count() <= 1
+
+# ✅ Catalog caches; values are plain dicts, never ORM objects
+product_cache = TTLCache("products", settings.PRODUCT_CACHE_SIZE, settings.CACHE_TTL_SECONDS, SINGLE_PROCESS)
+product_list_cache = TTLCache("product_lists", settings.PRODUCT_LIST_CACHE_SIZE, settings.CACHE_TTL_SECONDS, SINGLE_PROCESS)
+category_cache = TTLCache("categories", settings.CATEGORY_CACHE_SIZE, settings.CACHE_TTL_SECONDS, SINGLE_PROCESS)
+# Per-user cart projections, keyed by user id
+cart_cache = TTLCache("carts", settings.CART_CACHE_SIZE, settings.CACHE_TTL_SECONDS, SINGLE_PROCESS)
+
+# Finished Idempotency-Key responses, keyed by (user_id, key). Safe in every
+# process: a stored response never changes, and other processes find it in
+# the idempotency_keys table.
+idempotency_cache = TTLCache("idempotency", settings.IDEMPOTENCY_CACHE_SIZE, settings.IDEMPOTENCY_TTL_SECONDS)
+
+CACHES = [product_cache, product_list_cache, category_cache, cart_cache, idempotency_cache]
+
+
+# List pages are tagged by the category they filter on; unfiltered pages
+# see every product so they share one tag.
+ALL_PRODUCTS_TAG = "category:*"
+
+
+def product_list_tag(category_id: Optional[int]) -> str:
+    return f"category:{category_id}" if category_id else ALL_PRODUCTS_TAG
+
+
+# ✅ Drop cached data for products that were written
+# Pass (product_id, category_id) pairs; include the old category on moves.
+def invalidate_products(products: Iterable[tuple[int, Optional[int]]]) -> None:
+    product_ids, tags = set(), {ALL_PRODUCTS_TAG}
+    for product_id, category_id in products:
+        product_ids.add(product_id)
+        if category_id:
+            tags.add(product_list_tag(category_id))
+    product_cache.invalidate(*product_ids)
+    product_list_cache.invalidate_tags(*tags)
+    # Carts embed product name/price/stock
+    cart_cache.invalidate_tags(*[cart_product_tag(product_id) for product_id in product_ids])
+
+
+# Cached carts are tagged by owner, by cart and by every product they show,
+# so a write can drop them from whichever id it has at hand.
+def cart_user_tag(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def cart_tag(cart_id: int) -> str:
+    return f"cart:{cart_id}"
+
+
+def cart_product_tag(product_id: int) -> str:
+    return f"product:{product_id}"
+
+
+# ✅ Drop the cached cart of a user and/or a cart id after a cart write
+def invalidate_cart(user_id: Optional[int] = None, cart_id: Optional[int] = None) -> None:
+    tags = []
+    if user_id is not None:
+        tags.append(cart_user_tag(user_id))
+    if cart_id is not None:
+        tags.append(cart_tag(cart_id))
+    cart_cache.invalidate_tags(*tags)
+
+
+def invalidate_categories() -> None:
+    category_cache.clear()
+
+
+def cache_stats() -> dict:
+    return {cache.name: cache.stats() for cache in CACHES}
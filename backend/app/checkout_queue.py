@@ -0,0 +1,166 @@
+import asyncio
+import time
+from contextlib import suppress
+from typing import IO, Optional
+from uuid import uuid4
+from fastapi import status
+from fastapi.encoders import jsonable_encoder
+from app.cache import TTLCache
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.crud import InsufficientStockError, create_order_from_cart_async
+from app.workers import acquire_process_lock, server_worker_count
+
+
+class CheckoutQueueFull(Exception):
+    pass
+
+
+class CheckoutQueue:
+    """In-process queued checkout: requests enqueue a job and get a token
+    back; a fixed pool of asyncio workers runs create_order_from_cart, so
+    at most `workers` checkouts hold a connection at once. A full queue
+    refuses new jobs (backpressure) instead of letting requests pile up.
+    Jobs live in memory only; no external broker, and so only one server
+    process: start() refuses to run when the server has more than one
+    worker, or when another process already runs the queue."""
+
+    def __init__(self, workers: int, max_size: int, result_ttl: float):
+        self.workers = workers
+        self.max_size = max_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list[asyncio.Task] = []
+        self._lock: Optional[IO] = None
+        self._jobs = TTLCache("checkout_jobs", max_size * 10, result_ttl)
+        self._done: dict[str, asyncio.Event] = {}
+        self._by_user: dict[int, dict] = {}   # user -> unfinished job
+        self.busy = 0
+        self.enqueued = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        workers = server_worker_count()
+        if workers > 1:
+            raise RuntimeError(
+                f"CHECKOUT_QUEUE_ENABLED needs a single server process ({workers} workers): "
+                "queued jobs are kept in process memory and could not be polled from other workers"
+            )
+        # Fails closed for workers the command line didn't reveal
+        self._lock = acquire_process_lock("checkout-queue")
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+        self._tasks = []
+        if self._lock is not None:
+            self._lock.close()
+            self._lock = None
+
+    # ✅ Enqueue a checkout for the user; returns the job token
+    # A user with a checkout still queued or running gets that job back.
+    def submit(self, user_id: int) -> dict:
+        job = self._by_user.get(user_id)
+        if job is not None:
+            return job
+
+        job = {"token": uuid4().hex, "user_id": user_id, "status": "queued"}
+        try:
+            self._queue.put_nowait((job, time.monotonic()))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise CheckoutQueueFull
+        self._jobs.set(job["token"], job)
+        self._done[job["token"]] = asyncio.Event()
+        self._by_user[user_id] = job
+        self.enqueued += 1
+        return job
+
+    # ✅ Job state for its owner (None if unknown, expired or not theirs);
+    # with `wait`, blocks up to that many seconds for the job to finish
+    async def get(self, token: str, user_id: int, wait: float = 0) -> Optional[dict]:
+        job = self._by_user.get(user_id)
+        if job is None or job["token"] != token:
+            job = self._jobs.get(token, None)
+        if job is None or job["user_id"] != user_id:
+            return None
+        done = self._done.get(token)
+        if wait and done is not None:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(done.wait(), wait)
+        return job
+
+    async def _work(self) -> None:
+        while True:
+            job, enqueued_at = await self._queue.get()
+            waited = time.monotonic() - enqueued_at
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            self.busy += 1
+            try:
+                job["status"] = "processing"
+                job.update(await self._checkout(job["user_id"]))
+                if job["status"] == "done":
+                    self.completed += 1
+                else:
+                    self.failed += 1
+            finally:
+                self.busy -= 1
+                # Results stay pollable for the TTL after finishing
+                self._jobs.set(job["token"], job)
+                self._by_user.pop(job["user_id"], None)
+                done = self._done.pop(job["token"], None)
+                if done is not None:
+                    done.set()
+                self._queue.task_done()
+
+    async def _checkout(self, user_id: int) -> dict:
+        try:
+            async with AsyncSessionLocal() as db:
+                order = await create_order_from_cart_async(db, user_id)
+        except InsufficientStockError as exc:
+            return self._failure(status.HTTP_409_CONFLICT, {"message": "Not enough stock for some items", "items": exc.items})
+        except Exception as exc:
+            print(f"⚠️ Queued checkout failed for user {user_id}: {exc}")
+            return self._failure(status.HTTP_500_INTERNAL_SERVER_ERROR, "Checkout failed")
+        if order is None:
+            return self._failure(status.HTTP_400_BAD_REQUEST, "Cart is empty or not found")
+        return {"status": "done", "order_id": order["id"], "total_amount": jsonable_encoder(order["total_amount"])}
+
+    @staticmethod
+    def _failure(status_code: int, detail) -> dict:
+        return {"status": "failed", "error": {"status_code": status_code, "detail": detail}}
+
+    def stats(self) -> dict:
+        dequeued = self.completed + self.failed + self.busy
+        return {
+            "workers": self.workers,
+            "busy": self.busy,
+            "depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_size": self.max_size,
+            "enqueued": self.enqueued,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.total_wait / dequeued * 1000, 3) if dequeued else None,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+        }
+
+
+checkout_queue = CheckoutQueue(
+    settings.CHECKOUT_WORKERS,
+    settings.CHECKOUT_QUEUE_SIZE,
+    settings.CHECKOUT_RESULT_TTL_SECONDS,
+)
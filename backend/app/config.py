@@ -1,13 +1,97 @@
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    # Async driver URL; derived from DATABASE_URL (asyncpg / aiosqlite) when unset
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    # Connection pool (per engine, per process). Size workers so that
+    # processes x (DB_POOL_SIZE + DB_MAX_OVERFLOW) stays under max_connections.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = 2
+    # Server worker processes (the variable uvicorn and gunicorn read)
+    WEB_CONCURRENCY: int = 1
 
     SECRET_KEY: str = "your-super-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # In-process catalog and cart caches (entries per cache, shared TTL).
+    # Single process only: a write clears only its own process's copy, so
+    # with more than one server worker these caches are switched off.
+    CACHE_TTL_SECONDS: int = 60
+    PRODUCT_CACHE_SIZE: int = 2048
+    PRODUCT_LIST_CACHE_SIZE: int = 256
+    CATEGORY_CACHE_SIZE: int = 64
+    CART_CACHE_SIZE: int = 10000
+
+    # Product search ranks at most this many matches (the newest products);
+    # keeps broad terms and short prefixes as cheap as selective ones
+    SEARCH_MAX_CANDIDATES: int = 1000
+
+    # Anonymous carts are signed tokens held by the client, not cart rows
+    GUEST_CART_EXPIRE_DAYS: int = 30
+    GUEST_CART_MAX_LINES: int = 50
+
+    # Optional stock holds for cart lines; expired holds are swept in the background
+    STOCK_RESERVATIONS_ENABLED: bool = False
+    STOCK_RESERVATION_TTL_SECONDS: int = 15 * 60
+    STOCK_RESERVATION_SWEEP_SECONDS: float = 60
+    STOCK_RESERVATION_SWEEP_BATCH: int = 500
+
+    # Idempotency-Key replay: stored responses are kept IDEMPOTENCY_TTL_SECONDS
+    # (hot ones also in memory); a key whose request never finished is
+    # freed after IDEMPOTENCY_LOCK_SECONDS
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 60 * 60
+    IDEMPOTENCY_LOCK_SECONDS: int = 60
+    IDEMPOTENCY_CACHE_SIZE: int = 10000
+    IDEMPOTENCY_SWEEP_SECONDS: float = 600
+    IDEMPOTENCY_SWEEP_BATCH: int = 500
+
+    # Optional order archiving: delivered/cancelled orders older than
+    # ORDER_RETENTION_DAYS move to orders_archive in background batches.
+    # Order reads skip the archive unless asked for history.
+    ORDER_ARCHIVE_ENABLED: bool = False
+    ORDER_RETENTION_DAYS: int = 365
+    ORDER_ARCHIVE_INTERVAL_SECONDS: float = 60 * 60
+    ORDER_ARCHIVE_BATCH: int = 500
+
+    # Sales rollups: shards for the rows every checkout updates (more shards,
+    # less lock contention between checkouts, a little more to sum on read)
+    SALES_ROLLUP_SHARDS: int = 8
+
+    # Optional queued checkout: POST /api/orders enqueues and returns 202 with
+    # a token; CHECKOUT_WORKERS in-process workers place the orders. A full
+    # queue answers 503 + Retry-After. Results are kept for polling.
+    # Single process only: jobs and results live in that process's memory,
+    # so a poll landing on another worker process would not find them. The
+    # app refuses to start with the queue on when the server runs several
+    # workers (--workers / -w / WEB_CONCURRENCY) or another process on the
+    # host already runs the queue for the same database.
+    CHECKOUT_QUEUE_ENABLED: bool = False
+    CHECKOUT_WORKERS: int = 4
+    CHECKOUT_QUEUE_SIZE: int = 1000
+    CHECKOUT_RESULT_TTL_SECONDS: int = 10 * 60
+    CHECKOUT_POLL_MAX_WAIT_SECONDS: float = 25
+
+    # Image uploads are streamed to disk in chunks and capped at this size
+    MAX_UPLOAD_BYTES: int = 5 * 1024 * 1024
+    UPLOAD_CHUNK_BYTES: int = 64 * 1024
+    # Multipart bodies over MAX_UPLOAD_BYTES + this are refused before parsing
+    UPLOAD_FORM_OVERHEAD_BYTES: int = 64 * 1024
+
+    # Derivatives built after upload: a WebP per width (no upscaling) plus a
+    # full-size WebP. Work runs in a process pool of IMAGE_WORKERS processes.
+    IMAGE_VARIANT_WIDTHS: dict[str, int] = {"thumb": 200, "medium": 600}
+    IMAGE_WEBP_QUALITY: int = 80
+    IMAGE_WORKERS: int = 2
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8"
@@ -3,6 +3,7 @@ from app.crud.user import (
     get_user_by_id,
     get_user_by_email,
     get_all_users,
+    user_cursor,
     update_user,
     delete_user,
     authenticate_user,
@@ -13,12 +14,20 @@ from app.crud.user import (
 from app.crud.product import (
     create_product,
     get_product_by_id,
+    get_product_cached,
     get_product_by_sku,
     get_all_products,
     get_filtered_products,
+    get_filtered_products_cached,
+    get_products_version,
+    get_products_version_cached,
+    get_product_facets,
+    get_product_facets_cached,
+    product_cursor,
     get_products_by_category,
     search_products,
     update_product,
+    set_product_image_variants,
     delete_product,
     hard_delete_product,
     update_stock,
@@ -28,9 +37,15 @@ from app.crud.product import (
 from app.crud.category import (
     create_category,
     get_category_by_id,
+    get_category_cached,
     get_category_by_name,
     get_all_categories,
+    get_all_categories_cached,
+    get_categories_version,
+    get_categories_version_cached,
+    category_cursor,
     update_category,
+    set_category_image_variants,
     delete_category,
     get_category_with_products_count,
 )
@@ -40,7 +55,10 @@ from app.crud.cart import (
     get_cart_by_id,
     get_cart_by_user_id,
     get_or_create_cart,
+    ensure_cart,
     get_cart_with_items,
+    get_cart_with_items_cached,
+    get_guest_cart,
     get_cart_summary,
     clear_cart,
     delete_cart,
@@ -48,7 +66,11 @@ from app.crud.cart import (
 
 from app.crud.cart_item import (
     add_item_to_cart,
+    add_item_to_user_cart,
+    apply_cart_operations,
+    merge_guest_cart,
     get_cart_item_by_id,
+    get_cart_item_owner,
     get_cart_item_by_product,
     get_cart_items,
     update_cart_item,
@@ -59,20 +81,55 @@ from app.crud.cart_item import (
     decrease_quantity,
 )
 
+from app.crud.reservation import (
+    get_available_stock,
+    get_stock_shortfall,
+    get_batch_stock_shortfalls,
+    reserve_cart_stock,
+    expire_reservations,
+)
+
+from app.crud.idempotency import (
+    claim_idempotency_key,
+    save_idempotent_response,
+    release_idempotency_key,
+    expire_idempotency_keys,
+)
+
 from app.crud.order import (
+    InsufficientStockError,
     create_order_from_cart,
     get_order_by_id,
     get_order_by_id_and_user,
     get_user_orders,
+    get_user_order_summaries,
+    order_summary_cursor,
     get_all_orders,
     get_orders_by_status,
+    order_cursor,
+    ORDER_STATUS_TRANSITIONS,
+    status_predecessors,
+    bulk_update_order_status,
     update_order_status,
     cancel_order,
     get_order_with_items,
+    get_user_order_detail,
     get_order_summary,
     delete_order,
 )
 
+from app.crud.sales import (
+    record_sales,
+    get_sales_lines,
+    rebuild_sales_rollups,
+    get_sales_analytics,
+)
+
+from app.crud.archive import (
+    ARCHIVED_STATUSES,
+    archive_orders,
+)
+
 from app.crud.order_item import (
     create_order_item,
     get_order_item_by_id,
@@ -81,6 +138,31 @@ from app.crud.order_item import (
     get_order_items_with_products,
     calculate_order_total,
 )
+from app.crud.aio import (
+    get_product_cached_async,
+    get_filtered_products_cached_async,
+    get_products_version_cached_async,
+    get_product_facets_cached_async,
+    get_cart_with_items_cached_async,
+    get_guest_cart_async,
+    get_cart_summary_async,
+    clear_cart_async,
+    add_item_to_user_cart_async,
+    apply_cart_operations_async,
+    get_cart_item_owner_async,
+    update_cart_item_async,
+    remove_cart_item_async,
+    get_stock_shortfall_async,
+    get_batch_stock_shortfalls_async,
+    reserve_cart_stock_async,
+    expire_reservations_async,
+    create_order_from_cart_async,
+    claim_idempotency_key_async,
+    save_idempotent_response_async,
+    release_idempotency_key_async,
+    expire_idempotency_keys_async,
+    archive_orders_async,
+)
 
 __all__ = [
     # User
@@ -88,6 +170,7 @@ __all__ = [
     "get_user_by_id",
     "get_user_by_email",
     "get_all_users",
+    "user_cursor",
     "update_user",
     "delete_user",
     "authenticate_user",
@@ -96,12 +179,20 @@ __all__ = [
     # Product
     "create_product",
     "get_product_by_id",
+    "get_product_cached",
     "get_product_by_sku",
     "get_all_products",
     "get_filtered_products",
+    "get_filtered_products_cached",
+    "get_products_version",
+    "get_products_version_cached",
+    "get_product_facets",
+    "get_product_facets_cached",
+    "product_cursor",
     "get_products_by_category",
     "search_products",
     "update_product",
+    "set_product_image_variants",
     "delete_product",
     "hard_delete_product",
     "update_stock",
@@ -109,9 +200,15 @@ __all__ = [
     # Category
     "create_category",
     "get_category_by_id",
+    "get_category_cached",
     "get_category_by_name",
     "get_all_categories",
+    "get_all_categories_cached",
+    "get_categories_version",
+    "get_categories_version_cached",
+    "category_cursor",
     "update_category",
+    "set_category_image_variants",
     "delete_category",
     "get_category_with_products_count",
     # Cart
@@ -119,13 +216,20 @@ __all__ = [
     "get_cart_by_id",
     "get_cart_by_user_id",
     "get_or_create_cart",
+    "ensure_cart",
     "get_cart_with_items",
+    "get_cart_with_items_cached",
+    "get_guest_cart",
     "get_cart_summary",
     "clear_cart",
     "delete_cart",
     # CartItem
     "add_item_to_cart",
+    "add_item_to_user_cart",
+    "apply_cart_operations",
+    "merge_guest_cart",
     "get_cart_item_by_id",
+    "get_cart_item_owner",
     "get_cart_item_by_product",
     "get_cart_items",
     "update_cart_item",
@@ -134,18 +238,45 @@ __all__ = [
     "remove_cart_item_by_product",
     "increase_quantity",
     "decrease_quantity",
+    # StockReservation
+    "get_available_stock",
+    "get_stock_shortfall",
+    "get_batch_stock_shortfalls",
+    "reserve_cart_stock",
+    "expire_reservations",
+    # IdempotencyKey
+    "claim_idempotency_key",
+    "save_idempotent_response",
+    "release_idempotency_key",
+    "expire_idempotency_keys",
     # Order
+    "InsufficientStockError",
     "create_order_from_cart",
     "get_order_by_id",
     "get_order_by_id_and_user",
     "get_user_orders",
+    "get_user_order_summaries",
+    "order_summary_cursor",
     "get_all_orders",
     "get_orders_by_status",
+    "order_cursor",
+    "ORDER_STATUS_TRANSITIONS",
+    "status_predecessors",
+    "bulk_update_order_status",
     "update_order_status",
     "cancel_order",
     "get_order_with_items",
+    "get_user_order_detail",
     "get_order_summary",
     "delete_order",
+    # Sales rollups
+    "record_sales",
+    "get_sales_lines",
+    "rebuild_sales_rollups",
+    "get_sales_analytics",
+    # Order archive
+    "ARCHIVED_STATUSES",
+    "archive_orders",
     # OrderItem
     "create_order_item",
     "get_order_item_by_id",
@@ -153,4 +284,28 @@ __all__ = [
     "get_order_item_with_product",
     "get_order_items_with_products",
     "calculate_order_total",
+    # Async (hot routes)
+    "get_product_cached_async",
+    "get_filtered_products_cached_async",
+    "get_products_version_cached_async",
+    "get_product_facets_cached_async",
+    "get_cart_with_items_cached_async",
+    "get_guest_cart_async",
+    "get_cart_summary_async",
+    "clear_cart_async",
+    "add_item_to_user_cart_async",
+    "apply_cart_operations_async",
+    "get_cart_item_owner_async",
+    "update_cart_item_async",
+    "remove_cart_item_async",
+    "get_stock_shortfall_async",
+    "get_batch_stock_shortfalls_async",
+    "reserve_cart_stock_async",
+    "expire_reservations_async",
+    "create_order_from_cart_async",
+    "claim_idempotency_key_async",
+    "save_idempotent_response_async",
+    "release_idempotency_key_async",
+    "expire_idempotency_keys_async",
+    "archive_orders_async",
 ]
\ No newline at end of file
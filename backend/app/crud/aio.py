@@ -0,0 +1,133 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.models import CartItem, IdempotencyKey
+from app.schemas import CartItemCreate, CartItemUpdate, CartItemOperation
+from app.crud.product import (
+    get_product_cached,
+    get_filtered_products_cached,
+    get_products_version_cached,
+    get_product_facets_cached,
+)
+from app.crud.cart import get_cart_with_items_cached, get_guest_cart, get_cart_summary, clear_cart
+from app.crud.cart_item import (
+    add_item_to_user_cart,
+    apply_cart_operations,
+    get_cart_item_owner,
+    update_cart_item,
+    remove_cart_item,
+)
+from app.crud.reservation import get_stock_shortfall, get_batch_stock_shortfalls, reserve_cart_stock, expire_reservations
+from app.crud.idempotency import (
+    claim_idempotency_key,
+    save_idempotent_response,
+    release_idempotency_key,
+    expire_idempotency_keys,
+)
+from app.crud.order import create_order_from_cart
+from app.crud.archive import archive_orders
+
+
+# Async variants of the crud functions behind the hot routes.
+# Each one runs the sync implementation through AsyncSession.run_sync: the
+# queries go out on the async driver (asyncpg / aiosqlite) and the request
+# awaits them on the event loop instead of holding a threadpool worker.
+# Only plain values or fully loaded objects are returned, never anything
+# that would lazy-load after the call.
+
+
+# ✅ Products
+async def get_product_cached_async(db: AsyncSession, product_id: int) -> Optional[dict]:
+    return await db.run_sync(get_product_cached, product_id)
+
+
+async def get_filtered_products_cached_async(db: AsyncSession, **filters) -> dict:
+    return await db.run_sync(get_filtered_products_cached, **filters)
+
+
+async def get_products_version_cached_async(db: AsyncSession, **filters) -> tuple:
+    return await db.run_sync(get_products_version_cached, **filters)
+
+
+async def get_product_facets_cached_async(db: AsyncSession, **filters) -> dict:
+    return await db.run_sync(get_product_facets_cached, **filters)
+
+
+# ✅ Cart
+async def get_cart_with_items_cached_async(db: AsyncSession, user_id: int) -> Optional[dict]:
+    return await db.run_sync(get_cart_with_items_cached, user_id)
+
+
+async def get_guest_cart_async(db: AsyncSession, lines: dict[int, int]) -> dict:
+    return await db.run_sync(get_guest_cart, lines)
+
+
+async def get_cart_summary_async(db: AsyncSession, user_id: int) -> dict:
+    return await db.run_sync(get_cart_summary, user_id)
+
+
+async def clear_cart_async(db: AsyncSession, user_id: int) -> bool:
+    return await db.run_sync(clear_cart, user_id)
+
+
+async def add_item_to_user_cart_async(db: AsyncSession, user_id: int, item: CartItemCreate) -> Optional[CartItem]:
+    return await db.run_sync(add_item_to_user_cart, user_id, item)
+
+
+async def apply_cart_operations_async(db: AsyncSession, user_id: int, operations: list[CartItemOperation]) -> list[int]:
+    return await db.run_sync(apply_cart_operations, user_id, operations)
+
+
+async def get_cart_item_owner_async(db: AsyncSession, item_id: int) -> Optional[int]:
+    return await db.run_sync(get_cart_item_owner, item_id)
+
+
+async def update_cart_item_async(db: AsyncSession, item_id: int, item_data: CartItemUpdate) -> Optional[CartItem]:
+    return await db.run_sync(update_cart_item, item_id, item_data)
+
+
+async def remove_cart_item_async(db: AsyncSession, item_id: int) -> bool:
+    return await db.run_sync(remove_cart_item, item_id)
+
+
+# ✅ Stock reservations
+async def get_stock_shortfall_async(db: AsyncSession, user_id: int, product_id: int, quantity: int) -> int:
+    return await db.run_sync(get_stock_shortfall, user_id, product_id, quantity)
+
+
+async def get_batch_stock_shortfalls_async(db: AsyncSession, user_id: int, operations: list[CartItemOperation]) -> list[dict]:
+    return await db.run_sync(get_batch_stock_shortfalls, user_id, operations)
+
+
+async def reserve_cart_stock_async(db: AsyncSession, user_id: int) -> dict[int, int]:
+    return await db.run_sync(reserve_cart_stock, user_id)
+
+
+async def expire_reservations_async(db: AsyncSession, batch_size: int) -> int:
+    return await db.run_sync(expire_reservations, batch_size)
+
+
+# ✅ Checkout
+async def create_order_from_cart_async(db: AsyncSession, user_id: int) -> Optional[dict]:
+    return await db.run_sync(create_order_from_cart, user_id)
+
+
+# ✅ Idempotency keys
+async def claim_idempotency_key_async(db: AsyncSession, user_id: int, key: str, fingerprint: str) -> Optional[IdempotencyKey]:
+    return await db.run_sync(claim_idempotency_key, user_id, key, fingerprint)
+
+
+async def save_idempotent_response_async(db: AsyncSession, user_id: int, key: str, status_code: int, body, headers: Optional[dict] = None) -> None:
+    await db.run_sync(save_idempotent_response, user_id, key, status_code, body, headers)
+
+
+async def release_idempotency_key_async(db: AsyncSession, user_id: int, key: str) -> None:
+    await db.run_sync(release_idempotency_key, user_id, key)
+
+
+async def expire_idempotency_keys_async(db: AsyncSession, batch_size: int) -> int:
+    return await db.run_sync(expire_idempotency_keys, batch_size)
+
+
+# ✅ Order archive
+async def archive_orders_async(db: AsyncSession, retention_days: int, batch_size: int) -> int:
+    return await db.run_sync(archive_orders, retention_days, batch_size)
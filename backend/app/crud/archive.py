@@ -0,0 +1,46 @@
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+from app.models import Order, OrderItem, OrderArchive, OrderItemArchive
+from app.crud.order import ORDER_STATUS_TRANSITIONS
+
+
+ORDER_COLUMNS = ["id", "user_id", "status", "total_amount", "order_date", "created_at", "updated_at"]
+ORDER_ITEM_COLUMNS = ["id", "order_id", "product_id", "category_id", "quantity", "unit_price", "subtotal", "created_at", "updated_at"]
+
+# Only orders that can't change any more are archived
+ARCHIVED_STATUSES = [status.value for status, following in ORDER_STATUS_TRANSITIONS.items() if not following]
+
+
+def _copy(source, target, columns: list[str], where):
+    return insert(target).from_select(columns, select(*[getattr(source, column) for column in columns]).where(where))
+
+
+# ✅ Move delivered/cancelled orders placed more than `retention_days` ago
+# (and their lines) to the archive tables, `batch_size` orders at a time.
+# Each batch is two INSERT ... SELECTs and two DELETEs in one transaction,
+# so an order is always in exactly one place. Returns orders archived.
+def archive_orders(db: Session, retention_days: int, batch_size: int) -> int:
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    # The newest order always stays: SQLite hands out max(id) + 1, so
+    # emptying the table would reuse ids that are in the archive
+    newest = select(func.max(Order.id)).scalar_subquery()
+    archived = 0
+    while True:
+        order_ids = [
+            order_id for (order_id,) in db.query(Order.id)
+            .filter(Order.status.in_(ARCHIVED_STATUSES), Order.order_date < cutoff, Order.id < newest)
+            .order_by(Order.id)
+            .limit(batch_size)
+        ]
+        if not order_ids:
+            return archived
+
+        db.execute(_copy(Order, OrderArchive, ORDER_COLUMNS, Order.id.in_(order_ids)))
+        db.execute(_copy(OrderItem, OrderItemArchive, ORDER_ITEM_COLUMNS, OrderItem.order_id.in_(order_ids)))
+        db.query(OrderItem).filter(OrderItem.order_id.in_(order_ids)).delete(synchronize_session=False)
+        db.query(Order).filter(Order.id.in_(order_ids)).delete(synchronize_session=False)
+        db.commit()
+        archived += len(order_ids)
+        if len(order_ids) < batch_size:
+            return archived
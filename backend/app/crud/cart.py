@@ -1,7 +1,10 @@
+from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
 from typing import Optional
 from decimal import Decimal
+from app.database import upsert_insert
 from app.models import Cart, CartItem, Product
+from app.cache import cart_cache, cart_user_tag, cart_tag, cart_product_tag, invalidate_cart
 
 
 # ✅ Create cart for user
@@ -9,6 +12,7 @@ def create_cart(db: Session, user_id: int) -> Cart:
     db_cart = Cart(user_id=user_id)
     db.add(db_cart)
     db.commit()
+    invalidate_cart(user_id=user_id)
     db.refresh(db_cart)
     return db_cart
 
@@ -31,6 +35,29 @@ def get_or_create_cart(db: Session, user_id: int) -> Cart:
     return db_cart
 
 
+# ✅ Create the user's cart if missing, without a lookup or commit
+# Safe under concurrency: a racing insert is absorbed by ON CONFLICT.
+# Returns False if the backend has no native upsert.
+def ensure_cart(db: Session, user_id: int) -> bool:
+    insert = upsert_insert(db)
+    if insert is None:
+        return False
+    db.execute(insert(Cart).values(user_id=user_id).on_conflict_do_nothing(index_elements=[Cart.user_id]))
+    return True
+
+
+def _product_info(product: Product) -> dict:
+    return {
+        "id": product.id,
+        "name": product.name,
+        "price": float(product.price),
+        "stock": product.stock,
+        "is_active": product.is_active,
+        "image_url": product.image_url,   # <-- Ensures image_url included
+        "image_variants": product.image_variants,
+    }
+
+
 # ✅ Get cart with items
 def get_cart_with_items(db: Session, user_id: int) -> dict:
     cart = db.query(Cart)\
@@ -51,14 +78,7 @@ def get_cart_with_items(db: Session, user_id: int) -> dict:
             "quantity": item.quantity,
             "cart_id": item.cart_id,
             "item_total": item_total,
-            "product": {
-                "id": product.id,
-                "name": product.name,
-                "price": float(product.price),
-                "stock": product.stock,
-                "is_active": product.is_active,
-                "image_url": product.image_url,   # <-- Ensures image_url included
-            }
+            "product": _product_info(product),
         })
         total_amount += item_total
 
@@ -70,27 +90,87 @@ def get_cart_with_items(db: Session, user_id: int) -> dict:
         "total_amount": total_amount,
     }
 
-# ✅ Get cart summary (for navbar)
+
+# ✅ Cached cart projection (same dict as get_cart_with_items, None if no cart)
+# Every cart write in crud/cart*.py drops it; product writes drop the carts
+# that show the product (see app.cache.invalidate_products).
+def get_cart_with_items_cached(db: Session, user_id: int) -> Optional[dict]:
+    def tags(cart):
+        if not cart:
+            return [cart_user_tag(user_id)]
+        return [
+            cart_user_tag(user_id),
+            cart_tag(cart["id"]),
+            *[cart_product_tag(item["product_id"]) for item in cart["items"]],
+        ]
+
+    return cart_cache.get_or_load(user_id, lambda: get_cart_with_items(db, user_id), tags=tags)
+
+
+# ✅ Price a guest cart ({product_id: quantity}) against the catalog in one query
+# Same shape as get_cart_with_items. Missing, inactive and sold-out products
+# are dropped and listed in unavailable_product_ids; quantities are capped
+# at current stock.
+def get_guest_cart(db: Session, lines: dict[int, int]) -> dict:
+    products = {
+        product.id: product for product in
+        db.query(Product).filter(Product.id.in_(list(lines)), Product.is_active == 1)
+    } if lines else {}
+
+    items = []
+    unavailable = []
+    total_amount = 0
+    for product_id, quantity in lines.items():
+        product = products.get(product_id)
+        if product is None or product.stock <= 0:
+            unavailable.append(product_id)
+            continue
+        quantity = min(quantity, product.stock)
+        item_total = float(quantity) * float(product.price)
+        items.append({
+            "id": None,
+            "product_id": product_id,
+            "quantity": quantity,
+            "cart_id": None,
+            "item_total": item_total,
+            "product": _product_info(product),
+        })
+        total_amount += item_total
+
+    return {
+        "id": None,
+        "user_id": None,
+        "items": items,
+        "total_items": len(items),
+        "total_amount": total_amount,
+        "unavailable_product_ids": sorted(unavailable),
+    }
+
+
+# ✅ Get cart summary (for navbar): one SUM over the cart's lines
 def get_cart_summary(db: Session, user_id: int) -> dict:
-    db_cart = get_cart_by_user_id(db, user_id)
-    if not db_cart:
+    row = db.query(
+        Cart.id,
+        func.coalesce(func.sum(CartItem.quantity), 0),
+        func.coalesce(func.sum(CartItem.quantity * Product.price), 0),
+    )\
+        .outerjoin(CartItem, CartItem.cart_id == Cart.id)\
+        .outerjoin(Product, Product.id == CartItem.product_id)\
+        .filter(Cart.user_id == user_id)\
+        .group_by(Cart.id)\
+        .first()
+    if not row:
         return {
             "id": None,
             "total_items": 0,
             "total_amount": Decimal("0.00"),
         }
-    
-    total_items = 0
-    total_amount = Decimal("0.00")
-    
-    for item in db_cart.items:
-        total_items += item.quantity
-        total_amount += item.product.price * item.quantity
-    
+
+    cart_id, total_items, total_amount = row
     return {
-        "id": db_cart.id,
-        "total_items": total_items,
-        "total_amount": total_amount,
+        "id": cart_id,
+        "total_items": int(total_items),
+        "total_amount": Decimal(str(total_amount)).quantize(Decimal("0.01")),
     }
 
 
@@ -102,6 +182,7 @@ def clear_cart(db: Session, user_id: int) -> bool:
     
     db.query(CartItem).filter(CartItem.cart_id == db_cart.id).delete()
     db.commit()
+    invalidate_cart(user_id=user_id)
     return True
 
 
@@ -113,4 +194,5 @@ def delete_cart(db: Session, user_id: int) -> bool:
     
     db.delete(db_cart)
     db.commit()
+    invalidate_cart(user_id=user_id)
     return True
\ No newline at end of file
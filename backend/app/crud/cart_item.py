@@ -1,11 +1,69 @@
+from sqlalchemy import select, literal, and_, case
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Optional, Iterable
+from app.database import upsert_insert
 from app.models import CartItem, Cart, Product
-from app.schemas import CartItemCreate, CartItemUpdate
+from app.schemas import CartItemCreate, CartItemUpdate, CartItemOperation
+from app.crud.cart import ensure_cart, get_or_create_cart
+from app.cache import invalidate_cart
+
+
+# ✅ INSERT ... SELECT ... ON CONFLICT DO UPDATE for one cart line
+# `source` yields (cart_id, product_id, quantity); it selects nothing when the
+# product is missing or inactive, in which case no row comes back.
+def _upsert_cart_line(db: Session, insert, source) -> Optional[CartItem]:
+    stmt = insert(CartItem).from_select(["cart_id", "product_id", "quantity"], source)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CartItem.cart_id, CartItem.product_id],
+        set_={"quantity": CartItem.quantity + stmt.excluded.quantity},
+    ).returning(CartItem)
+    # populate_existing: refresh a line already in the session with the bumped quantity
+    return db.scalars(stmt, execution_options={"populate_existing": True}).first()
+
+
+def _active_product(product_id: int):
+    return and_(Product.id == product_id, Product.is_active == 1)
+
+
+# ✅ Add to the user's cart: cart creation, product check and line upsert in
+# one transaction (two statements + commit). Returns None if the product is
+# not available.
+def add_item_to_user_cart(db: Session, user_id: int, item: CartItemCreate) -> Optional[CartItem]:
+    insert = upsert_insert(db)
+    if insert is None:
+        return add_item_to_cart(db, get_or_create_cart(db, user_id).id, item)
+
+    ensure_cart(db, user_id)
+    source = select(Cart.id, Product.id, literal(item.quantity))\
+        .select_from(Cart)\
+        .join(Product, _active_product(item.product_id))\
+        .where(Cart.user_id == user_id)
+    db_item = _upsert_cart_line(db, insert, source)
+    if db_item is None:
+        db.rollback()
+        return None
+    db.commit()
+    invalidate_cart(user_id=user_id)
+    return db_item
 
 
 # ✅ Add item to cart
 def add_item_to_cart(db: Session, cart_id: int, item:  CartItemCreate) -> Optional[CartItem]: 
+    insert = upsert_insert(db)
+    if insert is not None:
+        source = select(literal(cart_id), Product.id, literal(item.quantity))\
+            .where(_active_product(item.product_id))
+        db_item = _upsert_cart_line(db, insert, source)
+        if db_item is None:
+            db.rollback()
+            return None
+        db.commit()
+        invalidate_cart(cart_id=cart_id)
+        return db_item
+
+    # No native upsert: look up, then insert; a racing insert of the same
+    # line trips the unique index and is retried as an update
     # Check if product exists and is active
     product = db.query(Product).filter(
         Product.id == item.product_id,
@@ -24,6 +82,7 @@ def add_item_to_cart(db: Session, cart_id: int, item:  CartItemCreate) -> Option
         # Update quantity if item exists
         existing_item.quantity += item.quantity
         db.commit()
+        invalidate_cart(cart_id=cart_id)
         db.refresh(existing_item)
         return existing_item
     
@@ -34,7 +93,19 @@ def add_item_to_cart(db: Session, cart_id: int, item:  CartItemCreate) -> Option
         quantity=item.quantity,
     )
     db.add(db_item)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        existing_item = get_cart_item_by_product(db, cart_id, item.product_id)
+        if not existing_item:
+            raise
+        existing_item.quantity += item.quantity
+        db.commit()
+        invalidate_cart(cart_id=cart_id)
+        db.refresh(existing_item)
+        return existing_item
+    invalidate_cart(cart_id=cart_id)
     db.refresh(db_item)
     return db_item
 
@@ -44,6 +115,14 @@ def get_cart_item_by_id(db: Session, item_id: int) -> Optional[CartItem]:
     return db.query(CartItem).filter(CartItem.id == item_id).first()
 
 
+# ✅ Owner (user id) of a cart item, in one query; None if the item doesn't exist
+def get_cart_item_owner(db: Session, item_id: int) -> Optional[int]:
+    return db.query(Cart.user_id)\
+        .join(CartItem, CartItem.cart_id == Cart.id)\
+        .filter(CartItem.id == item_id)\
+        .scalar()
+
+
 # ✅ Get cart item by cart and product
 def get_cart_item_by_product(db: Session, cart_id: int, product_id:  int) -> Optional[CartItem]:
     return db.query(CartItem).filter(
@@ -66,6 +145,7 @@ def update_cart_item(db: Session, item_id: int, item_data: CartItemUpdate) -> Op
     db_item.quantity = item_data.quantity
     db.commit()
     db.refresh(db_item)
+    invalidate_cart(cart_id=db_item.cart_id)
     return db_item
 
 
@@ -78,6 +158,7 @@ def update_cart_item_by_product(db:  Session, cart_id: int, product_id: int, qua
     db_item.quantity = quantity
     db.commit()
     db.refresh(db_item)
+    invalidate_cart(cart_id=db_item.cart_id)
     return db_item
 
 
@@ -87,8 +168,10 @@ def remove_cart_item(db:  Session, item_id: int) -> bool:
     if not db_item:
         return False
     
+    cart_id = db_item.cart_id
     db.delete(db_item)
     db.commit()
+    invalidate_cart(cart_id=cart_id)
     return True
 
 
@@ -100,6 +183,7 @@ def remove_cart_item_by_product(db: Session, cart_id:  int, product_id: int) ->
     
     db.delete(db_item)
     db.commit()
+    invalidate_cart(cart_id=cart_id)
     return True
 
 
@@ -112,6 +196,7 @@ def increase_quantity(db: Session, item_id: int, amount: int = 1) -> Optional[Ca
     db_item.quantity += amount
     db.commit()
     db.refresh(db_item)
+    invalidate_cart(cart_id=db_item.cart_id)
     return db_item
 
 
@@ -124,10 +209,116 @@ def decrease_quantity(db: Session, item_id: int, amount: int = 1) -> Optional[Ca
     db_item.quantity -= amount
     
     if db_item.quantity <= 0:
+        cart_id = db_item.cart_id
         db.delete(db_item)
         db.commit()
+        invalidate_cart(cart_id=cart_id)
         return None
     
     db.commit()
     db.refresh(db_item)
-    return db_item
\ No newline at end of file
+    invalidate_cart(cart_id=db_item.cart_id)
+    return db_item
+
+
+# Net effect of a batch on each product, applying operations in order:
+# ("add", n) bumps the line by n, ("set", n) makes it exactly n (0 = gone)
+def fold_cart_operations(operations: Iterable[CartItemOperation]) -> dict:
+    net = {}
+    for operation in operations:
+        current = net.get(operation.product_id)
+        if operation.op == "remove":
+            net[operation.product_id] = ("set", 0)
+        elif operation.op == "set":
+            net[operation.product_id] = ("set", operation.quantity)
+        elif current is None:
+            net[operation.product_id] = ("add", operation.quantity)
+        else:
+            net[operation.product_id] = (current[0], current[1] + operation.quantity)
+    return net
+
+
+# ✅ Apply a batch of add/set/remove operations to the user's cart in one
+# transaction: at most one DELETE and two INSERT ... ON CONFLICT statements,
+# however many operations there are. Returns the product ids that were
+# skipped because the product is missing or inactive.
+def apply_cart_operations(db: Session, user_id: int, operations: list[CartItemOperation]) -> list[int]:
+    net = fold_cart_operations(operations)
+    removed = [product_id for product_id, (kind, quantity) in net.items() if kind == "set" and quantity == 0]
+    added = {product_id: quantity for product_id, (kind, quantity) in net.items() if kind == "add"}
+    replaced = {product_id: quantity for product_id, (kind, quantity) in net.items() if kind == "set" and quantity > 0}
+
+    insert = upsert_insert(db)
+    if insert is None:
+        return _apply_cart_operations_orm(db, user_id, removed, added, replaced)
+
+    ensure_cart(db, user_id)
+    user_cart = select(Cart.id).where(Cart.user_id == user_id).scalar_subquery()
+    if removed:
+        db.query(CartItem)\
+            .filter(CartItem.cart_id == user_cart, CartItem.product_id.in_(removed))\
+            .delete(synchronize_session=False)
+
+    applied = set()
+    for quantities, replace in ((added, False), (replaced, True)):
+        if not quantities:
+            continue
+        source = select(Cart.id, Product.id, case(quantities, value=Product.id))\
+            .select_from(Cart)\
+            .join(Product, and_(Product.id.in_(list(quantities)), Product.is_active == 1))\
+            .where(Cart.user_id == user_id)
+        stmt = insert(CartItem).from_select(["cart_id", "product_id", "quantity"], source)
+        new_quantity = stmt.excluded.quantity if replace else CartItem.quantity + stmt.excluded.quantity
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CartItem.cart_id, CartItem.product_id],
+            set_={"quantity": new_quantity},
+        ).returning(CartItem.product_id)
+        applied.update(db.scalars(stmt).all())
+
+    db.commit()
+    invalidate_cart(user_id=user_id)
+    return sorted((set(added) | set(replaced)) - applied)
+
+
+# Backends without native upsert: ORM edits, one SELECT per table and one commit
+def _apply_cart_operations_orm(db: Session, user_id: int, removed, added, replaced) -> list[int]:
+    cart = get_or_create_cart(db, user_id)
+    wanted = set(added) | set(replaced)
+    available = {
+        product_id for (product_id,) in
+        db.query(Product.id).filter(Product.id.in_(wanted), Product.is_active == 1)
+    } if wanted else set()
+    lines = {
+        line.product_id: line for line in
+        db.query(CartItem).filter(CartItem.cart_id == cart.id, CartItem.product_id.in_(set(removed) | wanted))
+    }
+
+    for product_id in removed:
+        if product_id in lines:
+            db.delete(lines[product_id])
+    for quantities, replace in ((added, False), (replaced, True)):
+        for product_id, quantity in quantities.items():
+            if product_id not in available:
+                continue
+            line = lines.get(product_id)
+            if line is None:
+                db.add(CartItem(cart_id=cart.id, product_id=product_id, quantity=quantity))
+            else:
+                line.quantity = quantity if replace else line.quantity + quantity
+
+    db.commit()
+    invalidate_cart(user_id=user_id)
+    return sorted(wanted - available)
+
+
+# ✅ Merge a guest cart ({product_id: quantity}) into the user's cart at login:
+# quantities add onto existing lines, in the same set-based upsert as a batch.
+# Returns the product ids that were skipped as unavailable.
+def merge_guest_cart(db: Session, user_id: int, lines: dict[int, int]) -> list[int]:
+    if not lines:
+        return []
+    operations = [
+        CartItemOperation(op="add", product_id=product_id, quantity=quantity)
+        for product_id, quantity in lines.items()
+    ]
+    return apply_cart_operations(db, user_id, operations)
@@ -1,7 +1,10 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import func
 from typing import Optional
 from app.models import Category
-from app.schemas import CategoryCreate, CategoryUpdate
+from app.schemas import CategoryCreate, CategoryUpdate, CategoryResponse
+from app.cache import category_cache, invalidate_categories
+from app.pagination import decode_cursor, encode_cursor, keyset_after
 
 
 # ✅ Create category
@@ -14,6 +17,7 @@ def create_category(db: Session, category: CategoryCreate) -> Category:
     db.add(db_category)
     db.commit()
     db.refresh(db_category)
+    invalidate_categories()
     return db_category
 
 
@@ -22,14 +26,55 @@ def get_category_by_id(db: Session, category_id: int) -> Optional[Category]:
     return db.query(Category).filter(Category.id == category_id).first()
 
 
+# ✅ Cached category detail (CategoryResponse dict, None if missing)
+def get_category_cached(db: Session, category_id: int) -> Optional[dict]:
+    def load():
+        db_category = get_category_by_id(db, category_id)
+        return CategoryResponse.model_validate(db_category).model_dump() if db_category else None
+
+    return category_cache.get_or_load(("category", category_id), load)
+
+
 # ✅ Get category by name
 def get_category_by_name(db: Session, name: str) -> Optional[Category]: 
     return db.query(Category).filter(Category.name == name).first()
 
 
 # ✅ Get all categories
-def get_all_categories(db: Session, skip: int = 0, limit: int = 100) -> list[Category]: 
-    return db.query(Category).offset(skip).limit(limit).all()
+def get_all_categories(db: Session, skip: int = 0, limit: int = 100, after: Optional[str] = None) -> list[Category]: 
+    query = db.query(Category)
+    if after:
+        query = query.filter(keyset_after([(Category.id, False)], decode_cursor(after, "categories", (int,))))
+    return query.order_by(Category.id).offset(skip).limit(limit).all()
+
+
+# ✅ Cursor for the page ending at `category`
+def category_cursor(category: Category) -> str:
+    return encode_cursor("categories", [category.id])
+
+
+# ✅ Cached category list page: {"items": [CategoryResponse dict], "next_cursor": str | None}
+def get_all_categories_cached(db: Session, skip: int = 0, limit: int = 100, after: Optional[str] = None) -> dict:
+    def load():
+        categories = get_all_categories(db, skip=skip, limit=limit, after=after)
+        return {
+            "items": [CategoryResponse.model_validate(c).model_dump() for c in categories],
+            "next_cursor": category_cursor(categories[-1]) if categories and len(categories) == limit else None,
+        }
+
+    return category_cache.get_or_load(("list", skip, limit, after), load)
+
+
+# ✅ Version of the category listing: (max updated_at, max version, row count)
+def get_categories_version(db: Session) -> tuple:
+    last_modified, version, count = db.query(
+        func.max(Category.updated_at), func.max(Category.version), func.count(Category.id)
+    ).one()
+    return last_modified, version, count
+
+
+def get_categories_version_cached(db: Session) -> tuple:
+    return category_cache.get_or_load(("version",), lambda: get_categories_version(db))
 
 
 # ✅ Update category
@@ -41,12 +86,29 @@ def update_category(db: Session, category_id:  int, category_data: CategoryUpdat
     update_data = category_data.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_category, key, value)
+    if "image_url" in update_data:
+        db_category.image_variants = None  # rebuilt for the new image
     
     db.commit()
     db.refresh(db_category)
+    invalidate_categories()
     return db_category
 
 
+# ✅ Store derivative image URLs, unless the image was replaced meanwhile
+def set_category_image_variants(db: Session, category_id: int, image_url: str, variants: dict) -> bool:
+    db_category = db.query(Category)\
+        .filter(Category.id == category_id, Category.image_url == image_url)\
+        .first()
+    if not db_category:
+        return False
+
+    db_category.image_variants = variants
+    db.commit()
+    invalidate_categories()
+    return True
+
+
 # ✅ Delete category
 def delete_category(db: Session, category_id: int) -> bool:
     db_category = get_category_by_id(db, category_id)
@@ -55,6 +117,7 @@ def delete_category(db: Session, category_id: int) -> bool:
     
     db.delete(db_category)
     db.commit()
+    invalidate_categories()
     return True
 
 
@@ -0,0 +1,84 @@
+from sqlalchemy import select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime, timedelta
+from app.config import settings
+from app.models import IdempotencyKey
+
+
+# ✅ Claim (user_id, key) for a new request
+# Returns None when the caller now owns the key and must run the request,
+# otherwise the existing row (finished, or still running elsewhere). An
+# expired row, finished or abandoned mid-request, is replaced.
+def claim_idempotency_key(db: Session, user_id: int, key: str, fingerprint: str) -> Optional[IdempotencyKey]:
+    now = datetime.utcnow()
+    for _ in range(2):
+        db.add(IdempotencyKey(
+            user_id=user_id,
+            key=key,
+            fingerprint=fingerprint,
+            expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS),
+        ))
+        try:
+            db.commit()
+            return None
+        except IntegrityError:
+            db.rollback()
+
+        existing = db.get(IdempotencyKey, (user_id, key), populate_existing=True)
+        if existing is None:
+            continue  # Deleted in between; try again
+        if existing.expires_at > now:
+            db.expunge(existing)
+            return existing
+        deleted = db.query(IdempotencyKey).filter(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key,
+            IdempotencyKey.expires_at <= now,
+        ).delete(synchronize_session=False)
+        db.commit()
+        if not deleted:
+            # Someone else replaced it first
+            return db.get(IdempotencyKey, (user_id, key), populate_existing=True)
+    return None
+
+
+# ✅ Store the response of a claimed key and keep it for IDEMPOTENCY_TTL_SECONDS
+def save_idempotent_response(db: Session, user_id: int, key: str, status_code: int, body, headers: Optional[dict] = None) -> None:
+    db.query(IdempotencyKey)\
+        .filter(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)\
+        .update({
+            IdempotencyKey.status_code: status_code,
+            IdempotencyKey.response_body: body,
+            IdempotencyKey.response_headers: headers or None,
+            IdempotencyKey.expires_at: datetime.utcnow() + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS),
+        }, synchronize_session=False)
+    db.commit()
+
+
+# ✅ Give a claimed key back (the request failed without a response worth replaying)
+def release_idempotency_key(db: Session, user_id: int, key: str) -> None:
+    db.rollback()  # Whatever the failed request left open
+    db.query(IdempotencyKey)\
+        .filter(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key, IdempotencyKey.status_code.is_(None))\
+        .delete(synchronize_session=False)
+    db.commit()
+
+
+# ✅ Delete expired keys, `batch_size` rows per statement, one commit per batch
+def expire_idempotency_keys(db: Session, batch_size: int) -> int:
+    now = datetime.utcnow()
+    deleted = 0
+    while True:
+        expired = select(IdempotencyKey.user_id, IdempotencyKey.key)\
+            .where(IdempotencyKey.expires_at <= now)\
+            .order_by(IdempotencyKey.expires_at)\
+            .limit(batch_size)
+        count = db.query(IdempotencyKey)\
+            .filter(tuple_(IdempotencyKey.user_id, IdempotencyKey.key).in_(expired))\
+            .delete(synchronize_session=False)
+        db.commit()
+        deleted += count
+        if count < batch_size:
+            return deleted
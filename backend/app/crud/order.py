@@ -1,102 +1,362 @@
+from sqlalchemy import case, func, insert, select, union_all, update
 from sqlalchemy.orm import Session, joinedload
-from typing import Optional
+from typing import Iterator, Optional
 from decimal import Decimal
 from datetime import datetime
-from app.models import Order, OrderItem, Cart, CartItem
+from app.config import settings
+from app.models import Order, OrderItem, OrderArchive, OrderItemArchive, Cart, CartItem, Product, StockReservation
 from app.schemas import OrderStatus
+from app.pagination import decode_cursor, encode_cursor, keyset_after
+from app.cache import invalidate_products, invalidate_cart
+from app.crud.reservation import held_by_other_carts
+from app.crud.sales import get_sales_lines, record_sales
+
+
+class InsufficientStockError(Exception):
+    """Checkout found lines the stock can't cover; nothing was written.
+    `items` is [{"product_id", "requested", "available"}, ...]."""
+
+    def __init__(self, items: list[dict]):
+        super().__init__("Insufficient stock")
+        self.items = items
+
+
+# Allowed next statuses for each status; delivered and cancelled are final
+ORDER_STATUS_TRANSITIONS: dict[OrderStatus, set[OrderStatus]] = {
+    OrderStatus.PENDING: {OrderStatus.CONFIRMED, OrderStatus.CANCELLED},
+    OrderStatus.CONFIRMED: {OrderStatus.SHIPPED, OrderStatus.CANCELLED},
+    OrderStatus.SHIPPED: {OrderStatus.DELIVERED},
+    OrderStatus.DELIVERED: set(),
+    OrderStatus.CANCELLED: set(),
+}
+
+
+# Statuses an order may move to `status` from
+def status_predecessors(status: OrderStatus) -> list[str]:
+    return [current.value for current, following in ORDER_STATUS_TRANSITIONS.items() if status in following]
+
+
+# Units of each product a checkout may take: stock, less what other carts hold
+def _checkout_available(cart_id: int, now: datetime):
+    if settings.STOCK_RESERVATIONS_ENABLED:
+        return Product.stock - held_by_other_carts(cart_id, now)
+    return Product.stock
+
+
+def _short_items(db: Session, cart_id: int, lines: dict[int, int]) -> list[dict]:
+    available = dict(
+        db.query(Product.id, _checkout_available(cart_id, datetime.utcnow()))
+        .filter(Product.id.in_(list(lines)))
+    )
+    return [
+        {"product_id": product_id, "requested": quantity, "available": max(available.get(product_id, 0), 0)}
+        for product_id, quantity in sorted(lines.items())
+        if available.get(product_id, 0) < quantity
+    ]
 
 
 # ✅ Create order from cart
-def create_order_from_cart(db: Session, user_id: int) -> Optional[Order]:
-    # Get user's cart
-    cart = db.query(Cart).filter(Cart.user_id == user_id).first()
-    if not cart or not cart.items:
+# Returns {id, user_id, status, total_amount, order_date}, or None for an
+# empty cart. A fixed handful of statements whatever the cart size:
+#   1. cart lines + product prices in one query, product rows locked in id
+#      order, so concurrent checkouts over the same products queue instead
+#      of deadlocking
+#   2. one conditional UPDATE (stock = stock - q WHERE stock >= q) over all
+#      lines; if any line is short, nothing is written and
+#      InsufficientStockError lists the short lines
+#   3. INSERT ... RETURNING for the order, one executemany for its items
+#   4. sales rollups bumped (app/crud/sales.py)
+#   5. cart lines and stock holds deleted, one commit
+def create_order_from_cart(db: Session, user_id: int) -> Optional[dict]:
+    rows = db.query(CartItem.cart_id, CartItem.product_id, CartItem.quantity, Product.price, Product.category_id)\
+        .join(Cart, Cart.id == CartItem.cart_id)\
+        .join(Product, Product.id == CartItem.product_id)\
+        .filter(Cart.user_id == user_id)\
+        .order_by(Product.id)\
+        .with_for_update(of=Product)\
+        .all()
+    if not rows:
         return None
-    
+
+    cart_id = rows[0].cart_id
+    lines = {row.product_id: row.quantity for row in rows}
+
+    # Reduce product stock, all lines or none
+    quantity = case(lines, value=Product.id)
+    taken = db.query(Product)\
+        .filter(Product.id.in_(list(lines)), _checkout_available(cart_id, datetime.utcnow()) >= quantity)\
+        .update({Product.stock: Product.stock - quantity}, synchronize_session=False)
+    if taken != len(lines):
+        db.rollback()
+        raise InsufficientStockError(_short_items(db, cart_id, lines))
+
     # Calculate total amount
-    total_amount = Decimal("0.00")
-    for item in cart.items:
-        total_amount += item.product.price * item.quantity
-    
+    total_amount = sum((row.price * row.quantity for row in rows), Decimal("0.00"))
+
     # Create order
-    db_order = Order(
-        user_id=user_id,
-        status="pending",
-        total_amount=total_amount,
-        order_date=datetime.utcnow(),
-    )
-    db.add(db_order)
-    db.flush()  # Get order ID without committing
-    
-    # Create order items from cart items
-    for cart_item in cart.items:
-        order_item = OrderItem(
-            order_id=db_order.id,
-            product_id=cart_item.product_id,
-            quantity=cart_item.quantity,
-            unit_price=cart_item.product.price,
-            subtotal=cart_item.product.price * cart_item.quantity,
-        )
-        db.add(order_item)
-        
-        # Reduce product stock
-        cart_item.product.stock -= cart_item.quantity
-    
-    # Clear cart
-    db.query(CartItem).filter(CartItem.cart_id == cart.id).delete()
-    
+    order = db.execute(
+        insert(Order)
+        .values(user_id=user_id, status="pending", total_amount=total_amount, order_date=datetime.utcnow())
+        .returning(Order.id, Order.user_id, Order.status, Order.total_amount, Order.order_date)
+    ).one()._asdict()
+
+    # Create order items from cart lines
+    db.execute(insert(OrderItem), [
+        {
+            "order_id": order["id"],
+            "product_id": row.product_id,
+            "category_id": row.category_id,
+            "quantity": row.quantity,
+            "unit_price": row.price,
+            "subtotal": row.price * row.quantity,
+        }
+        for row in rows
+    ])
+    record_sales(db, [
+        (order["id"], order["order_date"], row.product_id, row.category_id, row.quantity, row.price * row.quantity)
+        for row in rows
+    ])
+
+    # Clear cart; its stock holds are now real decrements
+    db.query(CartItem).filter(CartItem.cart_id == cart_id).delete(synchronize_session=False)
+    db.query(StockReservation).filter(StockReservation.cart_id == cart_id).delete(synchronize_session=False)
+
     db.commit()
-    db.refresh(db_order)
-    return db_order
+    invalidate_products([(row.product_id, row.category_id) for row in rows])
+    invalidate_cart(user_id=user_id)
+    return order
+
+
+# Hot tables first, then the archive (see app/crud/archive.py). Readers
+# only look at the archive when asked for history.
+ORDER_TABLES = [(Order, OrderItem), (OrderArchive, OrderItemArchive)]
+
+
+def _order_tables(include_history: bool) -> list:
+    return ORDER_TABLES if include_history else ORDER_TABLES[:1]
 
 
-# ✅ Get order by ID
-def get_order_by_id(db:  Session, order_id: int) -> Optional[Order]:
-    return db.query(Order).filter(Order.id == order_id).first()
+# First row found across the order tables (hot first)
+def _first_order(build, include_history: bool):
+    for order_model, item_model in _order_tables(include_history):
+        row = build(order_model, item_model).first()
+        if row is not None:
+            return row
+    return None
+
+
+# ✅ Get order by ID (an OrderArchive row if it was archived and
+# include_history is set)
+def get_order_by_id(db:  Session, order_id: int, include_history: bool = False) -> Optional[Order]:
+    return _first_order(
+        lambda order_model, _: db.query(order_model).filter(order_model.id == order_id),
+        include_history,
+    )
 
 
 # ✅ Get order by ID with user check
-def get_order_by_id_and_user(db:  Session, order_id: int, user_id: int) -> Optional[Order]: 
-    return db.query(Order).filter(
-        Order.id == order_id,
-        Order.user_id == user_id
-    ).first()
+def get_order_by_id_and_user(db:  Session, order_id: int, user_id: int, include_history: bool = False) -> Optional[Order]: 
+    return _first_order(
+        lambda order_model, _: db.query(order_model).filter(
+            order_model.id == order_id,
+            order_model.user_id == user_id
+        ),
+        include_history,
+    )
+
+
+# Newest first; id breaks ties between orders placed in the same instant
+def _order_sort(order_model) -> list:
+    return [(order_model.order_date, True), (order_model.id, True)]
+
+
+def _order_page(query, skip: int, limit: int, after: Optional[str], order_model=Order):
+    if after:
+        query = query.filter(keyset_after(_order_sort(order_model), decode_cursor(after, "orders", (datetime, int))))
+    return query.order_by(order_model.order_date.desc(), order_model.id.desc()).offset(skip).limit(limit)
+
+
+# One page over the hot tables or, with history, over hot and archive:
+# each table gives its first skip + limit rows past the cursor and the
+# merge keeps the same newest-first order, so cursors work across both.
+def _order_history_page(build, skip: int, limit: int, after: Optional[str], include_history: bool) -> list:
+    if not include_history:
+        return _order_page(build(Order, OrderItem), skip, limit, after).all()
+    rows = []
+    for order_model, item_model in ORDER_TABLES:
+        rows += _order_page(build(order_model, item_model), 0, skip + limit, after, order_model).all()
+    rows.sort(key=lambda row: (row.order_date, row.id), reverse=True)
+    return rows[skip:skip + limit]
+
 
+# ✅ Cursor for the page ending at `order`
+def order_cursor(order: Order) -> str:
+    return encode_cursor("orders", [order.order_date, order.id])
 
-def get_user_orders(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> list[Order]:
-    return (
-        db.query(Order)
+
+def get_user_orders(
+    db: Session, user_id: int, skip: int = 0, limit: int = 100, after: Optional[str] = None, include_history: bool = False
+) -> list[Order]:
+    return _order_history_page(
+        lambda order_model, item_model: db.query(order_model)
         .options(
-            joinedload(Order.items).joinedload(OrderItem.product)
+            joinedload(order_model.items).joinedload(item_model.product)
         )
-        .filter(Order.user_id == user_id)
-        .order_by(Order.order_date.desc())
-        .offset(skip).limit(limit)
-        .all()
+        .filter(order_model.user_id == user_id),
+        skip, limit, after, include_history,
+    )
+
+# ✅ Order list rows for the orders page, in one grouped query:
+# {id, status, total_amount, order_date, line_count, items_count}
+# (items_count = units ordered). Same ordering and cursors as get_user_orders.
+def get_user_order_summaries(
+    db: Session, user_id: int, skip: int = 0, limit: int = 100, after: Optional[str] = None, include_history: bool = False
+) -> list[dict]:
+    rows = _order_history_page(
+        lambda order_model, item_model: db.query(
+            order_model.id,
+            order_model.status,
+            order_model.total_amount,
+            order_model.order_date,
+            func.count(item_model.id).label("line_count"),
+            func.coalesce(func.sum(item_model.quantity), 0).label("items_count"),
+        )
+        .outerjoin(item_model, item_model.order_id == order_model.id)
+        .filter(order_model.user_id == user_id)
+        .group_by(order_model.id, order_model.status, order_model.total_amount, order_model.order_date),
+        skip, limit, after, include_history,
     )
+    return [row._asdict() for row in rows]
+
+
+# ✅ Cursor for the page ending at an order summary row
+def order_summary_cursor(summary: dict) -> str:
+    return encode_cursor("orders", [summary["order_date"], summary["id"]])
+
 
 # ✅ Get all orders (admin)
-def get_all_orders(db:  Session, skip: int = 0, limit: int = 100) -> list[Order]: 
-    return db.query(Order).order_by(Order.order_date.desc()).offset(skip).limit(limit).all()
+def get_all_orders(
+    db:  Session, skip: int = 0, limit: int = 100, after: Optional[str] = None, include_history: bool = False
+) -> list[Order]: 
+    return _order_history_page(lambda order_model, _: db.query(order_model), skip, limit, after, include_history)
 
 
 # ✅ Get orders by status
-def get_orders_by_status(db: Session, status: str, skip: int = 0, limit: int = 100) -> list[Order]: 
-    return db.query(Order).filter(
-        Order.status == status
-    ).order_by(Order.order_date.desc()).offset(skip).limit(limit).all()
+def get_orders_by_status(
+    db: Session, status: str, skip: int = 0, limit: int = 100, after: Optional[str] = None, include_history: bool = False
+) -> list[Order]: 
+    return _order_history_page(
+        lambda order_model, _: db.query(order_model).filter(order_model.status == status),
+        skip, limit, after, include_history,
+    )
 
 
-# ✅ Update order status
-def update_order_status(db: Session, order_id: int, status: str) -> Optional[Order]:
-    db_order = get_order_by_id(db, order_id)
-    if not db_order: 
-        return None
-    
-    db_order.status = status
+def _order_filter_clauses(filters: dict) -> list:
+    clauses = []
+    if filters.get("status") is not None:
+        clauses.append(Order.status == filters["status"])
+    if filters.get("user_id") is not None:
+        clauses.append(Order.user_id == filters["user_id"])
+    if filters.get("placed_after") is not None:
+        clauses.append(Order.order_date >= filters["placed_after"])
+    if filters.get("placed_before") is not None:
+        clauses.append(Order.order_date < filters["placed_before"])
+    return clauses
+
+
+# Put the units of the given orders back in stock: one UPDATE ... FROM over
+# the orders' lines summed per product. Returns (product_id, category_id)
+# of the products touched.
+def _restore_order_stock(db: Session, order_ids: list[int]) -> list[tuple[int, Optional[int]]]:
+    lines = db.query(OrderItem.product_id, func.sum(OrderItem.quantity).label("quantity"))\
+        .filter(OrderItem.order_id.in_(order_ids))\
+        .group_by(OrderItem.product_id)\
+        .subquery()
+    return db.execute(
+        update(Product)
+        .where(Product.id == lines.c.product_id)
+        .values(stock=Product.stock + lines.c.quantity)
+        .returning(Product.id, Product.category_id)
+    ).all()
+
+
+# Order ids per IN (...) list when a bulk update follows up on the rows it
+# moved; a filter can match any number of orders, and every id is a bound
+# parameter
+_ID_CHUNK = 500
+
+
+def _chunks(ids: list[int]) -> Iterator[list[int]]:
+    for start in range(0, len(ids), _ID_CHUNK):
+        yield ids[start:start + _ID_CHUNK]
+
+
+# ✅ Move orders to `status` (admin), by ids or by filter
+# One UPDATE ... WHERE <ids or filter> AND status IN (allowed predecessors)
+# RETURNING id; cancelling also restores the stock of every cancelled order
+# per chunk of _ID_CHUNK orders. Returns {"status", "updated": [ids], "rejected":
+# [{"id", "reason", "current_status"}]}; rejected ids are those not found
+# or whose current status can't move to `status`.
+def bulk_update_order_status(
+    db: Session,
+    status: OrderStatus,
+    order_ids: Optional[list[int]] = None,
+    filters: Optional[dict] = None,
+) -> dict:
+    status = OrderStatus(status)
+    predecessors = status_predecessors(status)
+    scope = [Order.id.in_(order_ids)] if order_ids is not None else _order_filter_clauses(filters or {})
+
+    # With a filter, the rows that won't move are read before they are mixed
+    # with the ones that did; with ids, the leftovers are read afterwards
+    blocked = []
+    if order_ids is None:
+        blocked = db.query(Order.id, Order.status)\
+            .filter(*scope, Order.status.notin_(predecessors))\
+            .order_by(Order.id)\
+            .all()
+
+    updated = sorted(db.execute(
+        update(Order)
+        .where(*scope, Order.status.in_(predecessors))
+        .values(status=status.value)
+        .returning(Order.id)
+    ).scalars())
+
+    touched = []
+    if status == OrderStatus.CANCELLED:
+        for chunk in _chunks(updated):
+            touched += _restore_order_stock(db, chunk)
+            record_sales(db, get_sales_lines(db, chunk), -1)
+
+    if order_ids is not None:
+        leftover = sorted(set(order_ids) - set(updated))
+        found = {}
+        for chunk in _chunks(leftover):
+            found.update(db.query(Order.id, Order.status).filter(Order.id.in_(chunk)))
+        blocked = [(order_id, found.get(order_id)) for order_id in leftover]
     db.commit()
-    db.refresh(db_order)
-    return db_order
+    invalidate_products(touched)
+
+    rejected = []
+    for order_id, current in blocked:
+        if current is None:
+            reason = "not found"
+        elif current == status.value:
+            reason = f"already {current}"
+        else:
+            reason = f"cannot move from {current} to {status.value}"
+        rejected.append({"id": order_id, "reason": reason, "current_status": current})
+    return {"status": status, "updated": updated, "rejected": rejected}
+
+
+# ✅ Update order status (only along ORDER_STATUS_TRANSITIONS)
+# None if the order doesn't exist or can't move to `status`.
+def update_order_status(db: Session, order_id: int, status: OrderStatus) -> Optional[Order]:
+    result = bulk_update_order_status(db, status, [order_id])
+    if not result["updated"]:
+        return None
+    return get_order_by_id(db, order_id)
 
 
 # ✅ Cancel order
@@ -105,23 +365,29 @@ def cancel_order(db: Session, order_id:  int, user_id: int) -> Optional[Order]:
     if not db_order:
         return None
     
-    # Only cancel if pending or confirmed
-    if db_order.status not in ["pending", "confirmed"]:
+    # Only cancel if pending or confirmed; the status flip is conditional so
+    # two concurrent cancels can't both restore stock
+    cancelled = db.query(Order)\
+        .filter(Order.id == order_id, Order.status.in_(status_predecessors(OrderStatus.CANCELLED)))\
+        .update({Order.status: "cancelled"}, synchronize_session=False)
+    if not cancelled:
+        db.rollback()
         return None
     
-    # Restore product stock
-    for item in db_order.items:
-        item.product.stock += item.quantity
+    # Restore product stock (set-based increment, no read-modify-write) and
+    # take the order out of the sales rollups with the lines checkout recorded
+    touched = _restore_order_stock(db, [order_id])
+    record_sales(db, get_sales_lines(db, [order_id]), -1)
     
-    db_order.status = "cancelled"
     db.commit()
+    invalidate_products(touched)
     db.refresh(db_order)
     return db_order
 
 
 # ✅ Get order with items
-def get_order_with_items(db: Session, order_id: int) -> Optional[dict]:
-    db_order = get_order_by_id(db, order_id)
+def get_order_with_items(db: Session, order_id: int, include_history: bool = False) -> Optional[dict]:
+    db_order = get_order_by_id(db, order_id, include_history)
     if not db_order: 
         return None
     
@@ -154,9 +420,65 @@ def get_order_with_items(db: Session, order_id: int) -> Optional[dict]:
     }
 
 
+# ✅ Order detail for its owner, in one query; None if the order doesn't
+# exist or belongs to someone else. Column-level select over orders,
+# order_items and products (one row per line); same shape as
+# get_order_with_items. With include_history the hot and archive selects
+# go out as one UNION ALL (an order lives in exactly one of them).
+def get_user_order_detail(db: Session, order_id: int, user_id: int, include_history: bool = False) -> Optional[dict]:
+    selects = [
+        select(
+            order_model.id, order_model.user_id, order_model.status, order_model.total_amount,
+            order_model.order_date, order_model.created_at, order_model.updated_at,
+            item_model.id.label("item_id"), item_model.product_id, item_model.quantity,
+            item_model.unit_price, item_model.subtotal,
+            Product.name.label("product_name"), Product.price.label("product_price"),
+            Product.sku.label("product_sku"), Product.image_url.label("product_image_url"),
+        )
+        .select_from(order_model)
+        .outerjoin(item_model, item_model.order_id == order_model.id)
+        .outerjoin(Product, Product.id == item_model.product_id)
+        .where(order_model.id == order_id, order_model.user_id == user_id)
+        for order_model, item_model in _order_tables(include_history)
+    ]
+    lines = (union_all(*selects) if len(selects) > 1 else selects[0]).subquery()
+    rows = db.execute(select(lines).order_by(lines.c.item_id)).all()
+    if not rows:
+        return None
+
+    order = rows[0]
+    items = [
+        {
+            "id": row.item_id,
+            "product_id": row.product_id,
+            "quantity": row.quantity,
+            "unit_price": row.unit_price,
+            "subtotal": row.subtotal,
+            "product": {
+                "id": row.product_id,
+                "name": row.product_name,
+                "price": row.product_price,
+                "sku": row.product_sku,
+                "image_url": row.product_image_url,
+            },
+        }
+        for row in rows if row.item_id is not None
+    ]
+    return {
+        "id": order.id,
+        "user_id": order.user_id,
+        "status": order.status,
+        "total_amount": order.total_amount,
+        "order_date": order.order_date,
+        "created_at": order.created_at,
+        "updated_at": order.updated_at,
+        "items": items,
+    }
+
+
 # ✅ Get order summary (list view)
-def get_order_summary(db: Session, order_id: int) -> Optional[dict]:
-    db_order = get_order_by_id(db, order_id)
+def get_order_summary(db: Session, order_id: int, include_history: bool = False) -> Optional[dict]:
+    db_order = get_order_by_id(db, order_id, include_history)
     if not db_order:
         return None
     
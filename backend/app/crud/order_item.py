@@ -16,6 +16,7 @@ def create_order_item(db: Session, order_id: int, item: OrderItemCreate) -> Opti
     db_item = OrderItem(
         order_id=order_id,
         product_id=item.product_id,
+        category_id=product.category_id,
         quantity=item.quantity,
         unit_price=product.price,
         subtotal=subtotal,
@@ -1,8 +1,12 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import or_, and_, case, cast, func, literal, Integer
 from typing import Optional, List
+from decimal import Decimal
 from app.models import Product
-from app.schemas import ProductCreate, ProductUpdate
+from app.schemas import ProductCreate, ProductUpdate, ProductResponse
+from app.cache import product_cache, product_list_cache, product_list_tag, invalidate_products, ALL_PRODUCTS_TAG
+from app.search import product_search_subquery
+from app.pagination import decode_cursor, encode_cursor, keyset_after
 
 
 def create_product(db: Session, product: ProductCreate) -> Product:
@@ -18,6 +22,7 @@ def create_product(db: Session, product: ProductCreate) -> Product:
     db.add(db_product)
     db.commit()
     db.refresh(db_product)
+    invalidate_products([(db_product.id, db_product.category_id)])
     return db_product
 
 
@@ -25,6 +30,15 @@ def get_product_by_id(db: Session, product_id: int) -> Optional[Product]:
     return db.query(Product).filter(Product.id == product_id).first()
 
 
+# ✅ Cached product detail (ProductResponse dict, None if missing)
+def get_product_cached(db: Session, product_id: int) -> Optional[dict]:
+    def load():
+        db_product = get_product_by_id(db, product_id)
+        return ProductResponse.model_validate(db_product).model_dump() if db_product else None
+
+    return product_cache.get_or_load(product_id, load)
+
+
 def get_product_by_sku(db: Session, sku: str) -> Optional[Product]:
     return db.query(Product).filter(Product.sku == sku).first()
 
@@ -41,19 +55,33 @@ def get_filtered_products(
     search: Optional[str] = None,
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
+    after: Optional[str] = None,
 ) -> List[Product]:
-    query = db.query(Product)
+    query, hits = _filter_products(db, db.query(Product), category_id, search, min_price, max_price)
+
+    # Relevance order when searching, otherwise id; the id tie-break keeps pages stable
+    if hits is None:
+        order_by = [(Product.id, False)]
+        if after:
+            query = query.filter(keyset_after(order_by, decode_cursor(after, "products", (int,))))
+        return query.order_by(Product.id).offset(skip).limit(limit).all()
+
+    order_by = [(hits.c.rank, True), (Product.id, False)]
+    if after:
+        query = query.filter(keyset_after(order_by, decode_cursor(after, "products:rank", (int, int))))
+    rows = query.add_columns(hits.c.rank).order_by(hits.c.rank.desc(), Product.id).offset(skip).limit(limit).all()
+    for product, rank in rows:
+        product.search_rank = rank
+    return [product for product, _ in rows]
 
+
+def _filter_products(db: Session, query, category_id, search, min_price, max_price):
     if category_id:
         query = query.filter(Product.category_id == category_id)
 
+    hits = None
     if search:
-        query = query.filter(
-            or_(
-                Product.name.ilike(f"%{search}%"),
-                Product.description.ilike(f"%{search}%"),
-            )
-        )
+        query, hits = _apply_search(db, query, search)
 
     if min_price is not None:
         query = query.filter(Product.price >= min_price)
@@ -61,7 +89,146 @@ def get_filtered_products(
     if max_price is not None:
         query = query.filter(Product.price <= max_price)
 
-    return query.offset(skip).limit(limit).all()
+    return query, hits
+
+
+# ✅ Version of a filtered listing: (max updated_at, max version, row count)
+# Changes whenever a matching product is added, edited or removed: an edit
+# or insert raises MAX(version), a removal lowers the count.
+def get_products_version(
+    db: Session,
+    category_id: Optional[int] = None,
+    search: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+) -> tuple:
+    query = db.query(func.max(Product.updated_at), func.max(Product.version), func.count(Product.id))
+    query, _ = _filter_products(db, query.select_from(Product), category_id, search, min_price, max_price)
+    last_modified, version, count = query.one()
+    return last_modified, version, count
+
+
+# ✅ Cached listing version; invalidated with the list pages it describes
+def get_products_version_cached(
+    db: Session,
+    category_id: Optional[int] = None,
+    search: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+) -> tuple:
+    return product_list_cache.get_or_load(
+        ("version", category_id, search, min_price, max_price),
+        lambda: get_products_version(db, category_id, search, min_price, max_price),
+        tags=[product_list_tag(category_id)],
+    )
+
+
+# ✅ Cursor for the page ending at `product` (see get_filtered_products)
+def product_cursor(product: Product) -> str:
+    rank = getattr(product, "search_rank", None)
+    if rank is None:
+        return encode_cursor("products", [product.id])
+    return encode_cursor("products:rank", [rank, product.id])
+
+
+# ✅ Cached product list page: {"items": [ProductResponse dict], "next_cursor": str | None}
+def get_filtered_products_cached(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    category_id: Optional[int] = None,
+    search: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    after: Optional[str] = None,
+) -> dict:
+    def load():
+        products = get_filtered_products(
+            db, skip=skip, limit=limit, category_id=category_id, search=search,
+            min_price=min_price, max_price=max_price, after=after,
+        )
+        return {
+            "items": [ProductResponse.model_validate(p).model_dump() for p in products],
+            "next_cursor": product_cursor(products[-1]) if products and len(products) == limit else None,
+        }
+
+    key = (skip, limit, category_id, search, min_price, max_price, after)
+    return product_list_cache.get_or_load(key, load, tags=[product_list_tag(category_id)])
+
+
+# ✅ Facet counts for a listing, from one grouped aggregate
+# Groups matching products by (category, price bucket, inside price range).
+# Category counts honour the price filter but not the category filter, and
+# bucket counts the reverse, so each facet shows the alternatives the
+# shopper can switch to. Cost does not grow with the number of facets.
+def get_product_facets(
+    db: Session,
+    category_id: Optional[int] = None,
+    search: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    bucket_size: float = 1000,
+) -> dict:
+    ratio = Product.price / bucket_size
+    if db.get_bind().dialect.name == "sqlite":
+        bucket = cast(ratio, Integer)  # prices are non-negative, so truncation == floor
+    else:
+        bucket = func.floor(ratio)
+
+    price_conditions = []
+    if min_price is not None:
+        price_conditions.append(Product.price >= min_price)
+    if max_price is not None:
+        price_conditions.append(Product.price <= max_price)
+    in_price = case((and_(*price_conditions), 1), else_=0) if price_conditions else literal(1)
+
+    query = db.query(
+        Product.category_id,
+        bucket.label("bucket"),
+        in_price.label("in_price"),
+        func.count(Product.id),
+    ).select_from(Product)
+    query, _ = _filter_products(db, query, None, search, None, None)
+    rows = query.group_by(Product.category_id, bucket, in_price).all()
+
+    categories, buckets, total = {}, {}, 0
+    for row_category_id, row_bucket, row_in_price, count in rows:
+        in_category = not category_id or row_category_id == category_id
+        if row_in_price:
+            categories[row_category_id] = categories.get(row_category_id, 0) + count
+        if in_category:
+            buckets[int(row_bucket)] = buckets.get(int(row_bucket), 0) + count
+        if row_in_price and in_category:
+            total += count
+
+    size = Decimal(str(bucket_size))
+    return {
+        "total": total,
+        "categories": [
+            {"category_id": key, "count": count}
+            for key, count in sorted(categories.items(), key=lambda item: (-item[1], item[0] or 0))
+        ],
+        "price_buckets": [
+            {"min_price": key * size, "max_price": (key + 1) * size, "count": count}
+            for key, count in sorted(buckets.items())
+        ],
+    }
+
+
+# ✅ Cached facets; any product write can move counts, so they share the catch-all tag
+def get_product_facets_cached(
+    db: Session,
+    category_id: Optional[int] = None,
+    search: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    bucket_size: float = 1000,
+) -> dict:
+    return product_list_cache.get_or_load(
+        ("facets", category_id, search, min_price, max_price, bucket_size),
+        lambda: get_product_facets(db, category_id, search, min_price, max_price, bucket_size),
+        tags=[ALL_PRODUCTS_TAG],
+    )
 
 
 def get_products_by_category(db: Session, category_id: int, skip: int = 0, limit: int = 100) -> List[Product]:
@@ -69,12 +236,24 @@ def get_products_by_category(db: Session, category_id: int, skip: int = 0, limit
 
 
 def search_products(db: Session, query_str: str, skip: int = 0, limit: int = 100) -> List[Product]:
-    return db.query(Product).filter(
-        or_(
-            Product.name.ilike(f"%{query_str}%"),
-            Product.description.ilike(f"%{query_str}%")
-        )
-    ).offset(skip).limit(limit).all()
+    query, hits = _apply_search(db, db.query(Product), query_str)
+    if hits is not None:
+        query = query.order_by(hits.c.rank.desc(), Product.id)
+    return query.offset(skip).limit(limit).all()
+
+
+# ✅ Full-text match ranked by relevance; ILIKE only where no index exists
+# Returns the filtered query and the hits subquery (None on the ILIKE path).
+def _apply_search(db: Session, query, query_str: str):
+    hits = product_search_subquery(db, query_str)
+    if hits is None:
+        return query.filter(
+            or_(
+                Product.name.ilike(f"%{query_str}%"),
+                Product.description.ilike(f"%{query_str}%"),
+            )
+        ), None
+    return query.join(hits, hits.c.product_id == Product.id), hits
 
 
 def update_product(db: Session, product_id: int, product_update: ProductUpdate) -> Optional[Product]:
@@ -82,15 +261,33 @@ def update_product(db: Session, product_id: int, product_update: ProductUpdate)
     if not db_product:
         return None
     
+    old_category_id = db_product.category_id
     update_data = product_update.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_product, key, value)
+    if "image_url" in update_data:
+        db_product.image_variants = None  # rebuilt for the new image
     
     db.commit()
     db.refresh(db_product)
+    invalidate_products([(product_id, old_category_id), (product_id, db_product.category_id)])
     return db_product
 
 
+# ✅ Store derivative image URLs, unless the image was replaced meanwhile
+def set_product_image_variants(db: Session, product_id: int, image_url: str, variants: dict) -> bool:
+    db_product = db.query(Product)\
+        .filter(Product.id == product_id, Product.image_url == image_url)\
+        .first()
+    if not db_product:
+        return False
+
+    db_product.image_variants = variants
+    db.commit()
+    invalidate_products([(product_id, db_product.category_id)])
+    return True
+
+
 def delete_product(db: Session, product_id: int) -> bool:
     # Soft delete if is_active exists, else hard delete or just return false
     # Assuming soft delete based on previous code snippet
@@ -99,6 +296,7 @@ def delete_product(db: Session, product_id: int) -> bool:
         return False
     
     # Check if is_active exists on model, otherwise hard delete
+    category_id = db_product.category_id
     if hasattr(db_product, 'is_active'):
         db_product.is_active = 0
         db.commit()
@@ -106,6 +304,7 @@ def delete_product(db: Session, product_id: int) -> bool:
         db.delete(db_product)
         db.commit()
         
+    invalidate_products([(product_id, category_id)])
     return True
 
 
@@ -114,8 +313,10 @@ def hard_delete_product(db: Session, product_id: int) -> bool:
     if not db_product:
         return False
     
+    category_id = db_product.category_id
     db.delete(db_product)
     db.commit()
+    invalidate_products([(product_id, category_id)])
     return True
 
 
@@ -127,6 +328,7 @@ def update_stock(db: Session, product_id: int, quantity: int) -> Optional[Produc
     db_product.stock += quantity
     db.commit()
     db.refresh(db_product)
+    invalidate_products([(product_id, db_product.category_id)])
     return db_product
 
 
@@ -0,0 +1,152 @@
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from app.config import settings
+from app.models import Cart, CartItem, Product, StockReservation
+from app.schemas import CartItemOperation
+from app.crud.cart_item import fold_cart_operations
+
+
+def _active_holds(product_ids, now: datetime):
+    return select(StockReservation.product_id, func.sum(StockReservation.quantity).label("held"))\
+        .where(StockReservation.product_id.in_(product_ids), StockReservation.expires_at > now)\
+        .group_by(StockReservation.product_id)
+
+
+# Correlated subquery: units of the outer Product held by carts other than `cart_id`
+def held_by_other_carts(cart_id: int, now: datetime):
+    return select(func.coalesce(func.sum(StockReservation.quantity), 0))\
+        .where(
+            StockReservation.product_id == Product.id,
+            StockReservation.expires_at > now,
+            StockReservation.cart_id != cart_id,
+        ).scalar_subquery()
+
+
+# ✅ Available stock (stock minus active reservations) for the given products
+def get_available_stock(db: Session, product_ids: list[int]) -> dict[int, int]:
+    if not product_ids:
+        return {}
+    holds = _active_holds(product_ids, datetime.utcnow()).subquery()
+    rows = db.query(Product.id, Product.stock - func.coalesce(holds.c.held, 0))\
+        .outerjoin(holds, holds.c.product_id == Product.id)\
+        .filter(Product.id.in_(product_ids))
+    return {product_id: max(available, 0) for product_id, available in rows}
+
+
+# ✅ Units of `product_id` missing to add `quantity` more to the user's cart
+# (0 = enough). Counts what the user's line already holds, and what other
+# carts hold, in one query.
+def get_stock_shortfall(db: Session, user_id: int, product_id: int, quantity: int) -> int:
+    now = datetime.utcnow()
+    user_cart = select(Cart.id).where(Cart.user_id == user_id).scalar_subquery()
+    held_elsewhere = select(func.coalesce(func.sum(StockReservation.quantity), 0))\
+        .where(
+            StockReservation.product_id == product_id,
+            StockReservation.expires_at > now,
+            StockReservation.cart_id.is_distinct_from(user_cart),
+        ).scalar_subquery()
+    in_cart = select(func.coalesce(func.sum(CartItem.quantity), 0))\
+        .where(CartItem.cart_id == user_cart, CartItem.product_id == product_id)\
+        .scalar_subquery()
+    available = db.query(Product.stock - held_elsewhere - in_cart)\
+        .filter(Product.id == product_id, Product.is_active == 1)\
+        .scalar()
+    if available is None:
+        return 0  # Unknown product; the add itself reports it
+    return max(quantity - available, 0)
+
+
+# ✅ Lines a batch of add/set operations would leave beyond what the user's
+# cart can hold, in one query: [{"product_id", "requested", "available"}]
+# (empty = all fine). `requested` is the resulting line quantity, and
+# `available` what this cart may hold of it (stock minus other carts' holds).
+def get_batch_stock_shortfalls(db: Session, user_id: int, operations: list[CartItemOperation]) -> list[dict]:
+    net = {
+        product_id: (kind, quantity)
+        for product_id, (kind, quantity) in fold_cart_operations(operations).items()
+        if quantity > 0
+    }
+    if not net:
+        return []
+    now = datetime.utcnow()
+    user_cart = select(Cart.id).where(Cart.user_id == user_id).scalar_subquery()
+    held_elsewhere = select(func.coalesce(func.sum(StockReservation.quantity), 0))\
+        .where(
+            StockReservation.product_id == Product.id,
+            StockReservation.expires_at > now,
+            StockReservation.cart_id.is_distinct_from(user_cart),
+        ).scalar_subquery()
+    in_cart = select(func.coalesce(func.sum(CartItem.quantity), 0))\
+        .where(CartItem.cart_id == user_cart, CartItem.product_id == Product.id)\
+        .scalar_subquery()
+    rows = db.query(Product.id, Product.stock - held_elsewhere, in_cart)\
+        .filter(Product.id.in_(list(net)), Product.is_active == 1)\
+        .order_by(Product.id)
+
+    short = []
+    for product_id, available, held in rows:
+        kind, quantity = net[product_id]
+        requested = held + quantity if kind == "add" else quantity
+        if requested > available:
+            short.append({"product_id": product_id, "requested": requested, "available": max(available, 0)})
+    return short
+
+
+# ✅ Rewrite the reservations of the user's cart to match its lines, with a
+# fresh expiry. Product rows are locked in id order so overlapping carts
+# queue instead of deadlocking. One DELETE and one multi-row INSERT, one
+# commit. Returns {product_id: units not reserved} for lines that exceed
+# what is left.
+def reserve_cart_stock(db: Session, user_id: int) -> dict[int, int]:
+    cart_id = db.query(Cart.id).filter(Cart.user_id == user_id).scalar()
+    if cart_id is None:
+        return {}
+
+    lines = dict(db.query(CartItem.product_id, CartItem.quantity).filter(CartItem.cart_id == cart_id))
+    db.query(StockReservation)\
+        .filter(StockReservation.cart_id == cart_id)\
+        .delete(synchronize_session=False)
+
+    shortfalls = {}
+    if lines:
+        now = datetime.utcnow()
+        stock = dict(
+            db.query(Product.id, Product.stock)
+            .filter(Product.id.in_(list(lines)))
+            .order_by(Product.id)
+            .with_for_update()
+        )
+        held = dict(db.execute(_active_holds(list(lines), now)).all())
+        expires_at = now + timedelta(seconds=settings.STOCK_RESERVATION_TTL_SECONDS)
+        rows = []
+        for product_id, quantity in lines.items():
+            reserved = min(quantity, max(stock.get(product_id, 0) - held.get(product_id, 0), 0))
+            if reserved < quantity:
+                shortfalls[product_id] = quantity - reserved
+            if reserved:
+                rows.append({"cart_id": cart_id, "product_id": product_id, "quantity": reserved, "expires_at": expires_at})
+        if rows:
+            db.execute(StockReservation.__table__.insert(), rows)
+
+    db.commit()
+    return shortfalls
+
+
+# ✅ Delete expired reservations, `batch_size` rows per statement and one
+# commit per batch (short locks, no per-row commits). Returns rows deleted.
+def expire_reservations(db: Session, batch_size: int) -> int:
+    now = datetime.utcnow()
+    deleted = 0
+    while True:
+        expired = select(StockReservation.cart_id, StockReservation.product_id)\
+            .where(StockReservation.expires_at <= now)\
+            .order_by(StockReservation.expires_at)\
+            .limit(batch_size)
+        count = db.query(StockReservation)\
+            .filter(tuple_(StockReservation.cart_id, StockReservation.product_id).in_(expired))\
+            .delete(synchronize_session=False)
+        db.commit()
+        deleted += count
+        if count < batch_size:
+            return deleted
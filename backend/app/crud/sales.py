@@ -0,0 +1,192 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from typing import Iterable
+from decimal import Decimal
+from datetime import date, datetime, timezone
+from app.config import settings
+from app.database import upsert_insert
+from app.models import (
+    Order, OrderItem, OrderArchive, OrderItemArchive, Product, Category,
+    SalesDaily, SalesByProduct, SalesByCategory,
+)
+from app.schemas import OrderStatus
+
+
+# A sold line as the rollups see it:
+# (order_id, order_date, product_id, category_id, quantity, subtotal)
+SalesLine = tuple
+
+
+def _utc_day(value: datetime) -> date:
+    return value.astimezone(timezone.utc).date() if value.tzinfo else value.date()
+
+
+def _money(value) -> Decimal:
+    return Decimal(str(value or 0)).quantize(Decimal("0.01"))
+
+
+# Add `rows` ({key columns..., counters...}) to a rollup table: one
+# multi-row INSERT ... ON CONFLICT DO UPDATE SET counter = counter + new.
+# Rows go in key order so concurrent upserts lock rows in the same order.
+def _bump(db: Session, model, keys: list[str], counters: list[str], rows: list[dict]) -> None:
+    if not rows:
+        return
+    rows.sort(key=lambda row: [row[key] for key in keys])
+    insert = upsert_insert(db)
+    if insert is not None:
+        statement = insert(model).values(rows)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=keys,
+            set_={counter: getattr(model, counter) + statement.excluded[counter] for counter in counters},
+        ))
+        return
+
+    # No native upsert: update, insert when the row doesn't exist yet
+    for row in rows:
+        updated = db.query(model)\
+            .filter(*[getattr(model, key) == row[key] for key in keys])\
+            .update({getattr(model, counter): getattr(model, counter) + row[counter] for counter in counters}, synchronize_session=False)
+        if not updated:
+            db.execute(model.__table__.insert(), [row])
+
+
+# ✅ Apply sold lines to the rollups, `sign` = 1 for a sale, -1 for a
+# cancellation. At most three statements however many lines; the caller
+# commits (it runs inside checkout / cancel transactions).
+def record_sales(db: Session, lines: Iterable[SalesLine], sign: int = 1) -> None:
+    daily, by_product, by_category = {}, {}, {}
+    for order_id, order_date, product_id, category_id, quantity, subtotal in lines:
+        day, shard = _utc_day(order_date), order_id % settings.SALES_ROLLUP_SHARDS
+        row = daily.setdefault((day, shard), {"day": day, "shard": shard, "orders": set(), "units": 0, "revenue": Decimal("0.00")})
+        row["orders"].add(order_id)
+        row["units"] += quantity
+        row["revenue"] += subtotal
+        row = by_product.setdefault((day, product_id), {"day": day, "product_id": product_id, "units": 0, "revenue": Decimal("0.00")})
+        row["units"] += quantity
+        row["revenue"] += subtotal
+        if category_id is not None:
+            row = by_category.setdefault(
+                (day, category_id, shard),
+                {"day": day, "category_id": category_id, "shard": shard, "units": 0, "revenue": Decimal("0.00")},
+            )
+            row["units"] += quantity
+            row["revenue"] += subtotal
+
+    for row in daily.values():
+        row["orders"] = len(row["orders"])
+    for rows in (daily, by_product, by_category):
+        for row in rows.values():
+            for counter in ("orders", "units", "revenue"):
+                if counter in row:
+                    row[counter] *= sign
+
+    _bump(db, SalesDaily, ["day", "shard"], ["orders", "units", "revenue"], list(daily.values()))
+    _bump(db, SalesByProduct, ["day", "product_id"], ["units", "revenue"], list(by_product.values()))
+    _bump(db, SalesByCategory, ["day", "category_id", "shard"], ["units", "revenue"], list(by_category.values()))
+
+
+# ✅ Sold lines of the given orders, in one query, with the category each
+# line was sold under (what checkout recorded, not the product's current one)
+def get_sales_lines(db: Session, order_ids: list[int], order_model=Order, item_model=OrderItem) -> list[SalesLine]:
+    if not order_ids:
+        return []
+    return [
+        tuple(row) for row in db.query(
+            order_model.id, order_model.order_date, item_model.product_id,
+            item_model.category_id, item_model.quantity, item_model.subtotal,
+        )
+        .join(item_model, item_model.order_id == order_model.id)
+        .filter(order_model.id.in_(order_ids))
+    ]
+
+
+# ✅ Recompute every rollup from the orders (hot and archived), for
+# backfills or after a manual data fix. One transaction: readers see the
+# old rollups until it commits. Returns orders counted.
+def rebuild_sales_rollups(db: Session, batch_size: int = 1000) -> int:
+    for model in (SalesDaily, SalesByProduct, SalesByCategory):
+        db.query(model).delete(synchronize_session=False)
+
+    counted = 0
+    for order_model, item_model in ((Order, OrderItem), (OrderArchive, OrderItemArchive)):
+        last_id = 0
+        while True:
+            order_ids = [
+                order_id for (order_id,) in db.query(order_model.id)
+                .filter(order_model.id > last_id, order_model.status != OrderStatus.CANCELLED.value)
+                .order_by(order_model.id)
+                .limit(batch_size)
+            ]
+            if not order_ids:
+                break
+            record_sales(db, get_sales_lines(db, order_ids, order_model, item_model))
+            counted += len(order_ids)
+            last_id = order_ids[-1]
+
+    db.commit()
+    return counted
+
+
+# ✅ Dashboard numbers for [start, end] (inclusive days), read from the
+# rollups only: cost depends on days x products, not on order volume.
+def get_sales_analytics(db: Session, start: date, end: date, top: int = 10) -> dict:
+    daily = db.query(
+        SalesDaily.day,
+        func.sum(SalesDaily.orders),
+        func.sum(SalesDaily.units),
+        func.sum(SalesDaily.revenue),
+    )\
+        .filter(SalesDaily.day >= start, SalesDaily.day <= end)\
+        .group_by(SalesDaily.day)\
+        .order_by(SalesDaily.day)\
+        .all()
+    days = [
+        {"day": day, "orders": int(orders), "units": int(units), "revenue": _money(revenue)}
+        for day, orders, units, revenue in daily
+    ]
+
+    product_revenue = func.sum(SalesByProduct.revenue)
+    products = db.query(
+        SalesByProduct.product_id,
+        Product.name,
+        func.sum(SalesByProduct.units),
+        product_revenue,
+    )\
+        .outerjoin(Product, Product.id == SalesByProduct.product_id)\
+        .filter(SalesByProduct.day >= start, SalesByProduct.day <= end)\
+        .group_by(SalesByProduct.product_id, Product.name)\
+        .order_by(product_revenue.desc(), SalesByProduct.product_id)\
+        .limit(top)\
+        .all()
+
+    category_revenue = func.sum(SalesByCategory.revenue)
+    categories = db.query(
+        SalesByCategory.category_id,
+        Category.name,
+        func.sum(SalesByCategory.units),
+        category_revenue,
+    )\
+        .outerjoin(Category, Category.id == SalesByCategory.category_id)\
+        .filter(SalesByCategory.day >= start, SalesByCategory.day <= end)\
+        .group_by(SalesByCategory.category_id, Category.name)\
+        .order_by(category_revenue.desc(), SalesByCategory.category_id)\
+        .all()
+
+    return {
+        "start": start,
+        "end": end,
+        "totals": {
+            "orders": sum(day["orders"] for day in days),
+            "units": sum(day["units"] for day in days),
+            "revenue": sum((day["revenue"] for day in days), Decimal("0.00")),
+        },
+        "daily": days,
+        "top_products": [
+            {"product_id": product_id, "name": name, "units": int(units), "revenue": _money(revenue)}
+            for product_id, name, units, revenue in products
+        ],
+        "categories": [
+            {"category_id": category_id, "name": name, "units": int(units), "revenue": _money(revenue)}
+            for category_id, name, units, revenue in categories
+        ],
+    }
@@ -3,6 +3,7 @@ from typing import Optional
 from passlib.context import CryptContext
 from app.models import User
 from app.schemas import UserCreate, UserUpdate
+from app.pagination import decode_cursor, encode_cursor, keyset_after
 
 
 # ✅ Password hashing setup
@@ -46,8 +47,16 @@ def get_user_by_email(db: Session, email: str) -> Optional[User]:
 
 
 # ✅ Get all users
-def get_all_users(db:  Session, skip: int = 0, limit: int = 100) -> list[User]:
-    return db.query(User).offset(skip).limit(limit).all()
+def get_all_users(db:  Session, skip: int = 0, limit: int = 100, after: Optional[str] = None) -> list[User]:
+    query = db.query(User)
+    if after:
+        query = query.filter(keyset_after([(User.id, False)], decode_cursor(after, "users", (int,))))
+    return query.order_by(User.id).offset(skip).limit(limit).all()
+
+
+# ✅ Cursor for the page ending at `user`
+def user_cursor(user: User) -> str:
+    return encode_cursor("users", [user.id])
 
 
 # ✅ Update user
@@ -1,15 +1,54 @@
-from sqlalchemy import create_engine
+import asyncio
+import time
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from pathlib import Path
 from app.config import settings
+from app.pool import pool_options
+
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
 
 
 # ✅ Create engine using config
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(settings.DATABASE_URL, **pool_options(settings.DATABASE_URL))
 
 # ✅ Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async drivers for the backends we run on
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+def async_database_url(url: str) -> str:
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {parsed.drivername}")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+# Backends with INSERT ... ON CONFLICT; their dialect-specific insert()
+UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+# ✅ insert() construct supporting on_conflict_do_* + RETURNING, or None
+def upsert_insert(db):
+    dialect = db.get_bind().dialect
+    if not dialect.insert_returning:
+        return None
+    return UPSERT_INSERTS.get(dialect.name)
+
+
+# ✅ Async engine and session factory for `async def` routes
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **pool_options(ASYNC_DATABASE_URL, is_async=True))
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # ✅ Base class for models
 Base = declarative_base()
 
@@ -23,8 +62,43 @@ def get_db():
         db.close()
 
 
-# ✅ Initialize database (create tables)
+# ✅ Async dependency; the session never ties up a threadpool worker
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# ✅ Real round-trip through the async pool: ("connected" | "timeout" | "unreachable", latency ms)
+async def check_database(timeout: float) -> tuple[str, float]:
+    async def round_trip():
+        async with async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(round_trip(), timeout)
+        state = "connected"
+    except asyncio.TimeoutError:
+        state = "timeout"
+    except Exception:
+        state = "unreachable"
+    return state, round((time.perf_counter() - started) * 1000, 3)
+
+
+# ✅ Initialize database (apply Alembic migrations)
 def init_db():
-    from app.models import User, Product, Category, Cart, CartItem, Order, OrderItem
-    Base.metadata.create_all(bind=engine)
-    print("✅ All tables created!")
\ No newline at end of file
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy import inspect
+
+    config = Config(str(ALEMBIC_INI))
+    config.attributes["configure_logger"] = False
+
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        tables = set(inspect(connection).get_table_names())
+        # Databases built by the old create_all() have the 0001 tables but no history
+        if "users" in tables and "alembic_version" not in tables:
+            command.stamp(config, "0001")
+        command.upgrade(config, "head")
+    print("✅ Database migrated!")
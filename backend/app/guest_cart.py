@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import Header, HTTPException, status
+from jose import JWTError, jwt
+from app.config import settings
+from app.schemas import CartItemOperation
+from app.crud.cart_item import fold_cart_operations
+
+
+# Anonymous carts live in the client, never in the database: a signed token
+# holding [[product_id, quantity], ...]. The client sends it back in the
+# X-Guest-Cart header; /api/auth/login merges it into the user's cart.
+GUEST_CART_TYPE = "guest_cart"
+
+
+# ✅ Sign a guest cart ({product_id: quantity}) into a compact token
+def encode_guest_cart(lines: dict[int, int]) -> str:
+    expire = datetime.utcnow() + timedelta(days=settings.GUEST_CART_EXPIRE_DAYS)
+    payload = {
+        "typ": GUEST_CART_TYPE,
+        "lines": [[product_id, quantity] for product_id, quantity in lines.items()],
+        "exp": expire,
+    }
+    return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+# ✅ Decode a guest cart token; an absent, expired or tampered token is an empty cart
+def decode_guest_cart(token: Optional[str]) -> dict[int, int]:
+    if not token:
+        return {}
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return {}
+    if payload.get("typ") != GUEST_CART_TYPE:
+        return {}
+    try:
+        return {int(product_id): int(quantity) for product_id, quantity in payload.get("lines", []) if int(quantity) > 0}
+    except (TypeError, ValueError):
+        return {}
+
+
+# ✅ Dependency: the guest cart sent in the X-Guest-Cart header
+def get_guest_cart_lines(x_guest_cart: Optional[str] = Header(None)) -> dict[int, int]:
+    return decode_guest_cart(x_guest_cart)
+
+
+# ✅ Apply add/set/remove operations to guest cart lines, same rules as the user batch
+def apply_guest_operations(lines: dict[int, int], operations: list[CartItemOperation]) -> dict[int, int]:
+    lines = dict(lines)
+    for product_id, (kind, quantity) in fold_cart_operations(operations).items():
+        if kind == "add":
+            lines[product_id] = lines.get(product_id, 0) + quantity
+        elif quantity > 0:
+            lines[product_id] = quantity
+        else:
+            lines.pop(product_id, None)
+
+    if len(lines) > settings.GUEST_CART_MAX_LINES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A guest cart holds at most {settings.GUEST_CART_MAX_LINES} products; log in to add more",
+        )
+    return lines
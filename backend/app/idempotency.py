@@ -0,0 +1,142 @@
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Optional
+from fastapi import HTTPException, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.cache import idempotency_cache
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.crud import (
+    claim_idempotency_key_async,
+    save_idempotent_response_async,
+    release_idempotency_key_async,
+    expire_idempotency_keys_async,
+)
+
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+# Set on responses replayed from an earlier request
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+# Response headers stored with the body and sent again on replay; the rest
+# (cookies, per-request ids, ...) belong to the first response only
+REPLAYED_RESPONSE_HEADERS = ("Location", "Retry-After", "ETag")
+
+# Requests running in this process, by (user_id, key); duplicates wait on them
+_in_flight: dict[tuple, asyncio.Future] = {}
+
+
+async def _fingerprint(request: Request) -> str:
+    digest = hashlib.sha256()
+    for part in (request.method.encode(), request.url.path.encode(), await request.body()):
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _replayable_headers(headers: Optional[dict]) -> dict:
+    headers = Headers(headers or {})
+    return {name: headers[name] for name in REPLAYED_RESPONSE_HEADERS if name in headers}
+
+
+def _replay(stored: dict, fingerprint: str) -> JSONResponse:
+    if stored["fingerprint"] != fingerprint:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"{IDEMPOTENCY_KEY_HEADER} was already used for a different request"
+        )
+    headers = {**(stored["headers"] or {}), REPLAYED_HEADER: "true"}
+    return JSONResponse(stored["body"], status_code=stored["status_code"], headers=headers)
+
+
+# ✅ Run `handler` at most once per (user, Idempotency-Key)
+# The first response (success or 4xx) is stored in idempotency_keys and in
+# the in-memory cache, and replayed for every repeat of the same request,
+# with its REPLAYED_RESPONSE_HEADERS. A handler that sets headers returns a
+# JSONResponse (its status code then wins over `status_code`).
+# A duplicate arriving while the first is still running in this process
+# waits for it; one running in another process gets 409 + Retry-After.
+# 5xx and unexpected errors free the key so the client can retry.
+async def idempotent(
+    request: Request,
+    db: AsyncSession,
+    user_id: int,
+    key: Optional[str],
+    handler: Callable[[], Awaitable[Any]],
+    status_code: int = status.HTTP_200_OK,
+) -> Any:
+    if key is None:
+        return await handler()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{IDEMPOTENCY_KEY_HEADER} must be 1-{MAX_KEY_LENGTH} characters"
+        )
+
+    fingerprint = await _fingerprint(request)
+    scope = (user_id, key)
+    while True:
+        stored = idempotency_cache.get(scope, None)
+        if stored is not None:
+            return _replay(stored, fingerprint)
+        running = _in_flight.get(scope)
+        if running is None:
+            break
+        await asyncio.shield(running)
+
+    done = asyncio.get_running_loop().create_future()
+    _in_flight[scope] = done
+    try:
+        existing = await claim_idempotency_key_async(db, user_id, key, fingerprint)
+        if existing is not None:
+            if existing.status_code is None:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"A request with this {IDEMPOTENCY_KEY_HEADER} is still in progress",
+                    headers={"Retry-After": "1"},
+                )
+            stored = {
+                "fingerprint": existing.fingerprint,
+                "status_code": existing.status_code,
+                "body": existing.response_body,
+                "headers": existing.response_headers,
+            }
+            idempotency_cache.set(scope, stored)
+            return _replay(stored, fingerprint)
+
+        try:
+            result = await handler()
+            if isinstance(result, JSONResponse):
+                code, body, headers = result.status_code, json.loads(result.body), _replayable_headers(result.headers)
+            else:
+                code, body, headers = status_code, jsonable_encoder(result), {}
+        except HTTPException as exc:
+            if exc.status_code >= 500:
+                await release_idempotency_key_async(db, user_id, key)
+                raise
+            code, body, headers = exc.status_code, {"detail": exc.detail}, _replayable_headers(exc.headers)
+        except BaseException:
+            await release_idempotency_key_async(db, user_id, key)
+            raise
+
+        await save_idempotent_response_async(db, user_id, key, code, body, headers)
+        idempotency_cache.set(scope, {"fingerprint": fingerprint, "status_code": code, "body": body, "headers": headers})
+        return JSONResponse(body, status_code=code, headers=headers)
+    finally:
+        del _in_flight[scope]
+        done.set_result(None)
+
+
+# ✅ Background task started from the app lifespan: drop expired keys
+async def sweep_expired_idempotency_keys() -> None:
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                await expire_idempotency_keys_async(db, settings.IDEMPOTENCY_SWEEP_BATCH)
+        except Exception as exc:
+            print(f"⚠️ Idempotency key sweep failed: {exc}")
+        await asyncio.sleep(settings.IDEMPOTENCY_SWEEP_SECONDS)
@@ -0,0 +1,110 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.database import SessionLocal
+from app.crud import set_product_image_variants, set_category_image_variants
+
+
+# Full-size WebP of the original, alongside the fixed-width variants
+FULL_WEBP = "webp"
+IMAGE_SIZES = [*settings.IMAGE_VARIANT_WIDTHS, FULL_WEBP]
+# For Query(pattern=...) on routes that let clients pick a size
+IMAGE_SIZE_PATTERN = "^(" + "|".join(IMAGE_SIZES) + ")$"
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn: never fork a process that has DB connections and threads
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def shutdown_image_workers() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+# ✅ Runs in a worker process: write the WebP variants next to `path`
+def render_variants(path: str, widths: dict, quality: int) -> dict:
+    from PIL import Image, ImageOps
+
+    stem = os.path.splitext(path)[0]
+    outputs = {}
+    with Image.open(path) as source:
+        image = ImageOps.exif_transpose(source)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info or "A" in image.mode else "RGB")
+
+        target = f"{stem}_full.webp"
+        image.save(target, "WEBP", quality=quality, method=4)
+        outputs[FULL_WEBP] = target
+
+        for name, width in widths.items():
+            resized = image.copy()
+            # Bounds the width only; thumbnail() keeps the aspect ratio and never upscales
+            resized.thumbnail((width, image.height), Image.LANCZOS)
+            target = f"{stem}_{name}.webp"
+            resized.save(target, "WEBP", quality=quality, method=4)
+            outputs[name] = target
+    return outputs
+
+
+# ✅ Build the variants for an uploaded image URL; returns {size: url}
+async def build_variants(image_url: str) -> dict:
+    path = image_url.lstrip("/")
+    loop = asyncio.get_running_loop()
+    outputs = await loop.run_in_executor(
+        _get_executor(),
+        render_variants,
+        path,
+        dict(settings.IMAGE_VARIANT_WIDTHS),
+        settings.IMAGE_WEBP_QUALITY,
+    )
+    return {name: "/" + target.replace(os.sep, "/") for name, target in outputs.items()}
+
+
+async def _process(store, record_id: int, image_url: str) -> None:
+    try:
+        variants = await build_variants(image_url)
+    except Exception as exc:
+        # Not an image Pillow can read; keep serving the original
+        print(f"⚠️ Image variants failed for {image_url}: {exc}")
+        return
+
+    def save():
+        db = SessionLocal()
+        try:
+            store(db, record_id, image_url, variants)
+        finally:
+            db.close()
+
+    await run_in_threadpool(save)
+
+
+# ✅ Background tasks scheduled by the upload routes
+async def process_product_image(product_id: int, image_url: str) -> None:
+    await _process(set_product_image_variants, product_id, image_url)
+
+
+async def process_category_image(category_id: int, image_url: str) -> None:
+    await _process(set_category_image_variants, category_id, image_url)
+
+
+# ✅ Serve the requested size as image_url (falls back to the original)
+def with_image_size(record: dict, size: Optional[str]) -> dict:
+    variants = record.get("image_variants") or {}
+    if size is None or size not in variants:
+        return record
+    return {**record, "image_url": variants[size]}
@@ -1,8 +1,18 @@
-from fastapi import FastAPI
-from contextlib import asynccontextmanager
-from app.database import init_db
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from fastapi import FastAPI, Response, status
+from app.database import init_db, engine, async_engine, check_database
 from app.config import settings
 from fastapi.staticfiles import StaticFiles
+from app.pagination import NEXT_CURSOR_HEADER
+from app.cache import cache_stats
+from app.pool import pool_stats
+from app.images import shutdown_image_workers
+from app.uploads import UploadSizeLimitMiddleware
+from app.reservations import sweep_expired_reservations
+from app.archival import archive_old_orders
+from app.idempotency import REPLAYED_HEADER, sweep_expired_idempotency_keys
+from app.checkout_queue import checkout_queue
 
 print("CURRENT SECRET_KEY:", settings.SECRET_KEY)
 
@@ -14,6 +24,7 @@ from app.routes import (
     product_router,
     cart_router,
     order_router,
+    admin_router,
 )
 
 from fastapi.middleware.cors import CORSMiddleware
@@ -25,9 +36,23 @@ async def lifespan(app: FastAPI):
     print("🔄 Connecting to database...")
     init_db()
     print("✅ Database connected!")
+    sweepers = [asyncio.create_task(sweep_expired_idempotency_keys())]
+    if settings.STOCK_RESERVATIONS_ENABLED:
+        sweepers.append(asyncio.create_task(sweep_expired_reservations()))
+    if settings.ORDER_ARCHIVE_ENABLED:
+        sweepers.append(asyncio.create_task(archive_old_orders()))
+    if settings.CHECKOUT_QUEUE_ENABLED:
+        await checkout_queue.start()
     yield
     # 🛑 Shutdown:  Cleanup (if needed)
     print("👋 Shutting down...")
+    await checkout_queue.stop()
+    for sweeper in sweepers:
+        sweeper.cancel()
+        with suppress(asyncio.CancelledError):
+            await sweeper
+    await async_engine.dispose()
+    shutdown_image_workers()
 
 # ✅ Create FastAPI app with lifespan
 app = FastAPI(
@@ -39,6 +64,10 @@ app = FastAPI(
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
+# ✅ Refuse oversized uploads before their body is read (added before CORS
+# so the 413 still carries CORS headers)
+app.add_middleware(UploadSizeLimitMiddleware)
+
 # ✅ Add CORS middleware AFTER the app is created!
 app.add_middleware(
     CORSMiddleware,
@@ -46,6 +75,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, REPLAYED_HEADER],  # Lets frontend JS read the keyset pagination cursor / replay flag
 )
 
 # ✅ Root endpoint
@@ -53,10 +83,23 @@ app.add_middleware(
 def root():
     return {"message": "Welcome to E-Commerce API!  🛒"}
 
-# ✅ Health check endpoint
+# ✅ Health check endpoint (real database round-trip + pool usage)
 @app.get("/health")
-def health_check():
-    return {"status": "healthy", "database":  "connected"}
+async def health_check(response: Response):
+    database, latency_ms = await check_database(settings.HEALTH_CHECK_TIMEOUT_SECONDS)
+    healthy = database == "connected"
+    if not healthy:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    report = {
+        "status": "healthy" if healthy else "unhealthy",
+        "database": database,
+        "database_latency_ms": latency_ms,
+        "pools": {"sync": pool_stats(engine), "async": pool_stats(async_engine.sync_engine)},
+        "cache": cache_stats(),
+    }
+    if checkout_queue.running:
+        report["checkout_queue"] = checkout_queue.stats()
+    return report
 
 # ----------------------------------------
 # 📦 Include all routers
@@ -96,4 +139,10 @@ app.include_router(
     order_router,
     prefix="/api/orders",
     tags=["Orders"]
+)
+
+app.include_router(
+    admin_router,
+    prefix="/api/admin",
+    tags=["Admin"]
 )
\ No newline at end of file
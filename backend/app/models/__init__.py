@@ -5,6 +5,10 @@ from app.models.cart import Cart
 from app.models.cart_item import CartItem
 from app.models.order import Order
 from app.models.order_item import OrderItem
+from app.models.order_archive import OrderArchive, OrderItemArchive
+from app.models.stock_reservation import StockReservation
+from app.models.idempotency_key import IdempotencyKey
+from app.models.sales_rollup import SalesDaily, SalesByProduct, SalesByCategory
 
 __all__ = [
     "User",
@@ -14,4 +18,11 @@ __all__ = [
     "CartItem",
     "Order",
     "OrderItem",
+    "OrderArchive",
+    "OrderItemArchive",
+    "StockReservation",
+    "IdempotencyKey",
+    "SalesDaily",
+    "SalesByProduct",
+    "SalesByCategory",
 ]
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -13,4 +13,9 @@ class CartItem(Base):
     
     # Relationships
     cart = relationship("Cart", back_populates="items")
-    product = relationship("Product", back_populates="cart_items")
\ No newline at end of file
+    product = relationship("Product", back_populates="cart_items")
+
+    __table_args__ = (
+        # One line per product per cart; also serves lookups by cart
+        Index("uq_cart_items_cart_id_product_id", "cart_id", "product_id", unique=True),
+    )
\ No newline at end of file
@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, JSON, literal_column
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
 
 
+# Next version across categories, as for products (see Product.version)
+_NEXT_VERSION = literal_column("(SELECT COALESCE(MAX(version), 0) + 1 FROM categories)")
+
+
 class Category(Base):
     __tablename__ = "categories"
 
@@ -11,10 +15,17 @@ class Category(Base):
     name = Column(String(255), unique=True, nullable=False)
     description = Column(Text, nullable=True)
     image_url = Column(String(255), nullable=True)
+    image_variants = Column(JSON, nullable=True)  # {size: url}, filled in after upload
 
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func. now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func. now(), onupdate=func.now(), nullable=False)
+    version = Column(Integer, default=_NEXT_VERSION, onupdate=_NEXT_VERSION, server_default="0", nullable=False)
 
     # Relationships
-    products = relationship("Product", back_populates="category")
\ No newline at end of file
+    products = relationship("Product", back_populates="category")
+
+    __table_args__ = (
+        # MAX(version) for the next version
+        Index("ix_categories_version", "version"),
+    )
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, JSON
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+# Stored outcome of a POST sent with an Idempotency-Key header.
+# status_code is NULL while the first request is still running; expires_at
+# is then a short lock timeout, and the retention period once it finishes.
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)  # sha256 of method, path and body
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(JSON, nullable=True)
+    response_headers = Column(JSON, nullable=True)  # Replayed ones only (Location, Retry-After, ETag)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        # Cleanup of expired keys
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Numeric
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Numeric, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -19,4 +19,11 @@ class Order(Base):
 
     # Relationships
     user = relationship("User", back_populates="orders")
-    items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
\ No newline at end of file
+    items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # "My orders", newest first
+        Index("ix_orders_user_id_order_date", user_id, order_date.desc()),
+        # Admin listing by status
+        Index("ix_orders_status_order_date", status, order_date),
+    )
\ No newline at end of file
@@ -8,8 +8,11 @@ class OrderItem(Base):
     __tablename__ = "order_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False, index=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    # Product's category at the time of sale (sales rollups); no FK, so
+    # deleting a category keeps order history intact
+    category_id = Column(Integer, nullable=True)
     quantity = Column(Integer, nullable=False)
     
     unit_price = Column(Numeric(10, 2), nullable=False)  # Price at time of order
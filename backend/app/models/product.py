@@ -1,9 +1,15 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, Numeric
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, Numeric, Index, JSON, literal_column
 from sqlalchemy.orm import relationship
 from sqlalchemy. sql import func
 from app.database import Base
 
 
+# Next catalogue-wide version: every insert or update (ORM or bulk) moves the
+# row above all others, so MAX(version) changes on any write, however many
+# land in the same second (updated_at only has second precision on SQLite)
+_NEXT_VERSION = literal_column("(SELECT COALESCE(MAX(version), 0) + 1 FROM products)")
+
+
 class Product(Base):
     __tablename__ = "products"
 
@@ -15,14 +21,23 @@ class Product(Base):
     sku = Column(String(100), unique=True, nullable=True)
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
     image_url = Column(String, nullable=True)
+    image_variants = Column(JSON, nullable=True)  # {size: url}, filled in after upload
 
     is_active = Column(Integer, default=1, nullable=False)
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func. now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    version = Column(Integer, default=_NEXT_VERSION, onupdate=_NEXT_VERSION, server_default="0", nullable=False)
 
     # Relationships
     category = relationship("Category", back_populates="products")
     cart_items = relationship("CartItem", back_populates="product")
-    order_items = relationship("OrderItem", back_populates="product")
\ No newline at end of file
+    order_items = relationship("OrderItem", back_populates="product")
+
+    __table_args__ = (
+        # Category listing with the active flag and price range filters
+        Index("ix_products_category_id_is_active_price", "category_id", "is_active", "price"),
+        # MAX(version) for the next version
+        Index("ix_products_version", "version"),
+    )
\ No newline at end of file
@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, Date, Numeric
+from app.database import Base
+
+
+# Sales rollups, kept up to date by checkout and cancellation (net of
+# cancelled orders) and rebuilt by scripts/rebuild_sales_rollups.py. Days
+# are the order's UTC order date. Reporting tables: no foreign keys, so
+# catalog deletes are never blocked by history.
+#
+# Rows every checkout touches are split into SALES_ROLLUP_SHARDS shards
+# (by order id) so concurrent checkouts don't queue on one row lock;
+# readers sum the shards.
+class SalesDaily(Base):
+    __tablename__ = "sales_daily"
+
+    day = Column(Date, primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    orders = Column(Integer, nullable=False)
+    units = Column(Integer, nullable=False)
+    revenue = Column(Numeric(14, 2), nullable=False)
+
+
+class SalesByProduct(Base):
+    __tablename__ = "sales_by_product"
+
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, primary_key=True)
+    units = Column(Integer, nullable=False)
+    revenue = Column(Numeric(14, 2), nullable=False)
+
+
+# Products without a category only count in the daily totals
+class SalesByCategory(Base):
+    __tablename__ = "sales_by_category"
+
+    day = Column(Date, primary_key=True)
+    category_id = Column(Integer, primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    units = Column(Integer, nullable=False)
+    revenue = Column(Numeric(14, 2), nullable=False)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+from app.database import Base
+
+
+# Stock held for a cart line until expires_at; one row per (cart, product),
+# rewritten on every cart change and swept once expired
+class StockReservation(Base):
+    __tablename__ = "stock_reservations"
+
+    cart_id = Column(Integer, ForeignKey("carts.id", ondelete="CASCADE"), primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    quantity = Column(Integer, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        # Active holds per product (available stock)
+        Index("ix_stock_reservations_product_id_expires_at", "product_id", "expires_at"),
+        # Expiry sweep
+        Index("ix_stock_reservations_expires_at", "expires_at"),
+    )
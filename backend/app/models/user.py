@@ -15,6 +15,7 @@ class User(Base):
     password = Column(String(255), nullable=False)  # Store hashed password
     phone = Column(String(20), nullable=True)
     address = Column(Text, nullable=True)
+    is_admin = Column(Integer, default=0, server_default="0", nullable=False)
 
     # Timestamps (using server_default for consistency)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -0,0 +1,75 @@
+import base64
+import json
+from datetime import datetime
+from typing import Callable, Optional, Sequence
+from fastapi import Response
+from sqlalchemy import and_, literal, or_, tuple_
+
+
+# Cursors are opaque to clients: base64url(JSON [scope, [sort_key..., id]]).
+# The scope ties a cursor to one ordering so it can't be replayed elsewhere.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Unsupported cursor value: {value!r}")
+
+
+# ✅ Encode the sort key of the last row on a page
+def encode_cursor(scope: str, values: Sequence) -> str:
+    raw = json.dumps([scope, list(values)], default=_json_default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+# ✅ Decode a cursor for `scope`, coercing each value to the expected type
+def decode_cursor(token: str, scope: str, types: Sequence[type]) -> list:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        token_scope, values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if token_scope != scope or len(values) != len(types):
+            raise InvalidCursor("Cursor does not match this listing")
+        if any(kind is int and not isinstance(value, int) for kind, value in zip(types, values)):
+            raise InvalidCursor("Malformed cursor")  # e.g. a float rank from an older cursor
+        return [
+            datetime.fromisoformat(value) if kind is datetime else kind(value)
+            for kind, value in zip(types, values)
+        ]
+    except InvalidCursor:
+        raise
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor("Malformed cursor") from exc
+
+
+# ✅ WHERE clause for rows strictly after `values` in the given ordering
+# order_by: [(column, descending), ...] ending with a unique column (the id)
+def keyset_after(order_by: Sequence[tuple], values: Sequence):
+    params = [literal(value, column.type) for (column, _), value in zip(order_by, values)]
+    directions = {descending for _, descending in order_by}
+
+    if len(directions) == 1:
+        # Row-value comparison: a single range condition the index can seek on
+        columns = tuple_(*[column for column, _ in order_by])
+        bound = tuple_(*params)
+        return columns < bound if directions.pop() else columns > bound
+
+    # Mixed directions: (a < x) OR (a = x AND b > y) ...
+    clauses = []
+    for i, (column, descending) in enumerate(order_by):
+        step = column < params[i] if descending else column > params[i]
+        clauses.append(and_(*[c == p for (c, _), p in zip(order_by[:i], params[:i])], step))
+    return or_(*clauses)
+
+
+# ✅ Set the next-page cursor header when the page came back full
+def set_next_cursor(response: Response, rows: list, limit: int, cursor_for: Callable) -> Optional[str]:
+    if not rows or len(rows) < limit:
+        return None
+    token = cursor_for(rows[-1])
+    response.headers[NEXT_CURSOR_HEADER] = token
+    return token
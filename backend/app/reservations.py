@@ -0,0 +1,21 @@
+import asyncio
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.crud import expire_reservations_async
+
+
+# ✅ Background task started from the app lifespan when reservations are on:
+# every STOCK_RESERVATION_SWEEP_SECONDS, delete expired holds in batches.
+# Expired holds already stop counting against stock; the sweep only keeps
+# the table small.
+async def sweep_expired_reservations() -> None:
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                deleted = await expire_reservations_async(db, settings.STOCK_RESERVATION_SWEEP_BATCH)
+            if deleted:
+                print(f"🧹 Expired {deleted} stock reservations")
+        except Exception as exc:
+            # Keep sweeping; a failed pass is retried on the next tick
+            print(f"⚠️ Reservation sweep failed: {exc}")
+        await asyncio.sleep(settings.STOCK_RESERVATION_SWEEP_SECONDS)
@@ -4,6 +4,7 @@ from app.routes.category import router as category_router
 from app.routes.product import router as product_router
 from app.routes.cart import router as cart_router
 from app.routes.order import router as order_router
+from app.routes.admin import router as admin_router
 
 __all__ = [
     "auth_router",
@@ -12,4 +13,5 @@ __all__ = [
     "product_router",
     "cart_router",
     "order_router",
+    "admin_router",
 ]
\ No newline at end of file
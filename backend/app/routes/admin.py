@@ -0,0 +1,74 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import date, datetime, timedelta, timezone
+from app.database import get_db
+from app.models import User
+from app.schemas import OrderBulkStatusUpdate, OrderBulkStatusResult, OrderStatusChange, OrderResponse, SalesAnalytics
+from app.crud import bulk_update_order_status, get_order_by_id, get_sales_analytics
+from app.auth import get_current_admin
+
+
+router = APIRouter()
+
+# Longest range one analytics request may cover
+MAX_ANALYTICS_DAYS = 366
+
+
+# ✅ Move many orders to a status at once (e.g. mark a shipment "shipped")
+# Orders are picked by `order_ids` or by `filter`; only those whose current
+# status may move to the new one change, the rest come back in `rejected`.
+@router.post("/orders/status", response_model=OrderBulkStatusResult)
+def bulk_update_orders_status(
+    change: OrderBulkStatusUpdate,
+    admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    filters = change.filter.model_dump(exclude_none=True) if change.filter else None
+    return bulk_update_order_status(db, change.status, order_ids=change.order_ids, filters=filters)
+
+
+# ✅ Move one order to a status
+@router.put("/orders/{order_id}/status", response_model=OrderResponse)
+def update_order_status(
+    order_id: int,
+    change: OrderStatusChange,
+    admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    result = bulk_update_order_status(db, change.status, order_ids=[order_id])
+    if result["rejected"]:
+        rejection = result["rejected"][0]
+        if rejection["current_status"] is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Order not found"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Order {rejection['reason']}"
+        )
+
+    return get_order_by_id(db, order_id)
+
+
+# ✅ Sales dashboard for [start, end] (UTC days, default the last 30):
+# totals, per-day series, top products and categories, read only from the
+# sales rollups so it costs the same at any order volume
+@router.get("/analytics", response_model=SalesAnalytics)
+def sales_analytics(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    top: int = Query(10, ge=1, le=100),
+    admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    end = end or datetime.now(timezone.utc).date()
+    start = start or end - timedelta(days=29)
+    if start > end or (end - start).days >= MAX_ANALYTICS_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"start must be on or before end, at most {MAX_ANALYTICS_DAYS} days apart"
+        )
+
+    return get_sales_analytics(db, start, end, top)
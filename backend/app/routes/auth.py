@@ -4,8 +4,9 @@ from sqlalchemy.orm import Session
 from datetime import timedelta
 from app.database import get_db
 from app.schemas import UserCreate, UserResponse
-from app.crud import create_user, get_user_by_email, authenticate_user
+from app.crud import create_user, get_user_by_email, authenticate_user, merge_guest_cart, reserve_cart_stock
 from app.auth import Token, create_access_token
+from app.guest_cart import get_guest_cart_lines
 from app.config import settings
 
 
@@ -32,6 +33,7 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
 @router.post("/login", response_model=Token)
 def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
+    guest_lines: dict[int, int] = Depends(get_guest_cart_lines),
     db: Session = Depends(get_db)
 ):
     # Authenticate user
@@ -43,6 +45,11 @@ def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Carry over anything added while logged out (X-Guest-Cart header)
+    merge_guest_cart(db, user.id, guest_lines)
+    if guest_lines and settings.STOCK_RESERVATIONS_ENABLED:
+        reserve_cart_stock(db, user.id)
+
     # DEBUG: Print secret key before token creation
     print("LOGIN ROUTE SECRET_KEY:", settings.SECRET_KEY)
 
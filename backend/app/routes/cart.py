@@ -1,130 +1,227 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.database import get_db
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Request, Response
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.models import User
-from app.schemas import CartItemCreate, CartItemUpdate
+from app.schemas import CartItemCreate, CartItemUpdate, CartItemBatch
 from app.crud import (
-    get_or_create_cart,
-    get_cart_with_items,
-    get_cart_summary,
-    clear_cart,
-    add_item_to_cart,
-    get_cart_item_by_id,
-    update_cart_item,
-    remove_cart_item,
+    get_cart_with_items_cached_async,
+    get_guest_cart_async,
+    get_cart_summary_async,
+    clear_cart_async,
+    add_item_to_user_cart_async,
+    apply_cart_operations_async,
+    get_cart_item_owner_async,
+    update_cart_item_async,
+    remove_cart_item_async,
+    get_stock_shortfall_async,
+    get_batch_stock_shortfalls_async,
+    reserve_cart_stock_async,
 )
-from app.auth import get_current_user
+from app.auth import get_current_user_async
+from app.config import settings
+from app.idempotency import IDEMPOTENCY_KEY_HEADER, idempotent
+from app.guest_cart import get_guest_cart_lines, apply_guest_operations, encode_guest_cart
+from app.conditional import PRIVATE_CACHE_CONTROL, make_etag, validator_headers, is_not_modified, not_modified
 
 
 router = APIRouter()
 
 
+def _empty_cart(user_id: int) -> dict:
+    return {
+        "id": None,
+        "user_id": user_id,
+        "items": [],
+        "total_items": 0,
+        "total_amount": 0,
+    }
+
+
+# Re-sync the cart's stock holds after a write; {product_id: units not held}
+async def _reserve_stock(db: AsyncSession, user_id: int) -> dict[int, int]:
+    if not settings.STOCK_RESERVATIONS_ENABLED:
+        return {}
+    return await reserve_cart_stock_async(db, user_id)
+
+
 # ✅ Get cart
 @router.get("/")
-def get_cart(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_cart(
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    cart = get_cart_with_items(db, current_user.id)
+    cart = await get_cart_with_items_cached_async(db, current_user.id)
     if not cart:
         # Return empty cart
-        return {
-            "id": None,
-            "user_id": current_user.id,
-            "items": [],
-            "total_items": 0,
-            "total_amount": 0,
-        }
+        return _empty_cart(current_user.id)
     return cart
 
 
 # ✅ Get cart summary (for navbar)
+# The ETag is the summary itself, so polling with If-None-Match gets a 304
+# (no body) until the badge would change.
 @router.get("/summary")
-def cart_summary(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def cart_summary(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    summary = get_cart_summary(db, current_user.id)
+    summary = await get_cart_summary_async(db, current_user.id)
+    etag = make_etag("cart-summary", current_user.id, summary["id"], summary["total_items"], str(summary["total_amount"]))
+    headers = validator_headers(etag, None, PRIVATE_CACHE_CONTROL)
+    if is_not_modified(request, etag, None):
+        return not_modified(headers)
+
+    response.headers.update(headers)
     return summary
 
 
-# ✅ Add item to cart
+# ✅ Add item to cart (Idempotency-Key makes retries add once)
 @router.post("/items", status_code=status.HTTP_201_CREATED)
-def add_to_cart(
+async def add_to_cart(
     item: CartItemCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    # Get or create cart
-    cart = get_or_create_cart(db, current_user.id)
-    
-    # Add item
-    cart_item = add_item_to_cart(db, cart.id, item)
-    if not cart_item: 
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Product not found or not available"
-        )
-    
-    return {"message": "Item added to cart", "item_id": cart_item.id}
+    async def add():
+        if settings.STOCK_RESERVATIONS_ENABLED:
+            # Refuse up front what could not be held for this cart
+            shortfall = await get_stock_shortfall_async(db, current_user.id, item.product_id, item.quantity)
+            if shortfall:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Only {max(item.quantity - shortfall, 0)} more in stock"
+                )
+
+        # Creates the cart if needed and upserts the line in one transaction
+        cart_item = await add_item_to_user_cart_async(db, current_user.id, item)
+        if not cart_item: 
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Product not found or not available"
+            )
+        await _reserve_stock(db, current_user.id)
+        
+        return {"message": "Item added to cart", "item_id": cart_item.id}
+
+    return await idempotent(request, db, current_user.id, idempotency_key, add, status.HTTP_201_CREATED)
+
+
+# ✅ Apply several add/set/remove operations at once; returns the resulting cart
+# With reservations on, a batch that would leave any line above what can be
+# held is refused whole (409, like a single add), listing the short lines.
+@router.post("/items/batch")
+async def batch_update_cart(
+    batch: CartItemBatch,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    async def apply():
+        if settings.STOCK_RESERVATIONS_ENABLED:
+            short = await get_batch_stock_shortfalls_async(db, current_user.id, batch.operations)
+            if short:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail={"message": "Not enough stock for some items", "items": short}
+                )
+
+        unavailable = await apply_cart_operations_async(db, current_user.id, batch.operations)
+        unreserved = await _reserve_stock(db, current_user.id)
+        cart = await get_cart_with_items_cached_async(db, current_user.id) or _empty_cart(current_user.id)
+        # Products that were not added because they don't exist or are inactive,
+        # and units in the cart that could not be held (reservations only)
+        return {**cart, "unavailable_product_ids": unavailable, "unreserved": unreserved}
+
+    return await idempotent(request, db, current_user.id, idempotency_key, apply)
+
+
+# ✅ Guest cart (not logged in): priced from the X-Guest-Cart token, nothing stored
+@router.get("/guest")
+async def guest_cart(
+    lines: dict[int, int] = Depends(get_guest_cart_lines),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await get_guest_cart_async(db, lines)
+
+
+# ✅ Apply add/set/remove operations to a guest cart; returns it with a new token
+@router.post("/guest/items/batch")
+async def batch_update_guest_cart(
+    batch: CartItemBatch,
+    lines: dict[int, int] = Depends(get_guest_cart_lines),
+    db: AsyncSession = Depends(get_async_db)
+):
+    cart = await get_guest_cart_async(db, apply_guest_operations(lines, batch.operations))
+    # Only the validated lines (stock-capped, unavailable dropped) are re-signed
+    token = encode_guest_cart({item["product_id"]: item["quantity"] for item in cart["items"]})
+    return {**cart, "guest_cart_token": token}
 
 
 # ✅ Update cart item quantity
 @router.put("/items/{item_id}")
-def update_cart_item_quantity(
+async def update_cart_item_quantity(
     item_id: int,
     item_data: CartItemUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Verify item belongs to user's cart
-    cart_item = get_cart_item_by_id(db, item_id)
-    if not cart_item: 
+    owner_id = await get_cart_item_owner_async(db, item_id)
+    if owner_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Cart item not found"
         )
     
-    if cart_item.cart.user_id != current_user.id:
+    if owner_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized"
         )
     
-    updated = update_cart_item(db, item_id, item_data)
-    return {"message": "Cart item updated"}
+    await update_cart_item_async(db, item_id, item_data)
+    unreserved = await _reserve_stock(db, current_user.id)
+    return {"message": "Cart item updated", "unreserved": unreserved}
 
 
 # ✅ Remove item from cart
 @router.delete("/items/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
-def remove_from_cart(
+async def remove_from_cart(
     item_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Verify item belongs to user's cart
-    cart_item = get_cart_item_by_id(db, item_id)
-    if not cart_item:
+    owner_id = await get_cart_item_owner_async(db, item_id)
+    if owner_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Cart item not found"
         )
     
-    if cart_item.cart.user_id != current_user.id:
+    if owner_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized"
         )
     
-    remove_cart_item(db, item_id)
+    await remove_cart_item_async(db, item_id)
+    await _reserve_stock(db, current_user.id)
     return None
 
 
 # ✅ Clear cart
 @router.delete("/", status_code=status.HTTP_204_NO_CONTENT)
-def empty_cart(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def empty_cart(
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    clear_cart(db, current_user.id)
+    await clear_cart_async(db, current_user.id)
+    await _reserve_stock(db, current_user.id)
     return None
\ No newline at end of file
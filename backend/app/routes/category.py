@@ -1,21 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form, Request, Response, BackgroundTasks
 from sqlalchemy.orm import Session
-from typing import List
-import os
-from uuid import uuid4
+from typing import List, Optional
 from app.database import get_db
 from app.models import User
 from app.schemas import CategoryCreate, CategoryUpdate, CategoryResponse, CategoryWithCount
 from app.crud import (
     create_category,
-    get_category_by_id,
+    get_category_cached,
     get_category_by_name,
-    get_all_categories,
+    get_all_categories_cached,
+    get_categories_version_cached,
     update_category,
     delete_category,
     get_category_with_products_count,
 )
 from app.auth import get_current_user
+from app.pagination import InvalidCursor, NEXT_CURSOR_HEADER
+from app.conditional import make_etag, validator_headers, is_not_modified, not_modified
+from app.uploads import save_upload
+from app.images import IMAGE_SIZE_PATTERN, process_category_image, with_image_size
 
 
 router = APIRouter()
@@ -24,23 +27,53 @@ router = APIRouter()
 # ✅ Get all categories
 @router.get("/", response_model=List[CategoryResponse])
 def list_categories(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    after: Optional[str] = None,
+    image_size: Optional[str] = Query(None, pattern=IMAGE_SIZE_PATTERN),
     db: Session = Depends(get_db)
 ):
-    categories = get_all_categories(db, skip=skip, limit=limit)
-    return categories
+    last_modified, version, count = get_categories_version_cached(db)
+    etag = make_etag("categories", skip, limit, after, image_size, version, count)
+    headers = validator_headers(etag, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(headers)
+
+    try:
+        page = get_all_categories_cached(db, skip=skip, limit=limit, after=after)
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+    response.headers.update(headers)
+    if page["next_cursor"]:
+        response.headers[NEXT_CURSOR_HEADER] = page["next_cursor"]
+    return [with_image_size(item, image_size) for item in page["items"]]
 
 # ✅ Get single category
 @router.get("/{category_id}", response_model=CategoryResponse)
-def get_category(category_id: int, db: Session = Depends(get_db)):
-    category = get_category_by_id(db, category_id)
+def get_category(
+    category_id: int,
+    request: Request,
+    response: Response,
+    image_size: Optional[str] = Query(None, pattern=IMAGE_SIZE_PATTERN),
+    db: Session = Depends(get_db)
+):
+    category = get_category_cached(db, category_id)
     if not category: 
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Category not found"
         )
-    return category
+
+    etag = make_etag("category", category["id"], image_size, category["version"])
+    headers = validator_headers(etag, category["updated_at"])
+    if is_not_modified(request, etag, category["updated_at"]):
+        return not_modified(headers)
+
+    response.headers.update(headers)
+    return with_image_size(category, image_size)
 
 
 # ✅ Get category with products count
@@ -58,6 +91,7 @@ def get_category_count(category_id: int, db: Session = Depends(get_db)):
 # ✅ Create category (protected)
 @router.post("/", response_model=CategoryResponse, status_code=status.HTTP_201_CREATED)
 async def add_category(
+    background_tasks: BackgroundTasks,
     name: str = Form(...),
     description: str = Form(""),
     image: UploadFile = File(None),
@@ -73,14 +107,7 @@ async def add_category(
 
     image_url = None
     if image:
-        ext = os.path.splitext(image.filename)[-1]
-        filename = f"{uuid4().hex}{ext}"
-        upload_folder = os.path.join("static", "categories")
-        os.makedirs(upload_folder, exist_ok=True)
-        file_path = os.path.join(upload_folder, filename)
-        with open(file_path, "wb") as f:
-            f.write(await image.read())
-        image_url = f"/static/categories/{filename}"
+        image_url = await save_upload(image, "categories")
 
     category_in = CategoryCreate(
         name=name,
@@ -88,6 +115,8 @@ async def add_category(
         image_url=image_url
     )
     new_category = create_category(db, category_in)
+    if image_url:
+        background_tasks.add_task(process_category_image, new_category.id, image_url)
     return new_category
 
 
@@ -95,6 +124,7 @@ async def add_category(
 @router.put("/{category_id}", response_model=CategoryResponse)
 async def edit_category(
     category_id: int,
+    background_tasks: BackgroundTasks,
     name: str = Form(None),
     description: str = Form(None),
     image: UploadFile = File(None),
@@ -109,14 +139,7 @@ async def edit_category(
 
     image_url = None
     if image:
-        ext = os.path.splitext(image.filename)[-1]
-        filename = f"{uuid4().hex}{ext}"
-        upload_folder = os.path.join("static", "categories")
-        os.makedirs(upload_folder, exist_ok=True)
-        file_path = os.path.join(upload_folder, filename)
-        with open(file_path, "wb") as f:
-            f.write(await image.read())
-        image_url = f"/static/categories/{filename}"
+        image_url = await save_upload(image, "categories")
         category_data["image_url"] = image_url
 
     updated = update_category(db, category_id, CategoryUpdate(**category_data))
@@ -125,6 +148,8 @@ async def edit_category(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Category not found"
         )
+    if image_url:
+        background_tasks.add_task(process_category_image, category_id, image_url)
     return updated
 
 # ✅ Delete category (protected)
@@ -1,31 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
+from app.database import get_db, get_async_db
 from app.models import User
-from app.schemas import OrderResponse, OrderUpdate, OrderDetail
+from app.schemas import OrderResponse, OrderUpdate, OrderDetail, OrderSummary
 from app.crud import (
-    create_order_from_cart,
-    get_order_by_id_and_user,
+    InsufficientStockError,
+    create_order_from_cart_async,
+    get_cart_summary_async,
     get_user_orders,
-    get_order_with_items,
+    get_user_order_summaries,
+    order_cursor,
+    order_summary_cursor,
+    get_user_order_detail,
     cancel_order,
 )
-from app.auth import get_current_user
+from app.auth import get_current_user, get_current_user_async
+from app.pagination import InvalidCursor, set_next_cursor
+from app.idempotency import IDEMPOTENCY_KEY_HEADER, idempotent
+from app.checkout_queue import CheckoutQueueFull, checkout_queue
+from app.config import settings
 
 
 router = APIRouter()
 
 
 # ✅ Get all orders for current user
-@router.get("/", response_model=List[OrderDetail])
+# view=summary: status, total and item counts from one grouped query (list
+# pages); view=detail (default): every order with its items and products.
+# history=true also lists archived (old, finished) orders.
+@router.get("/", response_model=Union[List[OrderSummary], List[OrderDetail]])
 def list_orders(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    after: Optional[str] = None,
+    view: str = Query("detail", pattern="^(summary|detail)$"),
+    history: bool = False,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    orders = get_user_orders(db, current_user.id, skip=skip, limit=limit)
+    load, cursor_for = (
+        (get_user_order_summaries, order_summary_cursor) if view == "summary"
+        else (get_user_orders, order_cursor)
+    )
+    try:
+        orders = load(db, current_user.id, skip=skip, limit=limit, after=after, include_history=history)
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+    set_next_cursor(response, orders, limit, cursor_for)
     return orders
 
 
@@ -36,41 +63,103 @@ def get_order(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    order = get_order_with_items(db, order_id)
+    # Filtered by owner in the query: someone else's order is simply not found.
+    # Links to old orders keep working: a miss falls back to the archive.
+    order = get_user_order_detail(db, order_id, current_user.id, include_history=True)
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Order not found"
         )
     
-    # Verify order belongs to user
-    if order["user_id"] != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized"
-        )
-    
     return order
 
 
 # ✅ Create order from cart (checkout)
+# Send an Idempotency-Key header to make retries safe: a repeat gets the
+# first response back instead of a second order (or "Cart is empty").
+# With CHECKOUT_QUEUE_ENABLED the order is placed by a checkout worker:
+# the response is 202 with a token to poll at /api/orders/checkout/{token}
+# (also in Location; a placed order's Location is /api/orders/{order_id}).
 @router.post("/", status_code=status.HTTP_201_CREATED)
-def create_order(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def create_order(
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    order = create_order_from_cart(db, current_user.id)
-    if not order:
+    async def enqueue():
+        cart = await get_cart_summary_async(db, current_user.id)
+        if not cart["total_items"]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cart is empty or not found"
+            )
+        try:
+            job = checkout_queue.submit(current_user.id)
+        except CheckoutQueueFull:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Checkout is busy, please retry shortly",
+                headers={"Retry-After": "2"},
+            )
+
+        status_url = f"/api/orders/checkout/{job['token']}"
+        return JSONResponse(
+            {"message": "Order queued", "token": job["token"], "status": job["status"], "status_url": status_url},
+            status_code=status.HTTP_202_ACCEPTED,
+            headers={"Location": status_url},
+        )
+
+    async def checkout():
+        try:
+            order = await create_order_from_cart_async(db, current_user.id)
+        except InsufficientStockError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail={"message": "Not enough stock for some items", "items": exc.items}
+            )
+        if not order:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cart is empty or not found"
+            )
+        
+        return JSONResponse(
+            jsonable_encoder({
+                "message": "Order created successfully",
+                "order_id": order["id"],
+                "total_amount": order["total_amount"],
+            }),
+            status_code=status.HTTP_201_CREATED,
+            headers={"Location": f"/api/orders/{order['id']}"},
+        )
+
+    if checkout_queue.running:
+        return await idempotent(request, db, current_user.id, idempotency_key, enqueue, status.HTTP_202_ACCEPTED)
+    return await idempotent(request, db, current_user.id, idempotency_key, checkout, status.HTTP_201_CREATED)
+
+
+# ✅ Result of a queued checkout: status is queued, processing, done (with
+# order_id) or failed (with the error the direct checkout would have
+# returned). `wait` long-polls up to that many seconds for the result.
+@router.get("/checkout/{token}")
+async def get_checkout_status(
+    token: str,
+    wait: float = Query(0, ge=0, le=settings.CHECKOUT_POLL_MAX_WAIT_SECONDS),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Don't hold a pooled connection while long-polling
+    await db.close()
+    job = await checkout_queue.get(token, current_user.id, wait)
+    if job is None:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Cart is empty or not found"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Checkout not found"
         )
-    
-    return {
-        "message": "Order created successfully",
-        "order_id": order.id,
-        "total_amount": order.total_amount,
-    }
+
+    return {key: value for key, value in job.items() if key != "user_id"}
 
 
 # ✅ Cancel order
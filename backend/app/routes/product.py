@@ -1,20 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form, Request, Response, BackgroundTasks
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-import os
-from uuid import uuid4
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models import User
-from app.schemas import ProductCreate, ProductUpdate, ProductResponse
+from app.schemas import ProductCreate, ProductUpdate, ProductResponse, ProductFacets
 from app.crud import (
     create_product,
-    get_product_by_id,
     get_product_by_sku,
-    get_filtered_products,
+    get_product_cached_async,
+    get_filtered_products_cached_async,
+    get_products_version_cached_async,
+    get_product_facets_cached_async,
     update_product,
     delete_product,
 )
 from app.auth import get_current_user
+from app.pagination import InvalidCursor, NEXT_CURSOR_HEADER
+from app.conditional import make_etag, validator_headers, is_not_modified, not_modified
+from app.uploads import save_upload
+from app.images import IMAGE_SIZE_PATTERN, process_product_image, with_image_size
 
 
 router = APIRouter()
@@ -22,43 +27,121 @@ router = APIRouter()
 
 # ✅ Get all products
 @router.get("/", response_model=List[ProductResponse])
-def list_products(
+async def list_products(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    after: Optional[str] = None,
     category_id: Optional[int] = None,
     search: Optional[str] = None,
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
-    db: Session = Depends(get_db)
+    image_size: Optional[str] = Query(None, pattern=IMAGE_SIZE_PATTERN),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Revalidation is answered from the listing aggregate alone
+    last_modified, version, count = await get_products_version_cached_async(
+        db, category_id=category_id, search=search, min_price=min_price, max_price=max_price
+    )
+    etag = make_etag("products", skip, limit, after, category_id, search, min_price, max_price, image_size, version, count)
+    headers = validator_headers(etag, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(headers)
+
+    try:
+        page = await get_filtered_products_cached_async(
+            db,
+            skip=skip,
+            limit=limit,
+            category_id=category_id,
+            search=search,
+            min_price=min_price,
+            max_price=max_price,
+            after=after,
+        )
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+    response.headers.update(headers)
+    # Next page: ?after=<X-Next-Cursor>
+    if page["next_cursor"]:
+        response.headers[NEXT_CURSOR_HEADER] = page["next_cursor"]
+    return [with_image_size(item, image_size) for item in page["items"]]
+
+
+# ✅ Listing page plus category and price-bucket counts
+@router.get("/facets", response_model=ProductFacets)
+async def list_products_with_facets(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[str] = None,
+    category_id: Optional[int] = None,
+    search: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    price_bucket_size: float = Query(1000, ge=1),
+    image_size: Optional[str] = Query(None, pattern=IMAGE_SIZE_PATTERN),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    products = get_filtered_products(
-        db, 
-        skip=skip, 
-        limit=limit, 
-        category_id=category_id, 
+    try:
+        page = await get_filtered_products_cached_async(
+            db,
+            skip=skip,
+            limit=limit,
+            category_id=category_id,
+            search=search,
+            min_price=min_price,
+            max_price=max_price,
+            after=after,
+        )
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+    facets = await get_product_facets_cached_async(
+        db,
+        category_id=category_id,
         search=search,
         min_price=min_price,
-        max_price=max_price
+        max_price=max_price,
+        bucket_size=price_bucket_size,
     )
-    
-    return products
+
+    if page["next_cursor"]:
+        response.headers[NEXT_CURSOR_HEADER] = page["next_cursor"]
+    return {"items": [with_image_size(item, image_size) for item in page["items"]], **facets}
 
 
 # ✅ Get single product
 @router.get("/{product_id}", response_model=ProductResponse)
-def get_product(product_id: int, db: Session = Depends(get_db)):
-    product = get_product_by_id(db, product_id)
+async def get_product(
+    product_id: int,
+    request: Request,
+    response: Response,
+    image_size: Optional[str] = Query(None, pattern=IMAGE_SIZE_PATTERN),
+    db: AsyncSession = Depends(get_async_db)
+):
+    product = await get_product_cached_async(db, product_id)
     if not product: 
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found"
         )
-    return product
+
+    etag = make_etag("product", product["id"], image_size, product["version"])
+    headers = validator_headers(etag, product["updated_at"])
+    if is_not_modified(request, etag, product["updated_at"]):
+        return not_modified(headers)
+
+    response.headers.update(headers)
+    return with_image_size(product, image_size)
 
 
 # ✅ Create product (protected)
 @router.post("/", response_model=ProductResponse, status_code=status.HTTP_201_CREATED)
 async def add_product(
+    background_tasks: BackgroundTasks,
     name: str = Form(...),
     description: str = Form(""),
     price: float = Form(...),
@@ -80,14 +163,7 @@ async def add_product(
 
     image_url = None
     if image:
-        ext = os.path.splitext(image.filename)[-1]
-        filename = f"{uuid4().hex}{ext}"
-        upload_folder = os.path.join("static", "products")
-        os.makedirs(upload_folder, exist_ok=True)
-        file_path = os.path.join(upload_folder, filename)
-        with open(file_path, "wb") as f:
-            f.write(await image.read())
-        image_url = f"/static/products/{filename}"
+        image_url = await save_upload(image, "products")
 
     # Build ProductCreate object as your current create_product expects
     product_in = ProductCreate(
@@ -100,6 +176,9 @@ async def add_product(
         image_url=image_url
     )
     new_product = create_product(db, product_in)
+    if image_url:
+        # Thumbnails / WebP are built after the response, in the image process pool
+        background_tasks.add_task(process_product_image, new_product.id, image_url)
     return new_product
 
 # ✅ Update product (protected)
@@ -13,6 +13,9 @@ from app.schemas.product import (
     ProductUpdate,
     ProductResponse,
     ProductWithCategory,
+    CategoryFacet,
+    PriceBucket,
+    ProductFacets,
 )
 
 from app.schemas.category import (
@@ -39,6 +42,8 @@ from app.schemas.cart_item import (
     CartItemUpdate,
     CartItemResponse,
     CartItemDetail,
+    CartItemOperation,
+    CartItemBatch,
 )
 
 from app.schemas.order import (
@@ -50,6 +55,11 @@ from app.schemas.order import (
     OrderWithItems,
     OrderDetail,
     OrderSummary,
+    OrderFilter,
+    OrderBulkStatusUpdate,
+    OrderStatusChange,
+    OrderStatusRejection,
+    OrderBulkStatusResult,
 )
 
 from app.schemas.order_item import (
@@ -60,6 +70,14 @@ from app.schemas.order_item import (
     OrderItemWithProduct,
 )
 
+from app.schemas.analytics import (
+    SalesTotals,
+    DailySales,
+    ProductSales,
+    CategorySales,
+    SalesAnalytics,
+)
+
 
 __all__ = [
     # User
@@ -75,6 +93,9 @@ __all__ = [
     "ProductUpdate",
     "ProductResponse",
     "ProductWithCategory",
+    "CategoryFacet",
+    "PriceBucket",
+    "ProductFacets",
     # Category
     "CategoryBase",
     "CategoryCreate",
@@ -95,6 +116,8 @@ __all__ = [
     "CartItemUpdate",
     "CartItemResponse",
     "CartItemDetail",
+    "CartItemOperation",
+    "CartItemBatch",
     # Order
     "OrderStatus",
     "OrderBase",
@@ -104,10 +127,21 @@ __all__ = [
     "OrderWithItems",
     "OrderDetail",
     "OrderSummary",
+    "OrderFilter",
+    "OrderBulkStatusUpdate",
+    "OrderStatusChange",
+    "OrderStatusRejection",
+    "OrderBulkStatusResult",
     # OrderItem
     "OrderItemBase",
     "OrderItemCreate",
     "OrderItemUpdate",
     "OrderItemResponse",
     "OrderItemWithProduct",
-]
\ No newline at end of file
+    # Analytics
+    "SalesTotals",
+    "DailySales",
+    "ProductSales",
+    "CategorySales",
+    "SalesAnalytics",
+]
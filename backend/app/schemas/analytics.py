@@ -0,0 +1,38 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import date
+from decimal import Decimal
+
+
+class SalesTotals(BaseModel):
+    orders: int
+    units: int
+    revenue: Decimal
+
+
+class DailySales(SalesTotals):
+    day: date
+
+
+class ProductSales(BaseModel):
+    product_id: int
+    name: Optional[str] = None   # None once the product is deleted
+    units: int
+    revenue: Decimal
+
+
+class CategorySales(BaseModel):
+    category_id: int
+    name: Optional[str] = None
+    units: int
+    revenue: Decimal
+
+
+# ✅ Admin dashboard, from the sales rollups (net of cancelled orders)
+class SalesAnalytics(BaseModel):
+    start: date
+    end: date
+    totals: SalesTotals
+    daily: List[DailySales]
+    top_products: List[ProductSales]
+    categories: List[CategorySales]
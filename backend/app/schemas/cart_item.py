@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, List, Literal
 from decimal import Decimal
 
 
@@ -38,4 +38,24 @@ class ProductInfo(BaseModel):
 
 class CartItemDetail(CartItemResponse):
     product: Optional[ProductInfo] = None
-    item_total: Decimal = Decimal("0.00")  # quantity * product. price
\ No newline at end of file
+    item_total: Decimal = Decimal("0.00")  # quantity * product. price
+
+
+# ✅ One step of a batch cart mutation (lines are addressed by product)
+# add: quantity += n (creates the line) / set: quantity = n, 0 removes / remove
+class CartItemOperation(BaseModel):
+    op: Literal["add", "set", "remove"]
+    product_id: int
+    quantity: Optional[int] = Field(None, ge=0)
+
+    @model_validator(mode="after")
+    def check_quantity(self):
+        if self.op == "add" and not self.quantity:
+            raise ValueError("add needs a quantity of at least 1")
+        if self.op == "set" and self.quantity is None:
+            raise ValueError("set needs a quantity")
+        return self
+
+
+class CartItemBatch(BaseModel):
+    operations: List[CartItemOperation] = Field(..., min_length=1, max_length=100)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 from decimal import Decimal
 
@@ -21,7 +21,9 @@ class CategoryResponse(CategoryBase):
     id: int
     created_at: datetime
     updated_at: datetime
+    version: int
     image_url: Optional[str] = None
+    image_variants: Optional[Dict[str, str]] = None
 
     class Config: 
         from_attributes = True
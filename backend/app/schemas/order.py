@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional, List
 from datetime import datetime
 from decimal import Decimal
@@ -79,9 +79,51 @@ class OrderSummary(BaseModel):
     total_amount: Decimal
     order_date: datetime
     items_count: int
+    line_count: Optional[int] = None
 
     class Config: 
         from_attributes = True
 
+# ✅ Admin bulk status change: either explicit ids or a filter
+class OrderFilter(BaseModel):
+    status: Optional[OrderStatus] = None
+    user_id: Optional[int] = None
+    placed_after: Optional[datetime] = None
+    placed_before: Optional[datetime] = None
+
+    @model_validator(mode="after")
+    def check_not_empty(self):
+        if not any(value is not None for value in self.model_dump().values()):
+            raise ValueError("filter needs at least one condition")
+        return self
+
+
+class OrderBulkStatusUpdate(BaseModel):
+    status: OrderStatus
+    order_ids: Optional[List[int]] = Field(None, min_length=1, max_length=10000)
+    filter: Optional[OrderFilter] = None
+
+    @model_validator(mode="after")
+    def check_target(self):
+        if (self.order_ids is None) == (self.filter is None):
+            raise ValueError("give either order_ids or filter")
+        return self
+
+
+class OrderStatusChange(BaseModel):
+    status: OrderStatus
+
+
+class OrderStatusRejection(BaseModel):
+    id: int
+    reason: str
+    current_status: Optional[str] = None
+
+
+class OrderBulkStatusResult(BaseModel):
+    status: OrderStatus
+    updated: List[int]
+    rejected: List[OrderStatusRejection]
+
 # Fix forward references
 OrderItemWithProduct.model_rebuild()
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, condecimal
-from typing import Optional, Annotated
+from typing import Optional, Annotated, List, Dict
 from datetime import datetime
 from decimal import Decimal
 
@@ -38,7 +38,9 @@ class ProductResponse(ProductBase):
     is_active: int
     created_at: datetime
     updated_at: datetime
+    version: int
     image_url: Optional[str] = None
+    image_variants: Optional[Dict[str, str]] = None
 
     class Config: 
         from_attributes = True
@@ -58,5 +60,24 @@ class CategoryBasic(BaseModel):
         from_attributes = True
 
 
+# ✅ Facet counts for the product listing page
+class CategoryFacet(BaseModel):
+    category_id: Optional[int] = None
+    count: int
+
+
+class PriceBucket(BaseModel):
+    min_price: Decimal
+    max_price: Decimal
+    count: int
+
+
+class ProductFacets(BaseModel):
+    items: List[ProductResponse] = []
+    total: int = 0
+    categories: List[CategoryFacet] = []
+    price_buckets: List[PriceBucket] = []
+
+
 # Fix forward reference
 ProductWithCategory.model_rebuild()
\ No newline at end of file
@@ -0,0 +1,157 @@
+import re
+from sqlalchemy import Integer, cast, func, literal_column, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import Product
+
+
+# Search terms are reduced to plain word tokens; everything else is dropped
+# so user input never reaches the FTS query syntax.
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+MAX_SEARCH_TERMS = 8
+
+# Config and weights are literals (not bound params) so the query expression
+# matches the Postgres GIN index expression exactly.
+_TS_CONFIG = literal_column("'english'::regconfig")
+
+# SQLite: name hits count 10x description hits in bm25()
+_FTS_WEIGHTS = "10.0, 1.0"
+
+# The last term matches as a prefix (search-as-you-type) once it has this
+# many characters; a single letter would expand to a large share of the
+# vocabulary, so it only matches whole words.
+MIN_PREFIX_LENGTH = 2
+
+# SQLite: FTS5 index over the products table (external content, so the text
+# is stored once). prefix='2 3' keeps ready-made doclists for 2- and
+# 3-character prefixes, so "ba*" is one lookup instead of a merge over every
+# term starting with it. Triggers keep it in sync with any write to products
+# (crud, ORM, scripts, migrations), as the generated tsvector does on Postgres.
+FTS_TABLE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5("
+    "name, description, content='products', content_rowid='id', "
+    "tokenize='porter unicode61', prefix='2 3')"
+)
+FTS_TRIGGERS_SQL = (
+    "CREATE TRIGGER IF NOT EXISTS products_fts_insert AFTER INSERT ON products BEGIN "
+    "INSERT INTO products_fts (rowid, name, description) VALUES (new.id, new.name, new.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON products BEGIN "
+    "INSERT INTO products_fts (products_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_update AFTER UPDATE OF name, description ON products BEGIN "
+    "INSERT INTO products_fts (products_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    "INSERT INTO products_fts (rowid, name, description) VALUES (new.id, new.name, new.description); "
+    "END",
+)
+FTS_REBUILD_SQL = "INSERT INTO products_fts (products_fts) VALUES ('rebuild')"
+
+# Ranks are fixed-point integers (relevance x RANK_SCALE): page cursors carry
+# them exactly, and SQL orders and compares on the same rounded value.
+RANK_SCALE = 1_000_000
+
+
+def _search_tokens(query_str: str) -> list[str]:
+    return _TOKEN_RE.findall(query_str.lower())[:MAX_SEARCH_TERMS]
+
+
+# ✅ Postgres full-text document: name weighted above description
+def search_document():
+    return func.setweight(
+        func.to_tsvector(_TS_CONFIG, func.coalesce(Product.name, literal_column("''"))),
+        literal_column("'A'"),
+    ).op("||")(
+        func.setweight(
+            func.to_tsvector(_TS_CONFIG, func.coalesce(Product.description, literal_column("''"))),
+            literal_column("'B'"),
+        )
+    )
+
+
+# ✅ Create the search index for the current backend if it is missing (idempotent)
+# Migrations build it; this covers databases set up some other way. A new
+# SQLite index is filled from the existing products, later writes by the
+# triggers.
+def init_search_index(engine: Engine) -> None:
+    dialect = engine.dialect.name
+    with engine.begin() as conn:
+        if dialect == "postgresql":
+            document = search_document().compile(
+                dialect=engine.dialect, compile_kwargs={"literal_binds": True}
+            )
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_products_search ON products USING gin (({document}))"
+            ))
+        elif dialect == "sqlite":
+            exists = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'"
+            )).first()
+            conn.execute(text(FTS_TABLE_SQL))
+            for statement in FTS_TRIGGERS_SQL:
+                conn.execute(text(statement))
+            if not exists:
+                conn.execute(text(FTS_REBUILD_SQL))
+
+
+# ✅ Matching product ids with a relevance rank (higher is better, an
+# integer: see RANK_SCALE)
+# Only the SEARCH_MAX_CANDIDATES newest matches are ranked, so relevance
+# scoring never runs over a large share of the catalogue.
+# Returns None when the backend has no index or the query has no words,
+# in which case callers fall back to ILIKE.
+def product_search_subquery(db: Session, query_str: str):
+    tokens = _search_tokens(query_str)
+    if not tokens:
+        return None
+
+    # Every term must match; the last one as a prefix for search-as-you-type
+    prefix = len(tokens[-1]) >= MIN_PREFIX_LENGTH
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        ts_query = func.to_tsquery(_TS_CONFIG, " & ".join(tokens) + (":*" if prefix else ""))
+        document = search_document()
+        return (
+            select(
+                Product.id.label("product_id"),
+                cast(func.round(func.ts_rank(document, ts_query) * RANK_SCALE), Integer).label("rank"),
+            )
+            .where(document.op("@@")(ts_query))
+            .order_by(Product.id.desc())
+            .limit(settings.SEARCH_MAX_CANDIDATES)
+            .subquery("search_hits")
+        )
+
+    if dialect == "sqlite":
+        # bm25() reads the whole doclist of every term for its IDF, which for
+        # a short prefix is most of the index. So the prefix match only picks
+        # the candidates, and bm25 scores the whole words among them (rowids
+        # from the oldest candidate up are exactly the candidates); a
+        # candidate that only matches the word being typed scores 0.
+        exact = " ".join(f'"{token}"' for token in tokens)
+        return (
+            text(
+                "WITH candidates AS ("
+                "SELECT rowid AS product_id FROM products_fts WHERE products_fts MATCH :match "
+                "ORDER BY rowid DESC LIMIT :candidates"
+                "), scored AS ("
+                f"SELECT rowid AS product_id, -bm25(products_fts, {_FTS_WEIGHTS}) AS score "
+                "FROM products_fts WHERE products_fts MATCH :exact "
+                "AND rowid >= (SELECT MIN(product_id) FROM candidates)"
+                ") "
+                "SELECT candidates.product_id, "
+                f"CAST(ROUND(COALESCE(scored.score, 0) * {RANK_SCALE}) AS INTEGER) AS rank "
+                "FROM candidates LEFT JOIN scored ON scored.product_id = candidates.product_id"
+            )
+            .bindparams(
+                match=exact + ("*" if prefix else ""),
+                exact=exact,
+                candidates=settings.SEARCH_MAX_CANDIDATES,
+            )
+            .columns(product_id=Integer, rank=Integer)
+            .subquery("search_hits")
+        )
+
+    return None
@@ -0,0 +1,110 @@
+import os
+from uuid import uuid4
+from fastapi import HTTPException, UploadFile, status
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from app.config import settings
+
+
+STATIC_ROOT = "static"
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+# Largest multipart body accepted: the file plus room for the other form
+# fields and the multipart framing
+def _max_form_bytes() -> int:
+    return settings.MAX_UPLOAD_BYTES + settings.UPLOAD_FORM_OVERHEAD_BYTES
+
+
+def _form_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Upload exceeds {settings.MAX_UPLOAD_BYTES} bytes",
+    )
+
+
+class UploadSizeLimitMiddleware:
+    """Caps multipart (upload) request bodies before Starlette spools them.
+    A Content-Length over the cap is refused with 413 without reading the
+    body; a chunked body is counted as it streams in and cut off at the
+    cap. save_upload still checks the file itself."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = Headers(scope=scope)
+        if not headers.get("content-type", "").startswith("multipart/form-data"):
+            return await self.app(scope, receive, send)
+
+        max_bytes = _max_form_bytes()
+        declared = headers.get("content-length")
+        if declared is not None and declared.isdigit() and int(declared) > max_bytes:
+            too_large = _form_too_large()
+            response = JSONResponse({"detail": too_large.detail}, status_code=too_large.status_code)
+            return await response(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    # Raised inside body parsing; FastAPI turns it into the 413
+                    raise _form_too_large()
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+def _copy_limited(source, path: str, max_bytes: int, chunk_size: int) -> int:
+    written = 0
+    try:
+        with open(path, "wb") as target:
+            while chunk := source.read(chunk_size):
+                written += len(chunk)
+                if written > max_bytes:
+                    raise UploadTooLarge
+                target.write(chunk)
+    except BaseException:
+        # Never leave a partial file behind
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return written
+
+
+# ✅ Stream an uploaded file to static/<folder>/ and return its public URL
+# The copy runs in a worker thread in fixed-size chunks, so a large image
+# never sits in memory or blocks the event loop. Anything over
+# MAX_UPLOAD_BYTES is rejected with 413 (oversized request bodies are
+# already refused by UploadSizeLimitMiddleware; this is the backstop).
+async def save_upload(image: UploadFile, folder: str) -> str:
+    too_large = _form_too_large()
+    # Starlette records the size once the body has been spooled
+    if image.size is not None and image.size > settings.MAX_UPLOAD_BYTES:
+        raise too_large
+
+    ext = os.path.splitext(image.filename or "")[-1]
+    filename = f"{uuid4().hex}{ext}"
+    upload_folder = os.path.join(STATIC_ROOT, folder)
+    file_path = os.path.join(upload_folder, filename)
+
+    await run_in_threadpool(os.makedirs, upload_folder, exist_ok=True)
+    await image.seek(0)
+    try:
+        await run_in_threadpool(
+            _copy_limited, image.file, file_path, settings.MAX_UPLOAD_BYTES, settings.UPLOAD_CHUNK_BYTES
+        )
+    except UploadTooLarge:
+        raise too_large
+    return f"/{STATIC_ROOT}/{folder}/{filename}"
+
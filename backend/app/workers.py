@@ -0,0 +1,70 @@
+import hashlib
+import os
+import sys
+import tempfile
+from typing import IO, Optional, Sequence
+from app.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+# Servers whose worker-count flag we read back; other programs' -w means something else
+_SERVERS = ("uvicorn", "gunicorn")
+_WORKER_FLAGS = ("--workers", "-w")
+
+
+def _flag_value(argv: Sequence[str]) -> Optional[str]:
+    value = None
+    for i, arg in enumerate(argv):
+        for flag in _WORKER_FLAGS:
+            if arg == flag and i + 1 < len(argv):
+                value = argv[i + 1]
+            elif arg.startswith(flag + "="):
+                value = arg[len(flag) + 1:]
+            elif flag == "-w" and arg.startswith("-w") and arg[2:].isdigit():
+                value = arg[2:]
+    return value
+
+
+# ✅ Number of server worker processes running this app
+# uvicorn and gunicorn default to WEB_CONCURRENCY, but --workers / -w on the
+# command line override it without setting the variable. Workers see the
+# server's argv (gunicorn forks them, uvicorn spawns them with the parent's
+# sys.argv), so the flag is read back from there. A value that is not a
+# number counts as several workers: callers use this to stay safe.
+def server_worker_count(argv: Optional[Sequence[str]] = None) -> int:
+    argv = sys.argv if argv is None else argv
+    # "uvicorn ...", "gunicorn ..." or "python -m uvicorn ..." (argv[0] is then uvicorn/__main__.py)
+    if not argv or not any(server in os.path.basename(argv[0]) or f"{server}{os.sep}" in argv[0] for server in _SERVERS):
+        return settings.WEB_CONCURRENCY
+    value = _flag_value(argv[1:])
+    if value is None:
+        return settings.WEB_CONCURRENCY
+    try:
+        return int(value)
+    except ValueError:
+        return 2
+
+
+# ✅ Exclusive lock on `name` for this database, held while the returned file
+# stays open
+# Raises RuntimeError when another process on this host already holds it:
+# a second worker of the same server, whatever its command line said.
+def acquire_process_lock(name: str) -> IO:
+    digest = hashlib.sha1(settings.DATABASE_URL.encode()).hexdigest()[:12]
+    path = os.path.join(tempfile.gettempdir(), f"{name}-{digest}.lock")
+    handle = open(path, "a+")
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        handle.close()
+        raise RuntimeError(f"{name} is already running in another process ({path})")
+    return handle
@@ -0,0 +1,65 @@
+from logging.config import fileConfig
+from alembic import context
+from app.config import settings
+from app.database import Base, engine
+import app.models  # noqa: F401  (registers every table on Base.metadata)
+
+
+config = context.config
+
+# init_db() runs migrations inside the app; don't let that reset app logging
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+# Objects managed by hand-written migrations, not by the models
+IGNORED_TABLES = {"products_fts"}
+IGNORED_INDEXES = {"ix_products_search"}
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    if type_ == "table" and (name in IGNORED_TABLES or name.startswith("products_fts_")):
+        return False
+    if type_ == "index" and name in IGNORED_INDEXES:
+        return False
+    return True
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connection = config.attributes.get("connection")
+    if connection is None:
+        with engine.connect() as connection:
+            _run(connection)
+    else:
+        _run(connection)
+
+
+def _run(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        # SQLite can't ALTER most constraints; batch mode rebuilds the table
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,51 @@
+"""product search index
+
+Postgres: GIN index over the weighted tsvector document (see app.search).
+SQLite: products_fts FTS5 table, backfilled from existing products.
+Both statements are idempotent, so databases that already got the index
+from init_search_index() upgrade cleanly.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 15:50:11.204417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+PG_DOCUMENT = (
+    "setweight(to_tsvector('english'::regconfig, coalesce(products.name, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(products.description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_products_search ON products USING gin (({PG_DOCUMENT}))")
+    elif dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts "
+            "USING fts5(name, description, tokenize='porter unicode61')"
+        )
+        op.execute(
+            "INSERT INTO products_fts (rowid, name, description) "
+            "SELECT id, name, COALESCE(description, '') FROM products "
+            "WHERE id NOT IN (SELECT rowid FROM products_fts)"
+        )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_products_search")
+    elif dialect == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS products_fts")
@@ -0,0 +1,69 @@
+"""hot path indexes
+
+Composite indexes for the queries in app/crud, plus one-cart-per-user and
+one-line-per-product uniqueness. Existing duplicates are merged first:
+extra carts hand their lines to the user's oldest cart, and duplicate
+lines are collapsed into the oldest line with the summed quantity.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 15:58:40.118230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _merge_duplicate_carts() -> None:
+    op.execute(
+        "UPDATE cart_items SET cart_id = ("
+        " SELECT MIN(keep.id) FROM carts keep"
+        " WHERE keep.user_id = (SELECT c.user_id FROM carts c WHERE c.id = cart_items.cart_id)"
+        ")"
+    )
+    op.execute("DELETE FROM carts WHERE id NOT IN (SELECT MIN(id) FROM carts GROUP BY user_id)")
+
+
+def _merge_duplicate_cart_lines() -> None:
+    op.execute(
+        "UPDATE cart_items SET quantity = ("
+        " SELECT SUM(dup.quantity) FROM cart_items dup"
+        " WHERE dup.cart_id = cart_items.cart_id AND dup.product_id = cart_items.product_id"
+        ") WHERE id IN ("
+        " SELECT MIN(id) FROM cart_items GROUP BY cart_id, product_id HAVING COUNT(*) > 1"
+        ")"
+    )
+    op.execute(
+        "DELETE FROM cart_items WHERE id NOT IN ("
+        " SELECT MIN(id) FROM cart_items GROUP BY cart_id, product_id"
+        ")"
+    )
+
+
+def upgrade() -> None:
+    _merge_duplicate_carts()
+    _merge_duplicate_cart_lines()
+
+    op.create_index('ix_carts_user_id', 'carts', ['user_id'], unique=True)
+    op.create_index('uq_cart_items_cart_id_product_id', 'cart_items', ['cart_id', 'product_id'], unique=True)
+    op.create_index('ix_order_items_order_id', 'order_items', ['order_id'], unique=False)
+    op.create_index('ix_orders_user_id_order_date', 'orders', ['user_id', sa.literal_column('order_date DESC')], unique=False)
+    op.create_index('ix_orders_status_order_date', 'orders', ['status', 'order_date'], unique=False)
+    op.create_index('ix_products_category_id_is_active_price', 'products', ['category_id', 'is_active', 'price'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_products_category_id_is_active_price', table_name='products')
+    op.drop_index('ix_orders_status_order_date', table_name='orders')
+    op.drop_index('ix_orders_user_id_order_date', table_name='orders')
+    op.drop_index('ix_order_items_order_id', table_name='order_items')
+    op.drop_index('uq_cart_items_cart_id_product_id', table_name='cart_items')
+    op.drop_index('ix_carts_user_id', table_name='carts')
@@ -0,0 +1,32 @@
+"""image variants
+
+JSON map of derivative image URLs (thumbnails, WebP) generated after
+upload, stored next to image_url on products and categories.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 17:12:05.402913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('products', sa.Column('image_variants', sa.JSON(), nullable=True))
+    op.add_column('categories', sa.Column('image_variants', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('categories') as batch_op:
+        batch_op.drop_column('image_variants')
+    with op.batch_alter_table('products') as batch_op:
+        batch_op.drop_column('image_variants')
@@ -0,0 +1,41 @@
+"""stock reservations
+
+Time-boxed holds on product stock for cart lines, keyed by (cart_id,
+product_id) and indexed by expiry for the availability sum and the sweeper.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 19:02:44.518270
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'stock_reservations',
+        sa.Column('cart_id', sa.Integer(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['cart_id'], ['carts.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('cart_id', 'product_id'),
+    )
+    op.create_index('ix_stock_reservations_product_id_expires_at', 'stock_reservations', ['product_id', 'expires_at'], unique=False)
+    op.create_index('ix_stock_reservations_expires_at', 'stock_reservations', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stock_reservations_expires_at', table_name='stock_reservations')
+    op.drop_index('ix_stock_reservations_product_id_expires_at', table_name='stock_reservations')
+    op.drop_table('stock_reservations')
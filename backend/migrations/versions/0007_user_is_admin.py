@@ -0,0 +1,29 @@
+"""user is_admin
+
+Flag for users allowed to call the /api/admin endpoints. Existing users
+are not admins.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 21:05:41.287350
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('is_admin', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('is_admin')
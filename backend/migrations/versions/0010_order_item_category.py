@@ -0,0 +1,36 @@
+"""order item category
+
+Category each order line was sold under, so cancellations take sales out
+of the same category rollup checkout put them in. Existing lines are
+backfilled with their product's current category.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 09:14:27.530861
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for table in ('order_items', 'order_items_archive'):
+        op.add_column(table, sa.Column('category_id', sa.Integer(), nullable=True))
+        op.execute(
+            f"UPDATE {table} SET category_id = "
+            f"(SELECT products.category_id FROM products WHERE products.id = {table}.product_id)"
+        )
+
+
+def downgrade() -> None:
+    for table in ('order_items_archive', 'order_items'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('category_id')
@@ -0,0 +1,29 @@
+"""idempotent response headers
+
+Headers replayed with a stored idempotent response (Location,
+Retry-After, ETag); NULL when the response had none of them.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 10:02:41.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0011'
+down_revision: Union[str, None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('idempotency_keys', sa.Column('response_headers', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('idempotency_keys') as batch_op:
+        batch_op.drop_column('response_headers')
@@ -0,0 +1,34 @@
+"""product version
+
+Catalogue-wide write counter on products: each insert or update sets the
+row's version to MAX(version) + 1, so listing and product ETags change on
+every write even when updated_at (second precision on SQLite) does not.
+Existing rows are numbered by id.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 10:41:09.662517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0012'
+down_revision: Union[str, None] = '0011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('products', sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+    op.execute("UPDATE products SET version = id")
+    op.create_index('ix_products_version', 'products', ['version'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_products_version', table_name='products')
+    with op.batch_alter_table('products') as batch_op:
+        batch_op.drop_column('version')
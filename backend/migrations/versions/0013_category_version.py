@@ -0,0 +1,33 @@
+"""category version
+
+Write counter on categories, like products.version (0012): each insert
+or update sets it to MAX(version) + 1, so category ETags change on every
+write even within the same second. Existing rows are numbered by id.
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-20 09:12:44.208315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0013'
+down_revision: Union[str, None] = '0012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('categories', sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+    op.execute("UPDATE categories SET version = id")
+    op.create_index('ix_categories_version', 'categories', ['version'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_categories_version', table_name='categories')
+    with op.batch_alter_table('categories') as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,72 @@
+"""search index triggers
+
+SQLite: products_fts becomes an external-content FTS5 table over products
+with 2- and 3-character prefix indexes (fast search-as-you-type), kept in
+sync by AFTER INSERT/UPDATE/DELETE triggers instead of by the crud
+functions, so products written any other way are searchable too. The
+index is rebuilt from products. Postgres needs nothing: its GIN index is
+over an expression of the row.
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-20 10:31:57.840126
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '0014'
+down_revision: Union[str, None] = '0013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TRIGGERS = ('products_fts_insert', 'products_fts_delete', 'products_fts_update')
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("DROP TABLE IF EXISTS products_fts")
+    op.execute(
+        "CREATE VIRTUAL TABLE products_fts USING fts5("
+        "name, description, content='products', content_rowid='id', "
+        "tokenize='porter unicode61', prefix='2 3')"
+    )
+    op.execute(
+        "CREATE TRIGGER products_fts_insert AFTER INSERT ON products BEGIN "
+        "INSERT INTO products_fts (rowid, name, description) VALUES (new.id, new.name, new.description); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER products_fts_delete AFTER DELETE ON products BEGIN "
+        "INSERT INTO products_fts (products_fts, rowid, name, description) "
+        "VALUES ('delete', old.id, old.name, old.description); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER products_fts_update AFTER UPDATE OF name, description ON products BEGIN "
+        "INSERT INTO products_fts (products_fts, rowid, name, description) "
+        "VALUES ('delete', old.id, old.name, old.description); "
+        "INSERT INTO products_fts (rowid, name, description) VALUES (new.id, new.name, new.description); "
+        "END"
+    )
+    op.execute("INSERT INTO products_fts (products_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for trigger in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS products_fts")
+    op.execute(
+        "CREATE VIRTUAL TABLE products_fts "
+        "USING fts5(name, description, tokenize='porter unicode61')"
+    )
+    op.execute(
+        "INSERT INTO products_fts (rowid, name, description) "
+        "SELECT id, name, COALESCE(description, '') FROM products"
+    )
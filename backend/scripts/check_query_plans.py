@@ -0,0 +1,144 @@
+"""Fail if a hot query in app/crud falls back to a sequential scan.
+
+Runs each hot read path through the real crud function, captures the SQL
+it emits, and EXPLAINs every statement against the configured database.
+On Postgres, sequential scans are disabled for the check, so a Seq Scan
+in the plan means no usable index exists, whatever the table size.
+Paths listed in QUERY_BUDGETS also fail if they send more SELECTs than
+their budget (an N+1 creeping back in). Budgets only see the rows the
+configured database has; tests/ asserts the counts on seeded orders.
+
+    cd backend && python scripts/check_query_plans.py
+
+Exit status is 1 when any statement regresses, so it can gate CI.
+"""
+import json
+import os
+import re
+import sys
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event  # noqa: E402
+from app.database import SessionLocal, engine, init_db  # noqa: E402
+from app import crud  # noqa: E402
+
+
+# Tables whose full scans we never want on a request path
+HOT_TABLES = {"products", "categories", "carts", "cart_items", "orders", "order_items", "users",
+              "orders_archive", "order_items_archive"}
+
+HOT_QUERIES = [
+    ("product detail", lambda db: crud.get_product_by_id(db, 1)),
+    ("product by sku", lambda db: crud.get_product_by_sku(db, "SKU-1")),
+    ("category listing", lambda db: crud.get_filtered_products(db, category_id=1, min_price=10, max_price=500)),
+    ("product search", lambda db: crud.get_filtered_products(db, search="silk scarf")),
+    ("cart by user", lambda db: crud.get_cart_by_user_id(db, 1)),
+    ("cart with items", lambda db: crud.get_cart_with_items(db, 1)),
+    ("cart line by product", lambda db: crud.get_cart_item_by_product(db, 1, 1)),
+    ("cart items", lambda db: crud.get_cart_items(db, 1)),
+    ("user orders", lambda db: crud.get_user_orders(db, 1, limit=20)),
+    ("orders by status", lambda db: crud.get_orders_by_status(db, "pending", limit=20)),
+    ("order by id and user", lambda db: crud.get_order_by_id_and_user(db, 1, 1)),
+    ("order detail", lambda db: crud.get_user_order_detail(db, 1, 1)),
+    ("user order summaries", lambda db: crud.get_user_order_summaries(db, 1, limit=20)),
+    ("user order history", lambda db: crud.get_user_order_summaries(db, 1, limit=20, include_history=True)),
+    ("archived order detail", lambda db: crud.get_user_order_detail(db, 10**9, 1, include_history=True)),
+    ("order items", lambda db: crud.get_order_items(db, 1)),
+    ("user by email", lambda db: crud.get_user_by_email(db, "someone@example.com")),
+]
+
+# Most SELECTs a path may send, however many rows it returns
+QUERY_BUDGETS = {
+    "cart with items": 1,
+    "order detail": 1,
+    "user order summaries": 1,
+    "user order history": 2,
+    "archived order detail": 1,
+}
+
+
+@contextmanager
+def captured_statements():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def postgres_seq_scans(connection, statement, parameters):
+    connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    row = connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+    plan = row if isinstance(row, list) else json.loads(row)
+
+    found = []
+
+    def walk(node):
+        if node.get("Node Type") == "Seq Scan" and node.get("Relation Name") in HOT_TABLES:
+            found.append(node["Relation Name"])
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan[0]["Plan"])
+    return found
+
+
+_SQLITE_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?(.*)$")
+
+
+def sqlite_seq_scans(connection, statement, parameters):
+    rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    found = []
+    for row in rows:
+        match = _SQLITE_SCAN.match(row[-1])
+        # "SCAN t USING INDEX ..." walks an index in order; a bare "SCAN t" reads every row
+        if match and match.group(1) in HOT_TABLES and "INDEX" not in match.group(2):
+            found.append(match.group(1))
+    return found
+
+
+def main() -> int:
+    init_db()
+    explain = {"postgresql": postgres_seq_scans, "sqlite": sqlite_seq_scans}.get(engine.dialect.name)
+    if explain is None:
+        print(f"Unsupported backend: {engine.dialect.name}")
+        return 2
+
+    failures = 0
+    db = SessionLocal()
+    try:
+        for label, run in HOT_QUERIES:
+            with captured_statements() as statements:
+                run(db)
+            budget = QUERY_BUDGETS.get(label)
+            if budget is not None and len(statements) > budget:
+                failures += 1
+                print(f"FAIL  {label}: {len(statements)} queries, budget {budget}")
+            clean = True
+            for statement, parameters in statements:
+                scans = explain(db.connection(), statement, parameters)
+                db.rollback()
+                if scans:
+                    failures += 1
+                    clean = False
+                    print(f"FAIL  {label}: sequential scan on {', '.join(sorted(set(scans)))}")
+                    print("      " + " ".join(statement.split()))
+            if clean:
+                print(f"ok    {label}")
+    finally:
+        db.close()
+
+    print(f"\n{failures} regression(s)" if failures else "\nAll hot queries use indexes")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
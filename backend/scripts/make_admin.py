@@ -0,0 +1,39 @@
+"""Grant (or with --revoke, remove) admin access for a user by email.
+
+    python scripts/make_admin.py owner@example.com
+    python scripts/make_admin.py owner@example.com --revoke
+
+Run from the backend/ directory; uses DATABASE_URL like the app.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("email")
+    parser.add_argument("--revoke", action="store_true")
+    args = parser.parse_args()
+
+    from app.database import SessionLocal
+    from app.models import User
+
+    db = SessionLocal()
+    try:
+        updated = db.query(User)\
+            .filter(User.email == args.email)\
+            .update({User.is_admin: 0 if args.revoke else 1}, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+    if not updated:
+        sys.exit(f"No user with email {args.email}")
+    print(f"{args.email}: admin {'revoked' if args.revoke else 'granted'}")
+
+
+if __name__ == "__main__":
+    main()
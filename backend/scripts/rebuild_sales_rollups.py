@@ -0,0 +1,39 @@
+"""Rebuild the sales rollup tables from the orders.
+
+Recomputes sales_daily, sales_by_product and sales_by_category from every
+non-cancelled order, hot and archived, in one transaction. Run it once
+after the migration that adds the rollups, and after any manual change to
+orders that bypassed checkout / cancellation.
+
+    python scripts/rebuild_sales_rollups.py
+    python scripts/rebuild_sales_rollups.py --batch 5000
+
+Run from the backend/ directory; uses DATABASE_URL like the app.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch", type=int, default=1000, help="orders read per query")
+    args = parser.parse_args()
+
+    from app.crud import rebuild_sales_rollups
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        counted = rebuild_sales_rollups(db, args.batch)
+    finally:
+        db.close()
+    print(f"Rebuilt sales rollups from {counted} orders in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from itertools import count
+from typing import Optional
+
+import pytest
+
+# The app reads DATABASE_URL at import time: point it at a throwaway file
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from sqlalchemy import event  # noqa: E402
+from app.auth.jwt import create_access_token  # noqa: E402
+from app.database import SessionLocal, engine, init_db  # noqa: E402
+from app.models import Cart, CartItem, Category, Product, User  # noqa: E402
+
+# Numbers the rows the factories make, so names and emails never collide
+_ids = count(1)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    init_db()
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+# ✅ Collects the SQL statements sent inside the block
+@pytest.fixture
+def statements():
+    @contextmanager
+    def capture():
+        sent = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            sent.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield sent
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+    return capture
+
+
+# ✅ API client; the app's startup and shutdown run around each test
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.chdir(BACKEND_DIR)  # static files are mounted from ./static
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+# ✅ Bearer token headers for a user
+@pytest.fixture
+def auth_headers():
+    def headers(user: User) -> dict:
+        token = create_access_token({"sub": str(user.id), "email": user.email})
+        return {"Authorization": f"Bearer {token}"}
+
+    return headers
+
+
+# ✅ Row factories: each call adds and flushes one row (the test commits)
+# and returns it; keyword arguments override the defaults
+@pytest.fixture
+def make_user(db):
+    def make(**fields) -> User:
+        n = next(_ids)
+        user = User(**{"email": f"user{n}@example.com", "password": "x", "first_name": "Test", "last_name": f"User {n}", **fields})
+        db.add(user)
+        db.flush()
+        return user
+
+    return make
+
+
+@pytest.fixture
+def make_category(db):
+    def make(**fields) -> Category:
+        category = Category(**{"name": f"Category {next(_ids)}", **fields})
+        db.add(category)
+        db.flush()
+        return category
+
+    return make
+
+
+@pytest.fixture
+def make_product(db):
+    def make(**fields) -> Product:
+        product = Product(**{"name": f"Product {next(_ids)}", "price": 5, "stock": 100, "is_active": 1, **fields})
+        db.add(product)
+        db.flush()
+        return product
+
+    return make
+
+
+# A cart for the user holding {product_id: quantity}
+@pytest.fixture
+def make_cart(db):
+    def make(user_id: int, items: Optional[dict[int, int]] = None) -> Cart:
+        cart = Cart(user_id=user_id)
+        db.add(cart)
+        db.flush()
+        db.add_all(CartItem(cart_id=cart.id, product_id=product_id, quantity=quantity) for product_id, quantity in (items or {}).items())
+        db.flush()
+        return cart
+
+    return make
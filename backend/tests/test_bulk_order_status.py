@@ -0,0 +1,83 @@
+import pytest
+
+from app.crud import bulk_update_order_status, create_order_from_cart
+from app.crud import order as order_crud
+from app.models import CartItem
+from app.schemas import OrderStatus
+
+
+# A user with `count` pending orders of 2 units each of one product
+@pytest.fixture
+def orders(db, make_user, make_product, make_cart):
+    def make(count: int):
+        product, user = make_product(), make_user()
+        cart = make_cart(user.id)
+        order_ids = []
+        for _ in range(count):
+            db.add(CartItem(cart_id=cart.id, product_id=product.id, quantity=2))
+            db.commit()
+            order_ids.append(create_order_from_cart(db, user.id)["id"])
+        return user.id, product, order_ids
+
+    return make
+
+
+def test_cancel_by_filter_restores_stock_across_chunks(db, orders, monkeypatch):
+    monkeypatch.setattr(order_crud, "_ID_CHUNK", 2)
+    user_id, product, order_ids = orders(5)
+    db.refresh(product)
+    assert product.stock == 90
+
+    result = bulk_update_order_status(db, OrderStatus.CANCELLED, filters={"user_id": user_id})
+
+    assert result["updated"] == order_ids
+    assert result["rejected"] == []
+    db.refresh(product)
+    assert product.stock == 100
+
+
+def test_bulk_by_ids_reports_every_rejected_id(db, orders, monkeypatch):
+    monkeypatch.setattr(order_crud, "_ID_CHUNK", 2)
+    _, _, order_ids = orders(3)
+    bulk_update_order_status(db, OrderStatus.CANCELLED, order_ids[:1])
+    missing = order_ids[-1] + 1000
+
+    result = bulk_update_order_status(db, OrderStatus.CONFIRMED, order_ids + [missing])
+
+    assert result["updated"] == order_ids[1:]
+    assert result["rejected"] == [
+        {"id": order_ids[0], "reason": "cannot move from cancelled to confirmed", "current_status": "cancelled"},
+        {"id": missing, "reason": "not found", "current_status": None},
+    ]
+
+
+def test_admin_moves_orders_along_allowed_transitions_only(db, orders, client, auth_headers, make_user):
+    user_id, _, order_ids = orders(3)
+    admin = make_user(is_admin=1)
+    db.commit()
+    headers = auth_headers(admin)
+
+    confirmed = client.post("/api/admin/orders/status", headers=headers, json={"status": "confirmed", "order_ids": order_ids[:2]})
+    assert confirmed.json()["updated"] == order_ids[:2]
+
+    # Only the confirmed ones may ship; the pending one comes back rejected
+    shipped = client.post("/api/admin/orders/status", headers=headers, json={"status": "shipped", "filter": {"user_id": user_id}})
+    assert shipped.status_code == 200
+    assert shipped.json()["updated"] == order_ids[:2]
+    assert shipped.json()["rejected"] == [
+        {"id": order_ids[2], "reason": "cannot move from pending to shipped", "current_status": "pending"},
+    ]
+
+    single = client.put(f"/api/admin/orders/{order_ids[0]}/status", headers=headers, json={"status": "cancelled"})
+    assert single.status_code == 409
+
+
+def test_bulk_status_needs_an_admin(db, orders, client, auth_headers, make_user):
+    _, _, order_ids = orders(1)
+    user = make_user()
+    db.commit()
+
+    response = client.post("/api/admin/orders/status", headers=auth_headers(user), json={"status": "confirmed", "order_ids": order_ids})
+
+    assert response.status_code == 403
+    assert bulk_update_order_status(db, OrderStatus.CONFIRMED, order_ids)["updated"] == order_ids
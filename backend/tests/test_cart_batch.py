@@ -0,0 +1,47 @@
+from app.crud import apply_cart_operations
+from app.schemas import CartItemOperation
+
+
+def _lines(cart: dict) -> dict[int, int]:
+    return {item["product_id"]: item["quantity"] for item in cart["items"]}
+
+
+def test_batch_applies_operations_in_order(db, client, auth_headers, make_user, make_product, make_cart):
+    user = make_user()
+    kept, replaced, dropped, inactive = make_product(), make_product(), make_product(), make_product(is_active=0)
+    make_cart(user.id, {kept.id: 1, replaced.id: 1, dropped.id: 4})
+    db.commit()
+
+    response = client.post("/api/cart/items/batch", headers=auth_headers(user), json={"operations": [
+        {"op": "add", "product_id": kept.id, "quantity": 2},
+        {"op": "add", "product_id": kept.id, "quantity": 1},
+        {"op": "set", "product_id": replaced.id, "quantity": 7},
+        {"op": "remove", "product_id": dropped.id},
+        {"op": "add", "product_id": inactive.id, "quantity": 1},
+        {"op": "add", "product_id": 10 ** 9, "quantity": 1},
+    ]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert _lines(body) == {kept.id: 4, replaced.id: 7}
+    assert body["unavailable_product_ids"] == sorted([inactive.id, 10 ** 9])
+    # The cart read afterwards (cached) shows the same lines
+    assert _lines(client.get("/api/cart/", headers=auth_headers(user)).json()) == {kept.id: 4, replaced.id: 7}
+
+
+def test_batch_statements_do_not_grow_with_operations(db, make_user, make_product, make_cart, statements):
+    sent = []
+    for size in (2, 20):
+        user = make_user()
+        products, dropped = [make_product() for _ in range(size)], make_product()
+        make_cart(user.id, {product.id: 1 for product in products + [dropped]})
+        db.commit()
+        # Every kind of write: adds, sets and a removal
+        operations = [
+            CartItemOperation(op="add" if n % 2 else "set", product_id=product.id, quantity=2)
+            for n, product in enumerate(products)
+        ] + [CartItemOperation(op="remove", product_id=dropped.id)]
+        with statements() as captured:
+            apply_cart_operations(db, user.id, operations)
+        sent.append(len(captured))
+    assert sent[0] == sent[1]
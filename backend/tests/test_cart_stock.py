@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.crud import get_batch_stock_shortfalls, get_stock_shortfall
+from app.models import StockReservation
+from app.schemas import CartItemOperation
+
+
+# A product with `stock` units, `held` of them held by another cart, and a
+# user whose cart already has `in_cart` of it
+@pytest.fixture
+def stocked(db, make_user, make_product, make_cart):
+    def make(stock: int, held: int, in_cart: int):
+        product = make_product(stock=stock)
+        user, other = make_user(), make_user()
+        make_cart(user.id, {product.id: in_cart} if in_cart else {})
+        other_cart = make_cart(other.id)
+        if held:
+            db.add(StockReservation(
+                cart_id=other_cart.id, product_id=product.id, quantity=held,
+                expires_at=datetime.utcnow() + timedelta(minutes=5),
+            ))
+        db.commit()
+        return user.id, product.id
+
+    return make
+
+
+def _op(op: str, product_id: int, quantity=None) -> CartItemOperation:
+    return CartItemOperation(op=op, product_id=product_id, quantity=quantity)
+
+
+def test_batch_refuses_what_a_single_add_refuses(db, stocked):
+    user_id, product_id = stocked(stock=10, held=4, in_cart=5)
+
+    # One more fits, two don't: the batch agrees with the single add
+    assert get_stock_shortfall(db, user_id, product_id, 1) == 0
+    assert get_batch_stock_shortfalls(db, user_id, [_op("add", product_id, 1)]) == []
+    assert get_stock_shortfall(db, user_id, product_id, 2) == 1
+    assert get_batch_stock_shortfalls(db, user_id, [_op("add", product_id, 2)]) == [
+        {"product_id": product_id, "requested": 7, "available": 6},
+    ]
+
+
+def test_batch_set_is_checked_against_the_line_it_replaces(db, stocked):
+    user_id, product_id = stocked(stock=10, held=4, in_cart=5)
+
+    assert get_batch_stock_shortfalls(db, user_id, [_op("set", product_id, 6)]) == []
+    assert get_batch_stock_shortfalls(db, user_id, [_op("set", product_id, 200)]) == [
+        {"product_id": product_id, "requested": 200, "available": 6},
+    ]
+    # Removing, or setting to 0, never falls short
+    assert get_batch_stock_shortfalls(db, user_id, [_op("set", product_id, 200), _op("remove", product_id)]) == []
+
+
+def test_oversold_product_reports_zero_available(db, stocked):
+    # Other carts hold more than the stock left (stock was lowered meanwhile)
+    user_id, product_id = stocked(stock=3, held=5, in_cart=0)
+
+    assert get_batch_stock_shortfalls(db, user_id, [_op("add", product_id, 2)]) == [
+        {"product_id": product_id, "requested": 2, "available": 0},
+    ]
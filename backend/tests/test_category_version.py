@@ -0,0 +1,18 @@
+from app.crud import get_categories_version
+from app.models import Category
+
+
+def test_category_version_changes_on_every_write(db):
+    category = Category(name="Versioned category")
+    db.add(category)
+    db.commit()
+
+    seen = [(category.version, get_categories_version(db))]
+    # Several edits inside the same second
+    for n in range(3):
+        category.description = f"Edit {n}"
+        db.commit()
+        seen.append((category.version, get_categories_version(db)))
+
+    assert len({version for version, _ in seen}) == len(seen)
+    assert len({listing for _, listing in seen}) == len(seen)
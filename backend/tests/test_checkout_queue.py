@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from app import checkout_queue as queue_module
+from app.checkout_queue import CheckoutQueue
+from app.config import settings
+from app.models import Order, Product
+
+
+def _queue() -> CheckoutQueue:
+    return CheckoutQueue(workers=1, max_size=10, result_ttl=60)
+
+
+def test_queue_refuses_to_start_with_several_workers(monkeypatch):
+    monkeypatch.setattr(queue_module, "server_worker_count", lambda: 3)
+
+    with pytest.raises(RuntimeError, match="3 workers"):
+        asyncio.run(_queue().start())
+
+
+def test_second_queue_fails_closed_until_the_first_stops():
+    async def scenario():
+        first, second = _queue(), _queue()
+        await first.start()
+        try:
+            # As if another worker process were already running the queue
+            with pytest.raises(RuntimeError, match="another process"):
+                await second.start()
+            assert not second.running
+        finally:
+            await first.stop()
+        await second.start()
+        await second.stop()
+
+    asyncio.run(scenario())
+
+
+@pytest.fixture
+def queue_on(monkeypatch):
+    monkeypatch.setattr(settings, "CHECKOUT_QUEUE_ENABLED", True)
+
+
+def test_queued_checkout_is_polled_to_its_order(db, queue_on, client, auth_headers, make_user, make_product, make_cart):
+    user, other = make_user(), make_user()
+    product = make_product(stock=5)
+    make_cart(user.id, {product.id: 2})
+    db.commit()
+
+    queued = client.post("/api/orders/", headers=auth_headers(user))
+    assert queued.status_code == 202
+    token = queued.json()["token"]
+    assert queued.headers["Location"] == f"/api/orders/checkout/{token}"
+
+    # Only the owner can poll it
+    assert client.get(f"/api/orders/checkout/{token}", headers=auth_headers(other)).status_code == 404
+    job = client.get(f"/api/orders/checkout/{token}?wait=5", headers=auth_headers(user)).json()
+
+    assert job["status"] == "done"
+    order = db.get(Order, job["order_id"])
+    assert order.user_id == user.id
+    assert db.get(Product, product.id).stock == 3
+
+
+def test_queued_checkout_reports_the_checkout_error(db, queue_on, client, auth_headers, make_user, make_product, make_cart):
+    # Sold out after it went into the cart: queued, then refused by the worker
+    user = make_user()
+    product = make_product(stock=5)
+    make_cart(user.id, {product.id: 2})
+    product.stock = 0
+    db.commit()
+    queued = client.post("/api/orders/", headers=auth_headers(user))
+    assert queued.status_code == 202
+    token = queued.json()["token"]
+
+    job = client.get(f"/api/orders/checkout/{token}?wait=5", headers=auth_headers(user)).json()
+
+    assert job["status"] == "failed"
+    assert job["error"]["status_code"] == 409
@@ -0,0 +1,43 @@
+from app.crud import hash_password
+
+
+def _lines(cart: dict) -> dict[int, int]:
+    return {item["product_id"]: item["quantity"] for item in cart["items"]}
+
+
+def _login(client, user, **headers):
+    return client.post("/api/auth/login", data={"username": user.email, "password": "secret1"}, headers=headers)
+
+
+def test_guest_cart_is_merged_at_login(db, client, auth_headers, make_user, make_product, make_cart):
+    user = make_user(password=hash_password("secret1"))
+    owned, new, scarce = make_product(), make_product(), make_product(stock=3)
+    make_cart(user.id, {owned.id: 2})
+    db.commit()
+
+    guest = client.post("/api/cart/guest/items/batch", json={"operations": [
+        {"op": "add", "product_id": owned.id, "quantity": 1},
+        {"op": "add", "product_id": new.id, "quantity": 2},
+        {"op": "add", "product_id": scarce.id, "quantity": 10},
+    ]}).json()
+    # Guest lines are capped at stock before they are signed
+    assert _lines(guest) == {owned.id: 1, new.id: 2, scarce.id: 3}
+
+    assert _login(client, user, **{"X-Guest-Cart": guest["guest_cart_token"]}).status_code == 200
+
+    # Units add up with what the account already had
+    cart = client.get("/api/cart/", headers=auth_headers(user)).json()
+    assert _lines(cart) == {owned.id: 3, new.id: 2, scarce.id: 3}
+    assert client.get("/api/cart/summary", headers=auth_headers(user)).json()["total_items"] == 8
+
+
+def test_tampered_guest_token_merges_nothing(db, client, auth_headers, make_user, make_product):
+    user = make_user(password=hash_password("secret1"))
+    product = make_product()
+    db.commit()
+    token = client.post("/api/cart/guest/items/batch", json={"operations": [
+        {"op": "add", "product_id": product.id, "quantity": 1},
+    ]}).json()["guest_cart_token"]
+
+    assert _login(client, user, **{"X-Guest-Cart": token[:-3] + "abc"}).status_code == 200
+    assert client.get("/api/cart/", headers=auth_headers(user)).json()["items"] == []
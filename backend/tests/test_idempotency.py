@@ -0,0 +1,75 @@
+import asyncio
+
+import httpx
+
+from app.cache import idempotency_cache
+from app.crud import claim_idempotency_key, save_idempotent_response
+from app.idempotency import REPLAYED_HEADER, _replayable_headers
+from app.models import Order, User
+
+
+def test_stored_response_keeps_replayed_headers(db):
+    user = User(email="idem@example.com", password="x", first_name="Idem", last_name="User")
+    db.add(user)
+    db.commit()
+
+    assert claim_idempotency_key(db, user.id, "k1", "f" * 64) is None
+    headers = _replayable_headers({"location": "/api/orders/7", "Set-Cookie": "s=1", "Retry-After": "2"})
+    assert headers == {"Location": "/api/orders/7", "Retry-After": "2"}
+    save_idempotent_response(db, user.id, "k1", 201, {"order_id": 7}, headers)
+
+    stored = claim_idempotency_key(db, user.id, "k1", "f" * 64)
+    assert stored.status_code == 201
+    assert stored.response_headers == headers
+
+
+def _order_count(db, user_id: int) -> int:
+    return db.query(Order).filter(Order.user_id == user_id).count()
+
+
+def test_order_retry_with_the_same_key_is_replayed(db, client, auth_headers, make_user, make_product, make_cart):
+    user = make_user()
+    make_cart(user.id, {make_product().id: 1})
+    db.commit()
+    headers = {**auth_headers(user), "Idempotency-Key": "order-1"}
+
+    first = client.post("/api/orders/", headers=headers)
+    again = client.post("/api/orders/", headers=headers)
+    idempotency_cache.clear()
+    from_table = client.post("/api/orders/", headers=headers)
+
+    assert first.status_code == 201 and REPLAYED_HEADER not in first.headers
+    for replay in (again, from_table):
+        assert (replay.status_code, replay.json()) == (201, first.json())
+        assert replay.headers[REPLAYED_HEADER] == "true"
+        assert replay.headers["Location"] == first.headers["Location"]
+    assert _order_count(db, user.id) == 1
+
+
+def test_same_key_for_a_different_request_is_refused(db, client, auth_headers, make_user, make_product):
+    user = make_user()
+    product = make_product()
+    db.commit()
+    headers = {**auth_headers(user), "Idempotency-Key": "add-1"}
+
+    assert client.post("/api/cart/items", json={"product_id": product.id, "quantity": 1}, headers=headers).status_code == 201
+    assert client.post("/api/cart/items", json={"product_id": product.id, "quantity": 3}, headers=headers).status_code == 422
+
+
+def test_concurrent_requests_with_one_key_place_one_order(db, client, auth_headers, make_user, make_product, make_cart):
+    user = make_user()
+    make_cart(user.id, {make_product().id: 1})
+    db.commit()
+    headers = {**auth_headers(user), "Idempotency-Key": "order-concurrent"}
+
+    async def send():
+        transport = httpx.ASGITransport(app=client.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as api:
+            return await asyncio.gather(*(api.post("/api/orders/", headers=headers) for _ in range(5)))
+
+    responses = asyncio.run(send())
+
+    assert {response.status_code for response in responses} == {201}
+    assert len({response.json()["order_id"] for response in responses}) == 1
+    assert sum(REPLAYED_HEADER in response.headers for response in responses) == 4
+    assert _order_count(db, user.id) == 1
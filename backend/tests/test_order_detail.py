@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.crud import archive_orders, create_order_from_cart, get_user_order_detail
+from app.models import Cart, CartItem, Order, Product
+
+
+def _place_order(db, user_id: int, products: list[Product]) -> int:
+    cart_id = db.query(Cart.id).filter(Cart.user_id == user_id).scalar()
+    db.add_all(CartItem(cart_id=cart_id, product_id=product.id, quantity=n + 1) for n, product in enumerate(products))
+    db.commit()
+    return create_order_from_cart(db, user_id)["id"]
+
+
+@pytest.fixture
+def order(db, make_user, make_category, make_product, make_cart):
+    category = make_category()
+    products = [make_product(price=10 + i, category_id=category.id) for i in range(3)]
+    user = make_user()
+    make_cart(user.id)
+    db.commit()
+    return {"id": _place_order(db, user.id, products), "user_id": user.id, "products": products}
+
+
+def test_order_detail_is_one_query(db, order, statements):
+    with statements() as sent:
+        detail = get_user_order_detail(db, order["id"], order["user_id"])
+
+    assert len(sent) == 1
+    assert [item["quantity"] for item in detail["items"]] == [1, 2, 3]
+    assert all(item["product"]["name"] for item in detail["items"])
+
+
+def test_order_detail_of_someone_else_is_not_found(db, order, statements):
+    with statements() as sent:
+        assert get_user_order_detail(db, order["id"], order["user_id"] + 1000) is None
+    assert len(sent) == 1
+
+
+def test_archived_order_detail_is_one_query(db, order, statements):
+    # A newer order keeps the first one archivable (the newest order stays hot)
+    _place_order(db, order["user_id"], order["products"][:1])
+    db.query(Order)\
+        .filter(Order.id == order["id"])\
+        .update({Order.status: "delivered", Order.order_date: datetime.utcnow() - timedelta(days=400)}, synchronize_session=False)
+    db.commit()
+    assert archive_orders(db, 365, 100) >= 1
+
+    assert get_user_order_detail(db, order["id"], order["user_id"]) is None
+    with statements() as sent:
+        detail = get_user_order_detail(db, order["id"], order["user_id"], include_history=True)
+
+    assert len(sent) == 1
+    assert detail["status"] == "delivered"
+    assert [item["quantity"] for item in detail["items"]] == [1, 2, 3]
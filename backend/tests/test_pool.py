@@ -0,0 +1,22 @@
+import os
+import tempfile
+
+from sqlalchemy import create_engine
+
+from app.pool import MeteredQueuePool, pool_stats
+
+
+def test_pool_stats_reads_max_overflow_from_the_metered_pool():
+    url = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "pool.db")
+    engine = create_engine(url, poolclass=MeteredQueuePool, pool_size=2, max_overflow=3)
+    try:
+        with engine.connect():
+            stats = pool_stats(engine)
+        assert stats["size"] == 2 and stats["max_overflow"] == 3
+        assert stats["checked_out"] == 1 and stats["checkouts"] == 1
+
+        # dispose() swaps in pool.recreate(): the setting must survive it
+        engine.dispose()
+        assert pool_stats(engine)["max_overflow"] == 3
+    finally:
+        engine.dispose()
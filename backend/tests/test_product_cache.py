@@ -0,0 +1,45 @@
+from app.cache import product_cache
+
+
+def _listed(client, category_id: int) -> dict[int, float]:
+    return {item["id"]: float(item["price"]) for item in client.get(f"/api/products/?category_id={category_id}").json()}
+
+
+def test_product_writes_reach_every_cached_view(db, client, auth_headers, make_user, make_category, make_product, make_cart):
+    user = make_user()
+    old, new = make_category(), make_category()
+    product = make_product(price=10, category_id=old.id)
+    make_cart(user.id, {product.id: 1})
+    db.commit()
+    headers = auth_headers(user)
+
+    # Warm the detail, list and cart caches
+    hits = product_cache.hits
+    for _ in range(2):
+        assert float(client.get(f"/api/products/{product.id}").json()["price"]) == 10
+    assert product_cache.hits == hits + 1
+    assert _listed(client, old.id) == {product.id: 10}
+    assert float(client.get("/api/cart/", headers=headers).json()["items"][0]["product"]["price"]) == 10
+
+    assert client.put(f"/api/products/{product.id}", headers=headers, json={"price": 12, "category_id": new.id}).status_code == 200
+
+    assert float(client.get(f"/api/products/{product.id}").json()["price"]) == 12
+    assert _listed(client, old.id) == {}
+    assert _listed(client, new.id) == {product.id: 12}
+    assert float(client.get("/api/cart/", headers=headers).json()["items"][0]["product"]["price"]) == 12
+
+    # Deleting is a soft delete: the cached detail must not keep the product active
+    assert client.delete(f"/api/products/{product.id}", headers=headers).status_code == 204
+    assert client.get(f"/api/products/{product.id}").json()["is_active"] == 0
+
+
+def test_checkout_refreshes_cached_stock(db, client, auth_headers, make_user, make_product, make_cart):
+    user = make_user()
+    product = make_product(stock=5)
+    make_cart(user.id, {product.id: 2})
+    db.commit()
+    assert client.get(f"/api/products/{product.id}").json()["stock"] == 5
+
+    assert client.post("/api/orders/", headers=auth_headers(user)).status_code == 201
+
+    assert client.get(f"/api/products/{product.id}").json()["stock"] == 3
@@ -0,0 +1,35 @@
+from app.crud import get_products_version
+from app.models import Category, Product
+
+
+def test_listing_version_changes_on_every_write(db):
+    category = Category(name="Version category")
+    db.add(category)
+    db.flush()
+    product = Product(name="Version product", price=5, stock=10, category_id=category.id, is_active=1)
+    db.add(product)
+    db.commit()
+
+    seen = [get_products_version(db, category_id=category.id)]
+    # Several writes inside the same second: ORM edits and bulk UPDATEs
+    for _ in range(2):
+        product.price = product.price + 1
+        db.commit()
+        seen.append(get_products_version(db, category_id=category.id))
+        db.query(Product).filter(Product.id == product.id)\
+            .update({Product.stock: Product.stock - 1}, synchronize_session=False)
+        db.commit()
+        seen.append(get_products_version(db, category_id=category.id))
+
+    assert len(set(seen)) == len(seen)
+    assert [version for _, version, _ in seen] == sorted(version for _, version, _ in seen)
+
+
+def test_new_product_outranks_existing_versions(db):
+    first = Product(name="Version first", price=1, stock=1, is_active=1)
+    db.add(first)
+    db.commit()
+    second = Product(name="Version second", price=1, stock=1, is_active=1)
+    db.add(second)
+    db.commit()
+    assert second.version > first.version
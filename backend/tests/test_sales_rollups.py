@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy import func
+
+from app.crud import cancel_order, create_order_from_cart
+from app.models import Product, SalesByCategory
+
+
+# An order of 2 units of each of `lines` products in the "old" category
+@pytest.fixture
+def shop(db, make_user, make_category, make_product, make_cart):
+    def make(lines: int):
+        old, new = make_category(), make_category()
+        products = [make_product(category_id=old.id) for _ in range(lines)]
+        user = make_user()
+        make_cart(user.id, {product.id: 2 for product in products})
+        db.commit()
+        order_id = create_order_from_cart(db, user.id)["id"]
+        return user.id, order_id, old.id, new.id, products
+
+    return make
+
+
+def _category_units(db, category_id: int) -> int:
+    return db.query(func.coalesce(func.sum(SalesByCategory.units), 0))\
+        .filter(SalesByCategory.category_id == category_id)\
+        .scalar()
+
+
+def test_cancel_reverses_the_category_sold_under(db, shop):
+    user_id, order_id, old_id, new_id, products = shop(3)
+    assert _category_units(db, old_id) == 6
+
+    # Moving the products after the sale must not move their sales
+    db.query(Product).filter(Product.id.in_([p.id for p in products])).update({Product.category_id: new_id}, synchronize_session=False)
+    db.commit()
+    assert cancel_order(db, order_id, user_id) is not None
+
+    assert _category_units(db, old_id) == 0
+    assert _category_units(db, new_id) == 0
+
+
+def test_cancel_statements_do_not_grow_with_lines(db, shop, statements):
+    sent = []
+    for lines in (1, 4):
+        user_id, order_id, *_ = shop(lines)
+        db.expunge_all()
+        with statements() as captured:
+            cancel_order(db, order_id, user_id)
+        sent.append(len(captured))
+    assert sent[0] == sent[1]
@@ -0,0 +1,37 @@
+from app.crud import get_filtered_products
+from app.models import Product
+
+
+def _found(db, term: str) -> list[int]:
+    return [product.id for product in get_filtered_products(db, search=term)]
+
+
+def test_index_follows_writes_outside_crud(db):
+    # Plain ORM writes: no crud helper touches the index
+    product = Product(name="Wombat lantern", description="brass", price=20, stock=1, is_active=1)
+    db.add(product)
+    db.commit()
+    assert _found(db, "wombat") == [product.id]
+    assert _found(db, "wo") == [product.id]  # prefix, search-as-you-type
+
+    product.name = "Numbat lantern"
+    db.commit()
+    assert _found(db, "wombat") == []
+    assert _found(db, "numbat") == [product.id]
+
+    # Stock writes don't touch the indexed columns and leave the row findable
+    db.query(Product).filter(Product.id == product.id).update({Product.stock: 0}, synchronize_session=False)
+    db.commit()
+    assert _found(db, "numbat") == [product.id]
+
+    db.delete(product)
+    db.commit()
+    assert _found(db, "numbat") == []
+
+
+def test_single_letter_matches_whole_words_only(db):
+    product = Product(name="Q tip box", description="", price=1, stock=1, is_active=1)
+    other = Product(name="Quince jam", description="", price=1, stock=1, is_active=1)
+    db.add_all([product, other])
+    db.commit()
+    assert _found(db, "q") == [product.id]
@@ -0,0 +1,30 @@
+import pytest
+
+from app.crud import create_product, get_filtered_products, product_cursor
+from app.pagination import InvalidCursor, decode_cursor, encode_cursor
+from app.schemas import ProductCreate
+
+
+def test_rank_cursor_pages_through_ties_once(db):
+    # Same text, same rank: only the id tie-break tells the rows apart
+    ids = {
+        create_product(db, ProductCreate(name=f"Quokka plush {n}", description="quokka", price=9, stock=1)).id
+        for n in range(5)
+    }
+
+    seen, after = [], None
+    while True:
+        page = get_filtered_products(db, limit=2, search="quokka", after=after)
+        seen += [product.id for product in page]
+        if len(page) < 2:
+            break
+        after = product_cursor(page[-1])
+        rank, last_id = decode_cursor(after, "products:rank", (int, int))
+        assert last_id == page[-1].id and rank == page[-1].search_rank
+
+    assert sorted(seen) == sorted(ids)
+
+
+def test_float_rank_cursor_is_rejected():
+    with pytest.raises(InvalidCursor):
+        decode_cursor(encode_cursor("products:rank", [0.6079271, 3]), "products:rank", (int, int))
@@ -0,0 +1,34 @@
+import pytest
+
+from app.cache import TTLCache
+from app.config import settings
+from app.workers import server_worker_count
+
+
+@pytest.mark.parametrize("argv, workers", [
+    (["/usr/bin/uvicorn", "app.main:app", "--workers", "4"], 4),
+    (["/usr/bin/uvicorn", "app.main:app", "--workers=3"], 3),
+    (["/venv/lib/python3.11/site-packages/uvicorn/__main__.py", "app.main:app", "--workers", "2"], 2),
+    (["/usr/bin/gunicorn", "-w", "5", "-k", "uvicorn.workers.UvicornWorker", "app.main:app"], 5),
+    (["/usr/bin/gunicorn", "-w8", "app.main:app"], 8),
+    (["/usr/bin/gunicorn", "--workers", "$(nproc)", "app.main:app"], 2),  # unknown: assume several
+    (["/usr/bin/uvicorn", "app.main:app", "--reload"], 1),
+    (["/usr/bin/python", "-w", "9", "script.py"], 1),  # not a server: flag ignored
+])
+def test_worker_count_reads_the_server_command_line(monkeypatch, argv, workers):
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 1)
+    assert server_worker_count(argv) == workers
+
+
+def test_worker_count_falls_back_to_web_concurrency(monkeypatch):
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 3)
+    assert server_worker_count(["/usr/bin/uvicorn", "app.main:app"]) == 3
+
+
+def test_disabled_cache_never_serves_entries():
+    cache = TTLCache("off", 10, 60, enabled=False)
+    loads = []
+    for _ in range(2):
+        assert cache.get_or_load("key", lambda: loads.append(1) or len(loads)) == len(loads)
+    assert len(loads) == 2
+    assert cache.stats()["size"] == 0 and not cache.stats()["enabled"]
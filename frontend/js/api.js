@@ -46,7 +46,8 @@ const api = {
             if (contentType && contentType.indexOf("application/json") !== -1) {
                 const data = await response.json();
                 if (!response.ok) {
-                    throw new Error(data.detail || 'Something went wrong');
+                    // 409 on checkout carries {message, items}
+                    throw new Error(data.detail?.message || data.detail || 'Something went wrong');
                 }
                 return data;
             } else {
@@ -63,8 +64,9 @@ const api = {
 
     get: (endpoint) => api.request(endpoint, { method: 'GET' }),
 
-    post: (endpoint, body) => api.request(endpoint, {
+    post: (endpoint, body, headers = {}) => api.request(endpoint, {
         method: 'POST',
+        headers: headers,
         body: JSON.stringify(body)
     }),
 
@@ -109,6 +111,7 @@ const api = {
         if (filters.search) params.append('search', filters.search);
         if (filters.min_price) params.append('min_price', filters.min_price);
         if (filters.max_price) params.append('max_price', filters.max_price);
+        params.append('image_size', filters.image_size || 'medium');  // grid-sized WebP
 
         return api.get(`/api/products/?${params.toString()}`);
     },
@@ -5,11 +5,14 @@ const auth = {
             const formData = new URLSearchParams();
             formData.append('username', username);
             formData.append('password', password);
+            // Guest cart, merged into the account cart on login
+            const guestCart = localStorage.getItem('guest_cart');
 
             const response = await fetch(`${API_BASE_URL}/api/auth/login`, {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/x-www-form-urlencoded',
+                    ...(guestCart ? { 'X-Guest-Cart': guestCart } : {}),
                 },
                 body: formData
             });
@@ -21,6 +24,7 @@ const auth = {
             }
 
             localStorage.setItem('token', data.access_token);
+            localStorage.removeItem('guest_cart');
             // Decode token to get user info if needed, or fetch profile
             // For now, just redirect
             return true;
@@ -8,8 +8,16 @@ const cart = {
         }
     },
 
+    // { total_items, total_amount }; total_items counts units, not lines
     getSummary: async () => {
         try {
+            if (!auth.isAuthenticated()) {
+                const guest = await cart.getGuest();
+                return {
+                    total_items: guest.items.reduce((units, item) => units + item.quantity, 0),
+                    total_amount: guest.total_amount
+                };
+            }
             return await api.get('/api/cart/summary');
         } catch (error) {
             return { total_items: 0, total_amount: 0 };
@@ -18,10 +26,14 @@ const cart = {
 
     add: async (productId, quantity = 1) => {
         try {
-            await api.post('/api/cart/items', {
-                product_id: productId,
-                quantity: quantity
-            });
+            if (!auth.isAuthenticated()) {
+                await cart.guestBatch([{ op: 'add', product_id: productId, quantity: quantity }]);
+            } else {
+                await api.post('/api/cart/items', {
+                    product_id: productId,
+                    quantity: quantity
+                });
+            }
             ui.showToast('Added to cart!', 'success');
             ui.updateCartCount();
         } catch (error) {
@@ -41,6 +53,39 @@ const cart = {
         }
     },
 
+    // operations: [{op: 'add' | 'set' | 'remove', product_id, quantity}]
+    batch: async (operations) => {
+        try {
+            return await api.post('/api/cart/items/batch', { operations });
+        } catch (error) {
+            ui.showToast(error.message, 'error');
+            return null;
+        }
+    },
+
+    // Logged-out cart: a signed token kept in localStorage, merged on login
+    guestHeaders: () => {
+        const token = localStorage.getItem('guest_cart');
+        return token ? { 'X-Guest-Cart': token } : {};
+    },
+
+    getGuest: async () => {
+        return await api.request('/api/cart/guest', {
+            method: 'GET',
+            headers: cart.guestHeaders()
+        });
+    },
+
+    guestBatch: async (operations) => {
+        const result = await api.request('/api/cart/guest/items/batch', {
+            method: 'POST',
+            headers: cart.guestHeaders(),
+            body: JSON.stringify({ operations })
+        });
+        localStorage.setItem('guest_cart', result.guest_cart_token);
+        return result;
+    },
+
     remove: async (itemId) => {
         try {
             await api.delete(`/api/cart/items/${itemId}`);
@@ -29,6 +29,9 @@ const ui = {
                     </div>
                     <button class="btn btn-secondary" onclick="auth.logout()">Logout</button>
                 ` : `
+                    <div class="cart-icon" onclick="window.location.href='login.html'" title="Log in to check out">
+                        🛒 <span class="cart-count" id="cart-count">0</span>
+                    </div>
                     <a href="login.html" class="btn btn-primary">Login</a>
                     <a href="register.html" class="btn btn-secondary">Register</a>
                 `}
@@ -37,8 +40,6 @@ const ui = {
     },
 
     updateCartCount: async () => {
-        if (!auth.isAuthenticated()) return;
-
         const countEl = document.getElementById('cart-count');
         if (countEl) {
             const summary = await cart.getSummary();